@@ -0,0 +1,391 @@
+import argparse
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from data_sources import ReplayDataSource
+from ohlcv_store import OHLCVStore
+
+# --- Benchmark Configuration ---
+BENCH_TICKER_COUNTS = (50, 500, 5000)
+BENCH_HISTORY_DAYS = 300
+BENCH_NAN_RATE = 0.01
+BENCH_ZERO_VOLUME_RATE = 0.01
+BENCH_REPEAT = 3
+BENCH_REFERENCE_TICKERS = 200
+BENCH_APP_FILE = "sanket.py"
+BENCH_IMPORT_BUDGET_MS = 1500
+BENCH_DEFERRED_MODULES = ("pandas_ta", "yfinance", "nsepython", "plotly", "requests")
+BENCH_SECTORS = [
+    "Financial Services", "Technology", "Healthcare", "Consumer Cyclical", "Industrials",
+    "Basic Materials", "Energy", "Consumer Defensive", "Utilities", "Communication Services"
+]
+
+# --- Synthetic Universes ---
+def synthetic_universe(n_tickers, n_days=BENCH_HISTORY_DAYS, nan_rate=BENCH_NAN_RATE,
+                       zero_volume_rate=BENCH_ZERO_VOLUME_RATE, end_date=None, seed=0):
+    """{ticker: daily OHLCV} shaped like a yfinance download of an NSE universe.
+
+    Returns follow a random walk with clustered volatility and occasional
+    multi-day trends (so every signal type shows up), volume is lognormal and
+    rises with the size of the move. nan_rate of the bars are missing
+    entirely, the same share again has a single missing field, and
+    zero_volume_rate of the bars printed no volume.
+    """
+    rng = np.random.default_rng(seed)
+    end_date = pd.Timestamp(end_date or datetime.today().date())
+    index = pd.bdate_range(end=end_date, periods=n_days)
+    data_dict = {}
+
+    for k in range(n_tickers):
+        vol = 0.012 + 0.02 * rng.random()
+        shocks = rng.standard_normal(n_days)
+        regime = np.exp(np.convolve(rng.normal(0, 0.3, n_days), np.ones(10) / 10, mode='same'))
+        returns = vol * regime * shocks
+        for start in rng.choice(n_days - 6, size=max(1, n_days // 60), replace=False):
+            returns[start:start + 5] += rng.choice([-1, 1]) * vol * 1.5
+
+        close = rng.lognormal(5.5, 1.2) * np.exp(np.cumsum(returns))
+        open_ = close * np.exp(rng.normal(0, vol / 3, n_days))
+        high = np.maximum(open_, close) * (1 + np.abs(rng.normal(0, vol / 2, n_days)))
+        low = np.minimum(open_, close) * (1 - np.abs(rng.normal(0, vol / 2, n_days)))
+        volume = np.round(rng.lognormal(rng.uniform(11, 15), 0.5, n_days) * (1 + np.abs(returns) / vol))
+        volume[rng.random(n_days) < zero_volume_rate] = 0
+
+        ticker_df = pd.DataFrame({'Open': open_, 'High': high, 'Low': low, 'Close': close, 'Volume': volume}, index=index)
+        ticker_df[rng.random(n_days) < nan_rate] = np.nan
+        ticker_df = ticker_df.mask(rng.random(ticker_df.shape) < nan_rate / 5)
+        data_dict[f"SYN{k:04d}.NS"] = ticker_df
+
+    return data_dict
+
+def write_recording(root, data_dict, sectors=None, seed=0):
+    """Lay data_dict out as a record/replay directory that ReplayDataSource serves as the F&O universe"""
+    rng = np.random.default_rng(seed)
+    tickers = list(data_dict)
+    os.makedirs(root, exist_ok=True)
+    store = OHLCVStore(os.path.join(root, "ohlcv"))
+    for ticker, ticker_df in data_dict.items():
+        store.write(ticker, ticker_df, ticker_df.index.min(), ticker_df.index.max(), flush=False)
+    store.flush()
+
+    sectors = sectors or {ticker: BENCH_SECTORS[i] for ticker, i in zip(tickers, rng.integers(0, len(BENCH_SECTORS), len(tickers)))}
+    with open(os.path.join(root, "universe.json"), 'w') as f:
+        json.dump({'fno': [tickers, f"✓ Fetched {len(tickers)} F&O securities"]}, f)
+    with open(os.path.join(root, "info.json"), 'w') as f:
+        json.dump({ticker: {'sector': sector, 'industry': None} for ticker, sector in sectors.items()}, f)
+    return ReplayDataSource(root)
+
+# --- Timing ---
+def time_call(fn, repeat=BENCH_REPEAT, warmup=1):
+    """min/median/mean wall seconds of fn() over repeat runs after warmup runs"""
+    for _ in range(warmup):
+        fn()
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return {'min': min(timings), 'median': statistics.median(timings), 'mean': statistics.fmean(timings), 'repeat': repeat}
+
+def _entry(name, tickers, days, seconds, items=None, **extra):
+    entry = {'name': name, 'tickers': tickers, 'days': days, 'seconds': seconds}
+    if items:
+        entry['items'] = items
+        entry['per_item_us'] = seconds['median'] / items * 1e6
+    entry.update(extra)
+    return entry
+
+# --- Startup Profile ---
+# The app module is imported in a fresh interpreter that already has
+# streamlit loaded, as the server has when it runs the script for the first
+# session, and -X importtime attributes the rest to sanket's own imports.
+# Only modules the app itself pulls in count against the deferred list
+# (streamlit already loads plotly's lazy top-level package, for one).
+_IMPORT_PROBE = (
+    "import json, sys, time\n"
+    "import streamlit.logger\n"
+    "streamlit.logger.set_log_level('error')\n"
+    "preloaded = set(sys.modules)\n"
+    "started = time.perf_counter()\n"
+    "import {module}\n"
+    "print(json.dumps({{'seconds': time.perf_counter() - started, 'modules': sorted(set(sys.modules) - preloaded)}}))\n"
+)
+
+def _parse_importtime(stderr):
+    """[(depth, module, self_us, cumulative_us)] from -X importtime output, in print order"""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        rows.append((depth, name.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+def profile_startup(module=BENCH_APP_FILE[:-3], deferred=BENCH_DEFERRED_MODULES):
+    """Cold import of the app's idle screen: wall seconds, ms per directly imported module and deferred modules that loaded anyway"""
+    app_dir = os.path.dirname(os.path.abspath(__file__))
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _IMPORT_PROBE.format(module=module)],
+        cwd=app_dir, capture_output=True, text=True, check=True
+    )
+    probe = json.loads(completed.stdout.strip().splitlines()[-1])
+    rows = _parse_importtime(completed.stderr)
+
+    # Children print before their parent, one indent level deeper
+    root = max(i for i, row in enumerate(rows) if row[0] == 0 and row[1] == module)
+    first = max((i for i, row in enumerate(rows[:root]) if row[0] == 0), default=-1) + 1
+    breakdown = [{'module': f"{module} (script body)", 'self_ms': rows[root][2] / 1000, 'cumulative_ms': rows[root][2] / 1000}]
+    breakdown += [
+        {'module': name, 'self_ms': self_us / 1000, 'cumulative_ms': cumulative_us / 1000}
+        for depth, name, self_us, cumulative_us in rows[first:root] if depth == 1
+    ]
+    breakdown.sort(key=lambda entry: entry['cumulative_ms'], reverse=True)
+
+    loaded = {name.partition(".")[0] for name in probe['modules']}
+    return {
+        'seconds': probe['seconds'],
+        'modules': breakdown,
+        'deferred_loaded': [name for name in deferred if name in loaded]
+    }
+
+def check_startup(startup, budget_ms=BENCH_IMPORT_BUDGET_MS):
+    """Budget violations of a profile_startup result, empty when within budget"""
+    violations = []
+    if startup['seconds'] * 1000 > budget_ms:
+        violations.append(f"app import took {startup['seconds'] * 1000:.0f} ms (budget {budget_ms} ms)")
+    violations += [f"{name} is imported at startup but should load on first use" for name in startup['deferred_loaded']]
+    return violations
+
+def bench_startup(repeat=BENCH_REPEAT):
+    """Cold app import timed over repeat fresh interpreters, with the module breakdown of the median run"""
+    runs = sorted((profile_startup() for _ in range(repeat)), key=lambda startup: startup['seconds'])
+    timings = [startup['seconds'] for startup in runs]
+    median_run = runs[len(runs) // 2]
+    seconds = {'min': timings[0], 'median': statistics.median(timings), 'mean': statistics.fmean(timings), 'repeat': repeat}
+    return median_run, _entry("app_import", 0, 0, seconds, modules=median_run['modules'], deferred_loaded=median_run['deferred_loaded'])
+
+# --- Benchmarks ---
+def import_app():
+    """The sanket module, imported without a Streamlit server (bare mode)"""
+    import streamlit.logger
+    streamlit.logger.set_log_level("error")
+    import sanket
+    return sanket
+
+def bench_compute(data_dict, end_date, repeat=BENCH_REPEAT, reference_tickers=BENCH_REFERENCE_TICKERS):
+    """Reference per-ticker compute_ilfo_signal, the panel engine and both confidence scorers"""
+    from ilfo import (
+        CRITERIA_SERIES, calculate_weighted_confidence_score, compute_ilfo_signal,
+        compute_ilfo_universe, score_confidence_batch
+    )
+    from instrumentation import CacheStats
+    from result_cache import ResultCache
+    from scan_pipeline import score_universe
+    n, days = len(data_dict), len(next(iter(data_dict.values())))
+    entries = []
+
+    reference = list(data_dict.items())[:reference_tickers]
+    seconds = time_call(lambda: [compute_ilfo_signal(ticker, df, end_date) for ticker, df in reference], repeat)
+    entries.append(_entry("compute_ilfo_signal", n, days, seconds, items=len(reference)))
+
+    results = compute_ilfo_universe(data_dict, end_date)
+    seconds = time_call(lambda: compute_ilfo_universe(data_dict, end_date), repeat)
+    entries.append(_entry("compute_ilfo_universe", n, days, seconds, items=n))
+
+    # The same scan again with every ticker's result already cached
+    cache = ResultCache(stats=CacheStats())
+    score_universe(data_dict, end_date, cache=cache)
+    seconds = time_call(lambda: score_universe(data_dict, end_date, cache=cache), repeat)
+    entries.append(_entry("score_universe_cached", n, days, seconds, items=n))
+
+    actionable = results[results['signal'].str.endswith(("Long", "Short"))]
+    scored = [
+        ({param: record.get(param) for param in list(CRITERIA_SERIES) + ['body_conviction']}, "Long" if record['signal'].endswith("Long") else "Short")
+        for record in actionable.to_dict('records')
+    ]
+    if scored:
+        seconds = time_call(lambda: [calculate_weighted_confidence_score(values, side) for values, side in scored], repeat)
+        entries.append(_entry("calculate_weighted_confidence_score", n, days, seconds, items=len(scored)))
+
+        frame = pd.DataFrame([values for values, _ in scored])
+        sides = np.array([side for _, side in scored])
+        seconds = time_call(lambda: score_confidence_batch(frame, sides), repeat)
+        entries.append(_entry("score_confidence_batch", n, days, seconds, items=len(scored)))
+
+    return results, entries
+
+def bench_render(app, results, sectors, days, repeat=BENCH_REPEAT):
+    """Results-table construction, HTML formatting/rendering and every export format"""
+    from exports import EXPORT_FORMATS, export_bytes
+    results = results.assign(Sector=results['ticker'].map(lambda t: sectors.get(t, "Other")))
+    results_df = app.build_results_frame(results)
+    n = len(results_df)
+    entries = [
+        _entry("build_results_frame", n, days, time_call(lambda: app.build_results_frame(results), repeat), items=n),
+        _entry("format_dataframe_for_display", n, days, time_call(lambda: app.format_dataframe_for_display(results_df), repeat), items=n),
+        _entry("render_styled_html", n, days, time_call(lambda: app.render_styled_html(results_df), repeat), items=n)
+    ]
+    for export_format in EXPORT_FORMATS:
+        seconds = time_call(lambda: export_bytes(results_df, export_format), repeat)
+        entries.append(_entry(f"export_{export_format.lower()}", n, days, seconds, items=n))
+    return entries
+
+def bench_app(recording_root, end_date, n, days, repeat=BENCH_REPEAT, app_file=BENCH_APP_FILE, timeout=1800):
+    """End-to-end run_analysis through Streamlit's AppTest against a replayed universe.
+
+    The first run is cold (replayed download into an empty OHLCV store, sector
+    lookups); later runs attach to the retained scan job like a second session
+    asking for the same universe and date would.
+    """
+    import streamlit as st
+    from streamlit.testing.v1 import AppTest
+
+    # The data source and data caches are process-wide; start every universe cold
+    st.cache_data.clear()
+    st.cache_resource.clear()
+    os.environ["SANKET_DATA_SOURCE"] = f"replay:{recording_root}"
+    app_test = AppTest.from_file(os.path.join(os.path.dirname(os.path.abspath(__file__)), app_file), default_timeout=timeout)
+    app_test.run()
+    app_test.sidebar.date_input[0].set_value(end_date)
+
+    timings = []
+    for _ in range(repeat + 1):
+        app_test.sidebar.button[0].click()
+        started = time.perf_counter()
+        app_test.run()
+        timings.append(time.perf_counter() - started)
+        if app_test.exception:
+            raise RuntimeError(f"run_analysis failed: {app_test.exception[0].message}")
+
+    cold, warm = timings[0], timings[1:]
+    return [
+        _entry("run_analysis_cold", n, days, {'min': cold, 'median': cold, 'mean': cold, 'repeat': 1}, items=n),
+        _entry("run_analysis_warm", n, days, {'min': min(warm), 'median': statistics.median(warm), 'mean': statistics.fmean(warm), 'repeat': len(warm)}, items=n)
+    ]
+
+def run_benchmarks(ticker_counts=BENCH_TICKER_COUNTS, days=BENCH_HISTORY_DAYS, nan_rate=BENCH_NAN_RATE,
+                   zero_volume_rate=BENCH_ZERO_VOLUME_RATE, repeat=BENCH_REPEAT,
+                   reference_tickers=BENCH_REFERENCE_TICKERS, include_app=True, workdir=None):
+    """Every benchmark at every universe size, as one JSON-serialisable report"""
+    app = import_app()
+    end_date = datetime.today().date()
+    while end_date.weekday() >= 5:
+        end_date -= timedelta(days=1)
+
+    _, startup_entry = bench_startup(repeat)
+    entries = [startup_entry]
+    workdir = workdir or tempfile.mkdtemp(prefix="sanket_bench_")
+    for n in ticker_counts:
+        logging.info(f"Benchmarking {n} tickers x {days} days...")
+        data_dict = synthetic_universe(n, days, nan_rate, zero_volume_rate, end_date)
+        recording_root = os.path.join(workdir, f"universe_{n}")
+        source = write_recording(recording_root, data_dict)
+        sectors = {ticker: source.ticker_info(ticker).get('sector') for ticker in data_dict}
+
+        results, compute_entries = bench_compute(data_dict, end_date, repeat, reference_tickers)
+        entries.extend(compute_entries)
+        entries.extend(bench_render(app, results, sectors, days, repeat))
+        if include_app:
+            entries.extend(bench_app(recording_root, end_date, n, days, repeat))
+
+    return {
+        'version': app.VERSION,
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'machine': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'processor': platform.processor() or platform.machine(),
+            'cpus': os.cpu_count(),
+            'numpy': np.__version__,
+            'pandas': pd.__version__
+        },
+        'config': {
+            'ticker_counts': list(ticker_counts), 'days': days, 'nan_rate': nan_rate,
+            'zero_volume_rate': zero_volume_rate, 'repeat': repeat, 'reference_tickers': reference_tickers
+        },
+        'results': entries
+    }
+
+def compare_reports(baseline, current):
+    """Median-time ratio current / baseline for every benchmark both reports ran"""
+    before = {(entry['name'], entry['tickers']): entry['seconds']['median'] for entry in baseline['results']}
+    rows = []
+    for entry in current['results']:
+        key = (entry['name'], entry['tickers'])
+        if key in before:
+            rows.append({
+                'name': entry['name'], 'tickers': entry['tickers'],
+                baseline['version']: before[key], current['version']: entry['seconds']['median'],
+                'ratio': entry['seconds']['median'] / before[key] if before[key] else np.nan
+            })
+    return pd.DataFrame(rows)
+
+# --- Command Line ---
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the Sanket hot paths on synthetic universes")
+    parser.add_argument('--tickers', type=int, nargs='+', default=list(BENCH_TICKER_COUNTS), help="Universe sizes to benchmark")
+    parser.add_argument('--days', type=int, default=BENCH_HISTORY_DAYS, help="Trading days of history per ticker")
+    parser.add_argument('--nan-rate', type=float, default=BENCH_NAN_RATE, help="Share of bars missing entirely")
+    parser.add_argument('--zero-volume-rate', type=float, default=BENCH_ZERO_VOLUME_RATE, help="Share of bars with zero volume")
+    parser.add_argument('--repeat', type=int, default=BENCH_REPEAT)
+    parser.add_argument('--reference-tickers', type=int, default=BENCH_REFERENCE_TICKERS, help="Tickers timed through the per-ticker reference path")
+    parser.add_argument('--skip-app', action='store_true', help="Skip the end-to-end run_analysis benchmark")
+    parser.add_argument('--workdir', help="Where synthetic recordings are written (default: a temp directory)")
+    parser.add_argument('--output', help="JSON report path (default: bench_<version>.json)")
+    parser.add_argument('--compare', help="Earlier JSON report to compare median timings against")
+    parser.add_argument('--import-budget-ms', type=float, default=BENCH_IMPORT_BUDGET_MS, help="Fail when the cold app import exceeds this")
+    parser.add_argument('--startup-only', action='store_true', help="Only profile the cold app import and check its budget")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    if args.startup_only:
+        startup, _ = bench_startup(args.repeat)
+        return report_startup(startup, args.import_budget_ms)
+
+    report = run_benchmarks(args.tickers, args.days, args.nan_rate, args.zero_volume_rate, args.repeat,
+                            args.reference_tickers, not args.skip_app, args.workdir)
+
+    output = args.output or f"bench_{report['version']}.json"
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+    logging.info(f"Benchmark report written to {output}")
+
+    table = pd.DataFrame([
+        {'name': e['name'], 'tickers': e['tickers'], 'median_s': e['seconds']['median'], 'per_item_us': e.get('per_item_us')}
+        for e in report['results']
+    ])
+    print(table.round(6).to_string(index=False))
+
+    if args.compare:
+        with open(args.compare, 'r') as f:
+            baseline = json.load(f)
+        print(compare_reports(baseline, report).round(4).to_string(index=False))
+
+    startup = next(entry for entry in report['results'] if entry['name'] == "app_import")
+    return report_startup({**startup, 'seconds': startup['seconds']['median']}, args.import_budget_ms)
+
+def report_startup(startup, budget_ms):
+    """Print the startup profile and return the exit code of its budget check"""
+    print(f"Cold app import: {startup['seconds'] * 1000:.0f} ms")
+    print(pd.DataFrame(startup['modules']).head(15).round(1).to_string(index=False))
+    violations = check_startup(startup, budget_ms)
+    for violation in violations:
+        print(f"✗ {violation}")
+    if not violations:
+        print(f"✓ Within the {budget_ms:.0f} ms import budget, heavy modules deferred")
+    return 1 if violations else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
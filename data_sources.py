@@ -0,0 +1,259 @@
+import io
+import json
+import os
+import threading
+
+import pandas as pd
+
+from ohlcv_download import download_ohlcv
+from ohlcv_store import OHLCVStore
+
+# --- Data Source Configuration ---
+DATA_SOURCE_ENV = "SANKET_DATA_SOURCE"
+DATA_RECORDING_DIR = "market_data"
+INDEX_REQUEST_TIMEOUT = 10
+INFO_FIELDS = ('sector', 'industry')
+
+BASE_URL = "https://www.niftyindices.com/IndexConstituent/"
+INDEX_URL_MAP = {
+    "NIFTY 50": f"{BASE_URL}ind_nifty50list.csv",
+    "NIFTY NEXT 50": f"{BASE_URL}ind_niftynext50list.csv",
+    "NIFTY 100": f"{BASE_URL}ind_nifty100list.csv",
+    "NIFTY 200": f"{BASE_URL}ind_nifty200list.csv",
+    "NIFTY 500": f"{BASE_URL}ind_nifty500list.csv",
+    "NIFTY MIDCAP 50": f"{BASE_URL}ind_niftymidcap50list.csv",
+    "NIFTY MIDCAP 100": f"{BASE_URL}ind_niftymidcap100list.csv",
+    "NIFTY SMLCAP 100": f"{BASE_URL}ind_niftysmallcap100list.csv",
+    "NIFTY BANK": f"{BASE_URL}ind_niftybanklist.csv",
+    "NIFTY AUTO": f"{BASE_URL}ind_niftyautolist.csv",
+    "NIFTY FIN SERVICE": f"{BASE_URL}ind_niftyfinancelist.csv",
+    "NIFTY FMCG": f"{BASE_URL}ind_niftyfmcglist.csv",
+    "NIFTY IT": f"{BASE_URL}ind_niftyitlist.csv",
+    "NIFTY MEDIA": f"{BASE_URL}ind_niftymedialist.csv",
+    "NIFTY METAL": f"{BASE_URL}ind_niftymetallist.csv",
+    "NIFTY PHARMA": f"{BASE_URL}ind_niftypharmalist.csv"
+}
+
+# --- Source Interface ---
+class MarketDataSource:
+    """Everything the scanner reads from outside: universe lists, daily OHLCV and ticker metadata.
+
+    Universe calls return (symbols, message) with symbols None on failure,
+    download_ohlcv returns {ticker: bars} for the tickers it found, and
+    ticker_info returns a dict with at least the INFO_FIELDS it knows.
+    cache_dir, when set, is where the app keeps the OHLCV store and sector
+    database for this source, so recorded or replayed data never mixes with
+    the caches filled from the live network.
+    """
+
+    name = "base"
+    cache_dir = None
+    rate_limited = True
+
+    def fno_universe(self):
+        raise NotImplementedError
+
+    def index_universe(self, index):
+        raise NotImplementedError
+
+    def download_ohlcv(self, tickers, start_date, end_date):
+        raise NotImplementedError
+
+    def ticker_info(self, ticker):
+        raise NotImplementedError
+
+    def describe(self):
+        return self.name
+
+# --- yfinance / NSE Backend ---
+# nsepython, requests and yfinance are imported on first use: they dominate
+# import time and replayed or fully cached runs never touch them.
+class LiveDataSource(MarketDataSource):
+    """NSE for the F&O list, niftyindices.com for index constituents, yfinance for bars and sectors"""
+
+    name = "live"
+
+    def fno_universe(self):
+        try:
+            from nsepython import nse_get_advances_declines
+            stock_data = nse_get_advances_declines()
+            if not isinstance(stock_data, pd.DataFrame):
+                return None, f"API returned unexpected type: {type(stock_data)}"
+
+            symbols = None
+            if 'SYMBOL' in stock_data.columns:
+                symbols = stock_data['SYMBOL'].tolist()
+            elif 'symbol' in stock_data.columns:
+                symbols = stock_data['symbol'].tolist()
+            elif stock_data.index.name in ['SYMBOL', 'symbol']:
+                symbols = stock_data.index.tolist()
+            else:
+                if isinstance(stock_data.index, pd.RangeIndex):
+                    return None, f"Could not find SYMBOL column"
+                elif len(stock_data.index) > 0:
+                    symbols = stock_data.index.tolist()
+
+            if symbols is None:
+                return None, f"Could not extract symbols"
+
+            symbols_ns = [str(s) + ".NS" for s in symbols if s and str(s).strip()]
+
+            if not symbols_ns:
+                return None, "Symbol list empty after cleaning"
+
+            return symbols_ns, f"✓ Fetched {len(symbols_ns)} F&O securities"
+
+        except Exception as e:
+            return None, f"Error: {e}"
+
+    def index_universe(self, index):
+        url = INDEX_URL_MAP.get(index)
+        if not url:
+            return None, f"No URL for {index}"
+
+        try:
+            import requests
+            headers = {
+                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+            }
+            response = requests.get(url, headers=headers, verify=False, timeout=INDEX_REQUEST_TIMEOUT)
+            response.raise_for_status()
+
+            stock_df = pd.read_csv(io.StringIO(response.text))
+
+            if 'Symbol' in stock_df.columns:
+                symbols = stock_df['Symbol'].tolist()
+                symbols_ns = [str(s) + ".NS" for s in symbols if s and str(s).strip()]
+                return symbols_ns, f"✓ Fetched {len(symbols_ns)} constituents"
+            else:
+                return None, f"No Symbol column found"
+
+        except Exception as e:
+            return None, f"Error: {e}"
+
+    def download_ohlcv(self, tickers, start_date, end_date):
+        return download_ohlcv(tickers, start_date, end_date)
+
+    def ticker_info(self, ticker):
+        import yfinance as yf
+        return yf.Ticker(ticker).info or {}
+
+# --- Offline Record / Replay ---
+# A recording directory holds universe.json ({"fno": [symbols, message],
+# "index:<name>": [...]}), info.json ({ticker: {sector, industry}}) and an
+# OHLCVStore under ohlcv/ with every bar a download returned.
+def _read_json(path):
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r') as f:
+        return json.load(f)
+
+def _write_json(path, payload):
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(payload, f, indent=1, sort_keys=True)
+    os.replace(tmp_path, path)
+
+class RecordingDataSource(MarketDataSource):
+    """Passes every call through to another source and captures the responses under root"""
+
+    name = "record"
+    rate_limited = True
+
+    def __init__(self, source, root=DATA_RECORDING_DIR):
+        self.source = source
+        self.root = root
+        self.cache_dir = os.path.join(root, "cache")
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self._universe_path = os.path.join(root, "universe.json")
+        self._info_path = os.path.join(root, "info.json")
+        self._universe = _read_json(self._universe_path)
+        self._info = _read_json(self._info_path)
+        self.ohlcv = OHLCVStore(os.path.join(root, "ohlcv"))
+
+    def _record_universe(self, key, response):
+        symbols, message = response
+        if symbols:
+            with self._lock:
+                self._universe[key] = [list(symbols), message]
+                _write_json(self._universe_path, self._universe)
+        return response
+
+    def fno_universe(self):
+        return self._record_universe("fno", self.source.fno_universe())
+
+    def index_universe(self, index):
+        return self._record_universe(f"index:{index}", self.source.index_universe(index))
+
+    def download_ohlcv(self, tickers, start_date, end_date):
+        data = self.source.download_ohlcv(tickers, start_date, end_date)
+        for ticker, ticker_df in data.items():
+            self.ohlcv.write(ticker, ticker_df, start_date, end_date, flush=False)
+        self.ohlcv.flush()
+        return data
+
+    def ticker_info(self, ticker):
+        info = self.source.ticker_info(ticker)
+        with self._lock:
+            self._info[ticker] = {field: info.get(field) for field in INFO_FIELDS}
+            _write_json(self._info_path, self._info)
+        return info
+
+    def describe(self):
+        return f"record → {self.root}"
+
+class ReplayDataSource(MarketDataSource):
+    """Serves a recording back deterministically, without touching the network"""
+
+    name = "replay"
+    rate_limited = False
+
+    def __init__(self, root=DATA_RECORDING_DIR):
+        if not os.path.isdir(root):
+            raise FileNotFoundError(f"No market data recording at {root}")
+        self.root = root
+        self.cache_dir = os.path.join(root, "replay_cache")
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._universe = _read_json(os.path.join(root, "universe.json"))
+        self._info = _read_json(os.path.join(root, "info.json"))
+        self.ohlcv = OHLCVStore(os.path.join(root, "ohlcv"))
+
+    def _replay_universe(self, key, label):
+        if key not in self._universe:
+            return None, f"No recorded {label} list in {self.root}"
+        symbols, message = self._universe[key]
+        return list(symbols), message
+
+    def fno_universe(self):
+        return self._replay_universe("fno", "F&O")
+
+    def index_universe(self, index):
+        return self._replay_universe(f"index:{index}", index)
+
+    def download_ohlcv(self, tickers, start_date, end_date):
+        data = {}
+        for ticker in tickers:
+            ticker_df = self.ohlcv.read(ticker, start_date, end_date)
+            if ticker_df is not None and not ticker_df.empty and not ticker_df['Close'].isnull().all():
+                data[ticker] = ticker_df
+        return data
+
+    def ticker_info(self, ticker):
+        return dict(self._info.get(ticker) or {})
+
+    def describe(self):
+        return f"replay ← {self.root}"
+
+def make_data_source(spec=None):
+    """Source for a spec of "live", "record[:dir]" or "replay[:dir]" (default: $SANKET_DATA_SOURCE, else live)"""
+    spec = (spec if spec is not None else os.environ.get(DATA_SOURCE_ENV, "")).strip() or "live"
+    kind, _, root = spec.partition(":")
+    root = root or DATA_RECORDING_DIR
+    if kind == "live":
+        return LiveDataSource()
+    if kind == "record":
+        return RecordingDataSource(LiveDataSource(), root)
+    if kind == "replay":
+        return ReplayDataSource(root)
+    raise ValueError(f"Unknown data source '{spec}' (expected live, record[:dir] or replay[:dir])")
@@ -0,0 +1,57 @@
+import io
+
+import pandas as pd
+
+from ilfo import DETAIL_FIELDS, fill_ilfo_details
+
+# --- Export Configuration ---
+# label: (file extension, MIME type)
+EXPORT_FORMATS = {
+    "CSV": (".csv", "text/csv"),
+    "Parquet": (".parquet", "application/vnd.apache.parquet"),
+    "Arrow": (".arrow", "application/vnd.apache.arrow.file")
+}
+# details column: the signal column its text is built from
+DETAIL_COLUMNS = {"Details": "Signal", "details": "signal"}
+LINE_BREAK_PATTERN = r"<br\s*/?>"
+HTML_TAG_PATTERN = r"<[^>]+>"
+
+# --- Export Frames ---
+def export_frame(df):
+    """Flat copy of a results or history frame for files: index as a column, plain details text.
+
+    Numeric columns (confidence, criteria values) are passed through
+    untouched so downstream tools read them as numbers.
+    """
+    frame = df.reset_index() if df.index.name or isinstance(df.index, pd.MultiIndex) else df.reset_index(drop=True)
+    criteria = [param for _, param, _ in DETAIL_FIELDS]
+    for col, signal_col in DETAIL_COLUMNS.items():
+        if col in frame.columns:
+            if {signal_col, *criteria}.issubset(frame.columns):
+                frame[col] = fill_ilfo_details(frame, signal_col, col, html=False)
+            details = frame[col].astype("string").str.replace(LINE_BREAK_PATTERN, " | ", regex=True)
+            frame[col] = details.str.replace(HTML_TAG_PATTERN, "", regex=True)
+    return frame
+
+def export_bytes(df, export_format):
+    """df serialized in one of EXPORT_FORMATS"""
+    frame = export_frame(df)
+    if export_format == "CSV":
+        return frame.to_csv(index=False).encode()
+
+    buffer = io.BytesIO()
+    if export_format == "Parquet":
+        frame.to_parquet(buffer, index=False)
+    elif export_format == "Arrow":
+        import pyarrow as pa
+        table = pa.Table.from_pandas(frame, preserve_index=False)
+        with pa.ipc.new_file(buffer, table.schema) as writer:
+            writer.write_table(table)
+    else:
+        raise ValueError(f"Unknown export format '{export_format}' (expected one of {', '.join(EXPORT_FORMATS)})")
+    return buffer.getvalue()
+
+def export_format_for(path):
+    """EXPORT_FORMATS label for a file path's extension, None if it has no match"""
+    extension = path[path.rfind("."):].lower() if "." in path else ""
+    return next((label for label, (ext, _) in EXPORT_FORMATS.items() if ext == extension), None)
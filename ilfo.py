@@ -0,0 +1,1258 @@
+import json
+import logging
+import os
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+# --- Backtested Optimal Ranges (Weights & Importance) ---
+OPTIMAL_RANGES = {
+    "Long": {
+        'ilfo_value': {'min': 0.362, 'max': 2.521, 'weight': 0.13, 'importance': 'critical'},
+        'normalized_liq': {'min': 1.158, 'max': 2.010, 'weight': 0.12, 'importance': 'low'},
+        'vol_surge': {'min': 60.354, 'max': 72.076, 'weight': 0.13, 'importance': 'high'},
+        'momentum_rsi': {'min': 41.230, 'max': 45.518, 'weight': 0.13, 'importance': 'high'},
+        'osc_momentum': {'min': 1.973, 'max': 4.491, 'weight': 0.13, 'importance': 'medium'},
+        'osc_accel': {'min': -0.438, 'max': 1.962, 'weight': 0.12, 'importance': 'medium'},
+        'volume_score': {'min': -0.551, 'max': -0.318, 'weight': 0.12, 'importance': 'low'},
+        'confidence_score': {'min': 7.148, 'max': 57.958, 'weight': 0.0, 'importance': 'low'}, # New
+        'body_conviction': {'min': 88.889, 'max': 100.000, 'weight': 0.12, 'importance': 'low'} # New
+    },
+    "Short": {
+        'ilfo_value': {'min': -2.600, 'max': -0.590, 'weight': 0.13, 'importance': 'critical'},
+        'normalized_liq': {'min': -1.359, 'max': 2.527, 'weight': 0.12, 'importance': 'low'},
+        'vol_surge': {'min': 60.449, 'max': 72.079, 'weight': 0.12, 'importance': 'high'},
+        'momentum_rsi': {'min': 53.625, 'max': 57.618, 'weight': 0.12, 'importance': 'high'},
+        'osc_momentum': {'min': -1.931, 'max': -0.160, 'weight': 0.13, 'importance': 'medium'},
+        'osc_accel': {'min': -4.572, 'max': -1.777, 'weight': 0.12, 'importance': 'medium'},
+        'volume_score': {'min': 0.737, 'max': 1.000, 'weight': 0.13, 'importance': 'low'},
+        'confidence_score': {'min': 8.149, 'max': 45.797, 'weight': 0.0, 'importance': 'low'}, # New
+        'body_conviction': {'min': 66.667, 'max': 88.889, 'weight': 0.13, 'importance': 'low'} # New
+    }
+}
+
+# --- NEW: Statistical Anchors for Median-Based Scoring ---
+STATISTICAL_ANCHORS = {
+    "Long": {
+        'ilfo_value': {'Success_Mean': 2.206, 'Success_Median': 2.399, 'Fail_Mean': 2.315},
+        'normalized_liq': {'Success_Mean': 1.746, 'Success_Median': 1.999, 'Fail_Mean': 1.798},
+        'vol_surge': {'Success_Mean': 73.493, 'Success_Median': 71.887, 'Fail_Mean': 74.562},
+        'momentum_rsi': {'Success_Mean': 44.888, 'Success_Median': 45.282, 'Fail_Mean': 45.023},
+        'osc_momentum': {'Success_Mean': 2.317, 'Success_Median': 1.983, 'Fail_Mean': 2.384},
+        'osc_accel': {'Success_Mean': 1.928, 'Success_Median': 1.858, 'Fail_Mean': 1.856},
+        'volume_score': {'Success_Mean': -0.449, 'Success_Median': -0.541, 'Fail_Mean': -0.455},
+        'confidence_score': {'Success_Mean': 4.917, 'Success_Median': 0.000, 'Fail_Mean': 4.231},
+        'body_conviction': {'Success_Mean': 64.343, 'Success_Median': 72.222, 'Fail_Mean': 62.500}
+    },
+    "Short": {
+        'ilfo_value': {'Success_Mean': -2.264, 'Success_Median': -2.532, 'Fail_Mean': -2.415},
+        'normalized_liq': {'Success_Mean': -1.842, 'Success_Median': -2.024, 'Fail_Mean': -1.865},
+        'vol_surge': {'Success_Mean': 74.617, 'Success_Median': 72.262, 'Fail_Mean': 73.775},
+        'momentum_rsi': {'Success_Mean': 54.560, 'Success_Median': 53.762, 'Fail_Mean': 54.208},
+        'osc_momentum': {'Success_Mean': -1.999, 'Success_Median': -1.788, 'Fail_Mean': -2.122},
+        'osc_accel': {'Success_Mean': -1.780, 'Success_Median': -1.809, 'Fail_Mean': -1.654},
+        'volume_score': {'Success_Mean': 0.526, 'Success_Median': 0.635, 'Fail_Mean': 0.507},
+        'confidence_score': {'Success_Mean': 5.117, 'Success_Median': 0.558, 'Fail_Mean': 4.855},
+        'body_conviction': {'Success_Mean': 62.891, 'Success_Median': 66.667, 'Fail_Mean': 60.488}
+    }
+}
+
+# --- UPDATED: Advanced Confidence Scoring Function ---
+def calculate_weighted_confidence_score(values_dict, signal_type):
+    """
+    Calculate sophisticated confidence score based on:
+    - Proximity to statistical Success_Median (vs. Fail_Mean)
+    - Weighted contribution of each parameter
+    - Penalties for values outside optimal range
+    - Bonus for multiple strong signals
+    
+    Returns: confidence_score (0-100), detailed_breakdown (dict)
+    """
+    if signal_type not in ["Long", "Short"]:
+        logging.warning(f"Unsupported signal type for confidence scoring: {signal_type}")
+        return 0.0, {}
+    
+    ranges = OPTIMAL_RANGES[signal_type]
+    total_score = 0.0
+    max_possible_score = 0.0
+    breakdown = {}
+    critical_hits = 0
+    high_hits = 0
+    
+    # --- Median-based logic for ILFO model ---
+    for param, config in ranges.items():
+        if param not in values_dict or pd.isna(values_dict[param]):
+            breakdown[param] = {
+                'value': None, 'status': 'missing', 'contribution': 0.0,
+                'max_contribution': config['weight'] * 100
+            }
+            max_possible_score += config['weight'] * 100
+            continue
+        
+        value = values_dict[param]
+        weight = config['weight']
+        importance = config['importance']
+        
+        if param not in STATISTICAL_ANCHORS[signal_type]:
+            # This parameter (from OPTIMAL_RANGES) doesn't have a statistical anchor.
+            # Score it as 0 but count its max possible score.
+            breakdown[param] = {
+                'value': value, 'status': 'no_stats', 'contribution': 0.0,
+                'max_contribution': config['weight'] * 100, 'importance': importance
+            }
+            max_possible_score += config['weight'] * 100
+            continue
+        
+        stats = STATISTICAL_ANCHORS[signal_type][param]
+        target_median = stats['Success_Median']
+        fail_mean = stats['Fail_Mean']
+        
+        # Calculate spread, with fallback for division by zero
+        spread = abs(target_median - fail_mean)
+        if spread < 1e-6:
+            spread = abs(target_median * 0.1) # 10% of median as a fallback
+            if spread < 1e-6: # If median is also zero
+                spread = 0.1 # Absolute fallback
+        
+        distance = abs(value - target_median)
+        
+        # Proximity score: 1.0 at median, 0.0 at/beyond fail_mean
+        proximity_score = max(0.0, 1.0 - (distance / spread))
+        
+        contribution = weight * proximity_score * 100
+        status = 'far_from_median'
+        
+        # Check for "hit" status
+        if proximity_score > 0.0: # Is it better than the fail_mean?
+            status = 'near_median'
+            # Is it more than halfway to the median?
+            if proximity_score > 0.5: 
+                 status = 'optimal_proximity'
+                 if importance == 'critical':
+                     critical_hits += 1
+                 elif importance == 'high':
+                     high_hits += 1
+
+        breakdown[param] = {
+            'value': value,
+            'target_median': target_median,
+            'fail_mean': fail_mean,
+            'status': status,
+            'proximity_score': proximity_score,
+            'contribution': contribution,
+            'max_contribution': weight * 100,
+            'importance': importance
+        }
+        
+        total_score += contribution
+        max_possible_score += weight * 100
+
+    
+    # --- COMMON LOGIC ---
+    # Apply synergy bonus if multiple critical/high criteria are met
+    synergy_bonus = 0
+    if critical_hits >= 2:
+        synergy_bonus = 5  # 5 point bonus for 2+ critical hits
+    if critical_hits >= 1 and high_hits >= 2:
+        synergy_bonus = max(synergy_bonus, 3)  # 3 point bonus for mixed strong signals
+    
+    total_score = min(total_score + synergy_bonus, 100)
+    
+    # Calculate final confidence percentage
+    confidence_score = (total_score / max_possible_score) * 100 if max_possible_score > 0 else 0
+    
+    breakdown['summary'] = {
+        'raw_score': total_score,
+        'max_possible': max_possible_score,
+        'synergy_bonus': synergy_bonus,
+        'critical_hits': critical_hits,
+        'high_hits': high_hits,
+        'confidence_percentage': confidence_score
+    }
+    
+    return confidence_score, breakdown
+
+def get_confidence_grade(score):
+    """Convert confidence score to letter grade"""
+    if score >= 90:
+        return 'A+', 'exceptional'
+    elif score >= 80:
+        return 'A', 'excellent'
+    elif score >= 70:
+        return 'B+', 'good'
+    elif score >= 60:
+        return 'B', 'acceptable'
+    elif score >= 50:
+        return 'C+', 'marginal'
+    elif score >= 40:
+        return 'C', 'weak'
+    else:
+        return 'D', 'poor'
+
+# --- Array-Compiled Confidence Scoring ---
+# The same median-proximity scoring as calculate_weighted_confidence_score, with
+# the tables compiled once into per-side arrays so a whole result set is scored
+# in a single pass over an N x params matrix.
+GRADE_THRESHOLDS = [90, 80, 70, 60, 50, 40]
+GRADE_LABELS = ['A+', 'A', 'B+', 'B', 'C+', 'C']
+GRADE_CLASSES = ['exceptional', 'excellent', 'good', 'acceptable', 'marginal', 'weak']
+
+def compile_scoring_tables(ranges=None, anchors=None):
+    """Compile OPTIMAL_RANGES / STATISTICAL_ANCHORS into per-side NumPy arrays"""
+    ranges = OPTIMAL_RANGES if ranges is None else ranges
+    anchors = STATISTICAL_ANCHORS if anchors is None else anchors
+    
+    compiled = {}
+    for side, side_ranges in ranges.items():
+        params = list(side_ranges.keys())
+        side_anchors = anchors.get(side, {})
+        medians = np.array([side_anchors[p]['Success_Median'] if p in side_anchors else np.nan for p in params], dtype=float)
+        fail_means = np.array([side_anchors[p]['Fail_Mean'] if p in side_anchors else np.nan for p in params], dtype=float)
+        
+        spreads = np.abs(medians - fail_means)
+        spreads = np.where(spreads < 1e-6, np.abs(medians * 0.1), spreads)
+        spreads = np.where(spreads < 1e-6, 0.1, spreads)
+        
+        max_possible_score = 0.0
+        for p in params:
+            max_possible_score += side_ranges[p]['weight'] * 100
+        
+        compiled[side] = {
+            'params': params,
+            'weights': np.array([side_ranges[p]['weight'] for p in params], dtype=float),
+            'medians': medians,
+            'fail_means': fail_means,
+            'spreads': spreads,
+            'anchored': np.array([p in side_anchors for p in params]),
+            'critical': np.array([side_ranges[p]['importance'] == 'critical' for p in params]),
+            'high': np.array([side_ranges[p]['importance'] == 'high' for p in params]),
+            'max_possible_score': max_possible_score
+        }
+    return compiled
+
+SCORING_TABLES = compile_scoring_tables()
+
+# --- Recalibrated Scoring Tables ---
+# ilfo_backtest writes recalibrated tables; pointing this variable at that file makes
+# every process importing ilfo (app, CLI, pool workers) score with them
+SCORING_TABLES_ENV = "SANKET_SCORING_TABLES"
+
+def load_scoring_tables(path=None):
+    """Swap OPTIMAL_RANGES / STATISTICAL_ANCHORS for the ones in a scoring_tables.json ($SANKET_SCORING_TABLES by default).
+
+    The tables are replaced in place so every module holding them sees the
+    change; returns whether a file was loaded. A bad file is logged and ignored.
+    """
+    path = path or os.environ.get(SCORING_TABLES_ENV, "").strip()
+    if not path:
+        return False
+    try:
+        with open(path, 'r') as f:
+            tables = json.load(f)
+        ranges, anchors = tables['OPTIMAL_RANGES'], tables['STATISTICAL_ANCHORS']
+        compiled = compile_scoring_tables(ranges, anchors)
+    except (OSError, ValueError, KeyError, TypeError, AttributeError) as e:
+        logging.warning(f"Ignoring scoring tables in {path}: {e}")
+        return False
+    
+    for table, loaded in [(OPTIMAL_RANGES, ranges), (STATISTICAL_ANCHORS, anchors), (SCORING_TABLES, compiled)]:
+        table.clear()
+        table.update(loaded)
+    logging.info(f"Confidence scoring tables loaded from {path}")
+    return True
+
+load_scoring_tables()
+
+def confidence_grades(scores):
+    """Vectorized get_confidence_grade: (grades, classes) arrays"""
+    scores = np.asarray(scores, dtype=float)
+    conditions = [scores >= threshold for threshold in GRADE_THRESHOLDS]
+    return (
+        np.select(conditions, GRADE_LABELS, default='D').astype(object),
+        np.select(conditions, GRADE_CLASSES, default='poor').astype(object)
+    )
+
+def score_confidence_batch(frame, sides, tables=None):
+    """Confidence, grade, synergy bonus and per-parameter contributions for every row of frame.
+
+    frame holds one column per scoring parameter (absent columns count as
+    missing) and sides gives "Long" or "Short" per row. Results match
+    calculate_weighted_confidence_score row for row.
+    """
+    tables = SCORING_TABLES if tables is None else tables
+    sides = np.asarray(sides, dtype=object)
+    n = len(frame)
+    
+    confidence = np.zeros(n)
+    synergy = np.zeros(n)
+    critical_hits = np.zeros(n, dtype=int)
+    high_hits = np.zeros(n, dtype=int)
+    contributions = {}
+    
+    for side, table in tables.items():
+        rows = np.flatnonzero(sides == side)
+        if len(rows) == 0:
+            continue
+        
+        total_score = np.zeros(len(rows))
+        for k, param in enumerate(table['params']):
+            if param in frame.columns:
+                values = pd.to_numeric(frame[param], errors='coerce').to_numpy(dtype=float, na_value=np.nan)[rows]
+            else:
+                values = np.full(len(rows), np.nan)
+            
+            # Proximity score: 1.0 at median, 0.0 at/beyond fail_mean
+            proximity = np.maximum(0.0, 1.0 - np.abs(values - table['medians'][k]) / table['spreads'][k])
+            scored = ~np.isnan(values) & table['anchored'][k]
+            contribution = np.where(scored, table['weights'][k] * proximity * 100, 0.0)
+            
+            if table['critical'][k]:
+                critical_hits[rows] += scored & (proximity > 0.5)
+            elif table['high'][k]:
+                high_hits[rows] += scored & (proximity > 0.5)
+            
+            total_score += contribution
+            contributions.setdefault(f"{param}_contribution", np.zeros(n))[rows] = contribution
+        
+        # Synergy bonus for multiple critical/high criteria
+        side_synergy = np.where(critical_hits[rows] >= 2, 5, 0)
+        side_synergy = np.where((critical_hits[rows] >= 1) & (high_hits[rows] >= 2), np.maximum(side_synergy, 3), side_synergy)
+        total_score = np.minimum(total_score + side_synergy, 100)
+        
+        max_possible_score = table['max_possible_score']
+        synergy[rows] = side_synergy
+        confidence[rows] = (total_score / max_possible_score) * 100 if max_possible_score > 0 else 0
+    
+    grades, grade_classes = confidence_grades(confidence)
+    return pd.DataFrame({
+        'confidence_score': confidence,
+        'confidence_grade': grades,
+        'confidence_class': grade_classes,
+        'synergy_bonus': synergy,
+        'critical_hits': critical_hits,
+        'high_hits': high_hits,
+        **contributions
+    }, index=frame.index)
+
+# --- ILFO Model Parameters ---
+ILFO_PARAMS = {
+    'adaptiveLength': 21,
+    'microLength': 9,
+    'impactWindow': 5,
+    'devMultiplier': 2.0,
+    'signalSmooth': 5,
+    'divLookback': 10,
+    'volThreshold': 1.2
+}
+
+EPSILON = 1e-10
+
+def build_ilfo_error(ticker, signal, details, e=""):
+    """Build the ILFO record for a ticker that could not be scored"""
+    logging.error(f"Error for {ticker}: {details} - {e}")
+    return {
+        "ticker": ticker, "signal": signal, "details": details, "pct_change": np.nan,
+        "confidence_score": 0.0, "confidence_grade": "D", "confidence_class": "poor",
+        "ilfo_value": np.nan, "vol_surge": np.nan, "momentum_rsi": np.nan,
+        "osc_momentum": np.nan, "osc_accel": np.nan, "volume_score": np.nan,
+        "normalized_liq": np.nan
+    }
+
+def build_ilfo_result(ticker, isExtremeLong, isBullishDiv, isExtremeShort, isBearishDiv,
+                      values_for_scoring, pct_change_val, confidence=None):
+    """Build the ILFO result record from target-date flags and criteria values.
+
+    confidence is an optional precomputed (score, grade, class) for actionable
+    signals, as produced by score_confidence_batch. details is left empty;
+    format_ilfo_details builds it from the criteria values when it is shown.
+    """
+    signal_text = "Neutral"
+    if isExtremeLong and isBullishDiv:
+        signal_text = "Extreme Long"
+    elif isExtremeShort and isBearishDiv:
+        signal_text = "Extreme Short"
+    elif isExtremeLong:
+        signal_text = "Long"
+    elif isBullishDiv:
+        signal_text = "Divergence Long"
+    elif isExtremeShort:
+        signal_text = "Short"
+    elif isBearishDiv:
+        signal_text = "Divergence Short"
+
+    nl_value = values_for_scoring['normalized_liq']
+    ilfo_value = values_for_scoring['ilfo_value']
+    vol_value = values_for_scoring['vol_surge']
+    mom_rsi_val = values_for_scoring['momentum_rsi']
+    osc_mom_val = values_for_scoring['osc_momentum']
+    osc_accel_val = values_for_scoring['osc_accel']
+    vol_score_val = values_for_scoring['volume_score']
+
+    # Only calculate confidence for actionable signals
+    if "Long" in signal_text or "Short" in signal_text:
+        signal_type_for_scoring = signal_text.split()[-1] # Gets "Long" or "Short"
+        if signal_type_for_scoring not in ["Long", "Short"]:
+            signal_type_for_scoring = "Long" if "Long" in signal_text else "Short"
+        
+        if confidence is not None:
+            confidence_score, grade, grade_class = confidence
+        else:
+            confidence_score, breakdown = calculate_weighted_confidence_score(
+                values_for_scoring, 
+                signal_type_for_scoring
+            )
+            grade, grade_class = get_confidence_grade(confidence_score)
+    else:
+        confidence_score = 0.0
+        grade = "N/A"
+        grade_class = "neutral"
+    # --- END NEW ---
+
+    return {
+        "ticker": ticker,
+        "signal": signal_text,
+        "details": None,
+        "pct_change": pct_change_val,
+        "confidence_score": confidence_score,
+        "confidence_grade": grade,
+        "confidence_class": grade_class,
+        "ilfo_value": ilfo_value,
+        "vol_surge": vol_value,
+        "momentum_rsi": mom_rsi_val,
+        "osc_momentum": osc_mom_val,
+        "osc_accel": osc_accel_val,
+        "volume_score": vol_score_val,
+        "normalized_liq": nl_value
+    }
+
+# --- Details Text ---
+# (label, criteria key, printf format) in display order; the HTML breaks the line after MomRSI
+DETAIL_FIELDS = [
+    ("ILFO", 'ilfo_value', '%.2f'), ("NL", 'normalized_liq', '%.2f'),
+    ("VolSurge", 'vol_surge', '%.1f'), ("MomRSI", 'momentum_rsi', '%.2f'),
+    ("OscMom", 'osc_momentum', '%.2f'), ("OscAcc", 'osc_accel', '%.2f'),
+    ("VolScore", 'volume_score', '%.2f')
+]
+DETAIL_LINE_BREAK = 4
+
+def format_ilfo_details(signal, values, html=True):
+    """Details text for a scored record, criteria inside the signal side's optimal range highlighted.
+
+    values maps the criteria keys to numbers (a record dict or a results-frame
+    row). html=False gives the same text without markup, for file exports.
+    """
+    side = "Long" if "Long" in signal else "Short" if "Short" in signal else None
+    ranges = OPTIMAL_RANGES.get(side, {})
+    in_range = "pct-positive" if side == "Long" else "pct-negative"
+
+    parts = []
+    for label, param, fmt in DETAIL_FIELDS:
+        value = values[param]
+        text = fmt % value
+        if html:
+            bounds = ranges.get(param)
+            css = in_range if bounds and bounds['min'] <= value <= bounds['max'] else "signal-neutral"
+            text = f'<span class="{css}">{text}</span>'
+        parts.append(f"{label}: {text}")
+    return " | ".join(parts[:DETAIL_LINE_BREAK]) + ("<br>" if html else " | ") + " | ".join(parts[DETAIL_LINE_BREAK:])
+
+def fill_ilfo_details(frame, signal_column='signal', details_column='details', html=True):
+    """frame's details column with format_ilfo_details filled in wherever a scored row has none yet"""
+    details = frame[details_column].astype(object)
+    missing = details.isna().to_numpy()
+    if missing.any():
+        rows = frame.loc[missing]
+        details[missing] = [
+            format_ilfo_details(signal, values, html)
+            for signal, values in zip(rows[signal_column], rows[[param for _, param, _ in DETAIL_FIELDS]].to_dict('records'))
+        ]
+    return details
+
+# --- Vectorized Rolling Kernels ---
+# Drop-in replacements for the rolling(...).apply callbacks in compute_ilfo_signal.
+# Both accept a 1-D series or a dates x tickers array and reproduce the callbacks'
+# min_periods and edge behaviour exactly.
+def rolling_body_conviction(values, window, min_periods=2):
+    """Percentile rank of each bar's body against the prior (window - 1) bodies"""
+    values = np.asarray(values, dtype=float)
+    flat = values.ndim == 1
+    if flat:
+        values = values[:, None]
+    
+    n_dates = values.shape[0]
+    valid = ~np.isnan(values)
+    wins = np.zeros(values.shape)
+    valid_count = valid.astype(float)
+    for lag in range(1, min(window, n_dates)):
+        wins[lag:] += values[lag:] > values[:-lag]
+        valid_count[lag:] += valid[:-lag]
+    
+    prior = np.minimum(np.arange(n_dates), window - 1).astype(float)[:, None]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        conviction = wins / prior * 100
+    conviction = np.where(valid & (valid_count >= max(min_periods, 2)), conviction, 0.0)
+    return conviction[:, 0] if flat else conviction
+
+def rolling_pivot(values, lookback, extreme):
+    """Mask of bars that equal the low/high of a full centered (2 * lookback + 1) window"""
+    values = np.asarray(values, dtype=float)
+    flat = values.ndim == 1
+    if flat:
+        values = values[:, None]
+    
+    window = lookback * 2 + 1
+    frame = pd.DataFrame(values).rolling(window, center=True, min_periods=lookback + 1)
+    rolled = (frame.min() if extreme == 'low' else frame.max()).to_numpy()
+    full = np.zeros(values.shape[0], dtype=bool)
+    full[lookback:values.shape[0] - lookback] = True
+    
+    mask = full[:, None] & (values == rolled)
+    return mask[:, 0] if flat else mask
+
+# --- ILFO Signal Calculation (Keep existing, add confidence scoring) ---
+def compute_ilfo_signal(ticker, df, end_date, use_kernels=True):
+    """ILFO signal with enhanced confidence scoring"""
+    # Only the per-ticker reference path needs pandas_ta; deferred so importing ilfo stays cheap
+    import pandas_ta as ta
+    
+    adaptiveLength = ILFO_PARAMS['adaptiveLength']
+    microLength = ILFO_PARAMS['microLength']
+    impactWindow = ILFO_PARAMS['impactWindow']
+    devMultiplier = ILFO_PARAMS['devMultiplier']
+    signalSmooth = ILFO_PARAMS['signalSmooth']
+    divLookback = ILFO_PARAMS['divLookback']
+    volThreshold = ILFO_PARAMS['volThreshold']
+
+    def get_error_dict(signal, details, e=""):
+        return build_ilfo_error(ticker, signal, details, e)
+    
+    try:
+        if df.empty or len(df) < adaptiveLength * 2:
+            return get_error_dict("Insufficient Data", "N/A")
+        
+        df = df.copy()
+        df = df.ffill().bfill()
+        
+        if df['Close'].isnull().all() or df['Volume'].isnull().all():
+            return get_error_dict("Insufficient Data", "Missing main series")
+        
+        df['Volume'] = df['Volume'].fillna(0).replace(0, 1).clip(lower=1)
+        
+        if (df['Close'] <= 0).any():
+            return get_error_dict("Invalid Data", "Non-positive prices detected")
+        
+        # [Keep all existing ILFO calculation logic - lines 29-209 from original]
+        # Market Microstructure
+        bodySize = (df['Close'] - df['Open']).abs()
+        spreadProxy = (df['High'] + df['Low']) / 2 - df['Open']
+        
+        volMa = ta.sma(df['Volume'], adaptiveLength)
+        volMa = volMa.fillna(df['Volume'].mean()).replace(0, EPSILON).clip(lower=EPSILON)
+        
+        vwapSpread = ta.sma(spreadProxy * df['Volume'] / volMa, adaptiveLength)
+        vwapSpread = vwapSpread.fillna(0)
+        
+        priceImpact = ta.sma((df['Close'] - df['Close'].shift(impactWindow)) * df['Volume'] / volMa, adaptiveLength)
+        priceImpact = priceImpact.fillna(0)
+        
+        liquidityScore = vwapSpread - priceImpact
+        liquidityScore = liquidityScore.replace([np.inf, -np.inf], 0).fillna(0)
+        
+        liqMean = ta.sma(liquidityScore, adaptiveLength).fillna(0)
+        liqStdev = ta.stdev(liquidityScore, adaptiveLength)
+        liqStdev = liqStdev.fillna(1).replace(0, 1).clip(lower=EPSILON)
+        
+        normalizedLiq = (liquidityScore - liqMean) / liqStdev
+        normalizedLiq = normalizedLiq.replace([np.inf, -np.inf], 0).fillna(0).clip(-10, 10)
+
+        # Volume Flow Analysis
+        volStdev = ta.stdev(df['Volume'], microLength)
+        volStdev = volStdev.fillna(df['Volume'].std()).replace(0, EPSILON).clip(lower=EPSILON)
+        
+        volZscore = (df['Volume'] - volMa) / volStdev
+        volZscore = volZscore.replace([np.inf, -np.inf], 0).fillna(0).clip(-5, 5)
+        
+        volSurge = (50 + (volZscore * 20)).clip(0, 100).fillna(50)
+        
+        volDirection = np.where(df['Close'] > df['Open'], volSurge, -volSurge)
+        
+        typicalPrice = (df['High'] + df['Low'] + df['Close']) / 3
+        moneyFlow = typicalPrice * df['Volume']
+        moneyFlow = moneyFlow.replace([np.inf, -np.inf], 0).fillna(0)
+        
+        posFlow = ta.sma(moneyFlow * (df['Close'] > df['Close'].shift(1)), microLength)
+        negFlow = ta.sma(moneyFlow * (df['Close'] < df['Close'].shift(1)), microLength)
+        posFlow = posFlow.fillna(0)
+        negFlow = negFlow.fillna(0)
+        
+        accumFlow = (posFlow - negFlow) / (posFlow + negFlow + EPSILON)
+        accumFlow = accumFlow.replace([np.inf, -np.inf], 0).fillna(0).clip(-1, 1)
+        
+        volumeScore = (volDirection / 100) * 0.5 + accumFlow * 0.5
+        volumeScore = volumeScore.replace([np.inf, -np.inf], 0).fillna(0)
+
+        # Momentum & Conviction
+        def safe_body_conviction(x):
+            try:
+                if len(x) < 2 or pd.isna(x.iloc[-1]):
+                    return 0.0
+                return float((x.iloc[-1] > x.iloc[:-1]).mean() * 100)
+            except:
+                return 0.0
+        
+        if use_kernels:
+            bodyConviction = pd.Series(rolling_body_conviction(bodySize, microLength + 1), index=df.index)
+        else:
+            bodyConviction = bodySize.rolling(window=microLength + 1, min_periods=2).apply(
+                safe_body_conviction, raw=False
+            ).fillna(0)
+        
+        directionConviction = np.where(df['Close'] > df['Open'], bodyConviction, -bodyConviction)
+        
+        price_change = df['Close'].diff()
+        price_base = df['Close'].shift(1).replace(0, EPSILON).clip(lower=EPSILON)
+        
+        priceVelocity = (price_change / price_base) * 10000
+        priceVelocity = priceVelocity.replace([np.inf, -np.inf], 0).fillna(0).clip(-1000, 1000)
+        
+        momentumRsi = ta.rsi(priceVelocity, microLength)
+        momentumRsi = momentumRsi.fillna(50).clip(0, 100)
+
+        # Statistical Bounds
+        priceMean = ta.sma(df['Close'], adaptiveLength).fillna(df['Close'])
+        priceStdev = ta.stdev(df['Close'], adaptiveLength)
+        priceStdev = priceStdev.fillna(df['Close'].std()).replace(0, EPSILON).clip(lower=EPSILON)
+        
+        upperBound = priceMean + devMultiplier * priceStdev
+        lowerBound = priceMean - devMultiplier * priceStdev
+
+        inOverbought = df['Close'] > upperBound
+        inOversold = df['Close'] < lowerBound
+
+        # Composite Oscillator
+        rawScore = (normalizedLiq * 0.30) + \
+                   (volumeScore * 0.25) + \
+                   (directionConviction / 100 * 0.25) + \
+                   ((momentumRsi - 50) / 50 * 0.20)
+        
+        rawScore = rawScore.replace([np.inf, -np.inf], 0).fillna(0).clip(-5, 5)
+        
+        oscillator = (rawScore * 8)
+        oscillator = oscillator.replace([np.inf, -np.inf], 0).fillna(0).clip(-10, 10)
+        
+        signal = ta.sma(oscillator, signalSmooth)
+        signal = signal.fillna(0).clip(-10, 10)
+        
+        oscMomentum = oscillator.diff(2).fillna(0).clip(-15, 15)
+        oscAccel = oscMomentum.diff().fillna(0).clip(-15, 15)
+
+        # Divergence Detection
+        def safe_is_pivot_low(x):
+            try:
+                if len(x) < divLookback * 2 + 1:
+                    return 0
+                mid = divLookback
+                return 1 if x.iloc[mid] == x.min() else 0
+            except:
+                return 0
+        
+        def safe_is_pivot_high(x):
+            try:
+                if len(x) < divLookback * 2 + 1:
+                    return 0
+                mid = divLookback
+                return 1 if x.iloc[mid] == x.max() else 0
+            except:
+                return 0
+        
+        if use_kernels:
+            price_lows = pd.Series(rolling_pivot(df['Low'], divLookback, 'low').astype(float), index=df.index)
+            price_highs = pd.Series(rolling_pivot(df['High'], divLookback, 'high').astype(float), index=df.index)
+        else:
+            price_lows = df['Low'].rolling(window=divLookback*2+1, center=True, min_periods=divLookback+1).apply(
+                safe_is_pivot_low, raw=False
+            ).fillna(0)
+            
+            price_highs = df['High'].rolling(window=divLookback*2+1, center=True, min_periods=divLookback+1).apply(
+                safe_is_pivot_high, raw=False
+            ).fillna(0)
+        
+        pivot_lows_idx = df.index[price_lows > 0]
+        pivot_highs_idx = df.index[price_highs > 0]
+        
+        df['last_pivot_low_price'] = df.loc[pivot_lows_idx, 'Low'].reindex(df.index).ffill().fillna(df['Low'])
+        df['last_pivot_low_osc'] = oscillator.loc[pivot_lows_idx].reindex(df.index).ffill().fillna(oscillator)
+        
+        df['last_pivot_high_price'] = df.loc[pivot_highs_idx, 'High'].reindex(df.index).ffill().fillna(df['High'])
+        df['last_pivot_high_osc'] = oscillator.loc[pivot_highs_idx].reindex(df.index).ffill().fillna(oscillator)
+
+        volConfirm = df['Volume'] > volMa * 0.8
+        
+        priceLL = df['Low'] < (df['last_pivot_low_price'] * 0.998)
+        oscHL = oscillator > (df['last_pivot_low_osc'] * 1.05)
+        bullishDiv = priceLL & oscHL & inOversold & volConfirm
+        
+        priceHH = df['High'] > (df['last_pivot_high_price'] * 1.002)
+        oscLH = oscillator < (df['last_pivot_high_osc'] * 0.95)
+        bearishDiv = priceHH & oscLH & inOverbought & volConfirm
+
+        # Signal Generation
+        extremeLong = inOversold & (oscMomentum > 0) & (oscAccel > 0) & (volSurge > volThreshold * 50)
+        extremeShort = inOverbought & (oscMomentum < 0) & (oscAccel < 0) & (volSurge > volThreshold * 50)
+
+        # Extract values at target date
+        analysis_datetime = datetime.combine(end_date, datetime.max.time())
+        df.index = pd.to_datetime(df.index)
+        target_date = df.index.asof(analysis_datetime)
+        
+        if pd.isna(target_date):
+            return get_error_dict("No Data", f"No data at {end_date.date()}")
+        
+        try:
+            test_values = [
+                oscillator.loc[target_date],
+                volSurge.loc[target_date],
+                normalizedLiq.loc[target_date],
+                momentumRsi.loc[target_date],
+                oscMomentum.loc[target_date],
+                oscAccel.loc[target_date],
+                volumeScore.loc[target_date]
+            ]
+            
+            for val in test_values:
+                if pd.isna(val) or np.isinf(val):
+                    return get_error_dict("No Data", "Invalid calculation result")
+                    
+        except (KeyError, IndexError):
+            return get_error_dict("No Data", "Target date not in index")
+
+        isExtremeLong = bool(extremeLong.loc[target_date])
+        isBullishDiv = bool(bullishDiv.loc[target_date])
+        isExtremeShort = bool(extremeShort.loc[target_date])
+        isBearishDiv = bool(bearishDiv.loc[target_date])
+
+        nl_value = float(normalizedLiq.loc[target_date])
+        ilfo_value = float(oscillator.loc[target_date])
+        vol_value = float(volSurge.loc[target_date])
+        mom_rsi_val = float(momentumRsi.loc[target_date])
+        osc_mom_val = float(oscMomentum.loc[target_date])
+        osc_accel_val = float(oscAccel.loc[target_date])
+        vol_score_val = float(volumeScore.loc[target_date])
+
+        # --- NEW: Calculate Confidence Score ---
+        # --- MODIFIED: Added 'normalized_liq' to the dictionary ---
+        values_for_scoring = {
+            'ilfo_value': ilfo_value,
+            'normalized_liq': nl_value,
+            'vol_surge': vol_value,
+            'momentum_rsi': mom_rsi_val,
+            'osc_momentum': osc_mom_val,
+            'osc_accel': osc_accel_val,
+            'volume_score': vol_score_val
+        }
+        
+        try:
+            prev_close = df['Close'].shift(1).loc[target_date]
+            curr_close = df['Close'].loc[target_date]
+            if pd.notna(prev_close) and prev_close > 0:
+                pct_change_val = ((curr_close / prev_close) - 1) * 100
+            else:
+                pct_change_val = np.nan
+        except:
+            pct_change_val = np.nan
+            
+        return build_ilfo_result(
+            ticker, isExtremeLong, isBullishDiv, isExtremeShort, isBearishDiv,
+            values_for_scoring, pct_change_val
+        )
+
+    except Exception as e:
+        return get_error_dict("Error (Calc)", str(e), e)
+
+
+# --- Panel-Vectorized ILFO Engine ---
+# Scores a whole universe at once from dates x tickers arrays. The rolling
+# helpers mirror pandas_ta's (non-talib) sma/stdev/rsi and run pandas' window
+# kernels column-wise, so every column matches compute_ilfo_signal exactly.
+PANEL_FIELDS = ['Open', 'High', 'Low', 'Close', 'Volume']
+CRITERIA_SERIES = {
+    'ilfo_value': 'oscillator',
+    'normalized_liq': 'normalizedLiq',
+    'vol_surge': 'volSurge',
+    'momentum_rsi': 'momentumRsi',
+    'osc_momentum': 'oscMomentum',
+    'osc_accel': 'oscAccel',
+    'volume_score': 'volumeScore'
+}
+
+RESULT_COLUMNS = [
+    'ticker', 'signal', 'details', 'pct_change',
+    'confidence_score', 'confidence_grade', 'confidence_class'
+] + list(CRITERIA_SERIES.keys())
+
+def results_frame(records):
+    """Per-ticker ILFO records (build_ilfo_result/build_ilfo_error dicts) as a RESULT_COLUMNS frame"""
+    return pd.DataFrame.from_records(list(records), columns=RESULT_COLUMNS)
+
+def _rolling_mean(values, window):
+    return pd.DataFrame(values).rolling(window, min_periods=window).mean().to_numpy()
+
+def _rolling_stdev(values, window):
+    return np.sqrt(pd.DataFrame(values).rolling(window, min_periods=window).var(1).to_numpy())
+
+def _rsi_averages(values, length):
+    negative = _diff(values, 1)
+    positive = negative.copy()
+    positive[positive < 0] = 0
+    negative[negative > 0] = 0
+    positive_avg = pd.DataFrame(positive).ewm(alpha=1.0 / length, min_periods=length).mean().to_numpy()
+    negative_avg = pd.DataFrame(negative).ewm(alpha=1.0 / length, min_periods=length).mean().to_numpy()
+    return positive_avg, negative_avg
+
+def _rsi(values, length, averages=None):
+    positive_avg, negative_avg = averages if averages is not None else _rsi_averages(values, length)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return 100 * positive_avg / (positive_avg + np.abs(negative_avg))
+
+def _shift(values, periods):
+    shifted = np.full_like(values, np.nan)
+    shifted[periods:] = values[:-periods]
+    return shifted
+
+def _diff(values, periods):
+    return values - _shift(values, periods)
+
+def _fillna(values, fill):
+    return np.where(np.isnan(values), fill, values)
+
+def _finite_or_zero(values):
+    return np.where(np.isinf(values), 0, values)
+
+def _column_stat(values, stat):
+    # Reduced per column through pandas so fill values match the per-ticker path bit-for-bit
+    return np.array([getattr(pd.Series(values[:, j]), stat)() for j in range(values.shape[1])])
+
+def _last_pivot_value(values, mask, fallback, delay=0):
+    # Forward-fill the value seen at the most recent pivot, falling back before the first one.
+    # delay > 0 only lets a pivot count from delay bars after it prints.
+    positions = np.where(mask, np.arange(values.shape[0])[:, None], -1)
+    positions = np.maximum.accumulate(positions, axis=0)
+    if delay:
+        positions = np.vstack([np.full((delay, values.shape[1]), -1), positions[:-delay]])
+    columns = np.arange(values.shape[1])[None, :]
+    last = values[np.maximum(positions, 0), columns]
+    return np.where(positions >= 0, last, fallback)
+
+def build_ohlcv_panel(data_dict):
+    """Stack per-ticker OHLCV frames that share one date index into dates x tickers arrays"""
+    dates = None
+    tickers, leftovers = [], []
+    for ticker, df in data_dict.items():
+        if dates is None and not df.empty:
+            dates = df.index
+        if dates is not None and df.index.equals(dates) and all(f in df.columns for f in PANEL_FIELDS):
+            tickers.append(ticker)
+        else:
+            leftovers.append(ticker)
+    
+    if not tickers or not dates.is_unique or not dates.is_monotonic_increasing:
+        return None, [], {}, list(data_dict.keys())
+    
+    panel = {}
+    for field in PANEL_FIELDS:
+        values = np.empty((len(dates), len(tickers)))
+        for j, ticker in enumerate(tickers):
+            values[:, j] = pd.to_numeric(data_dict[ticker][field], errors='coerce').to_numpy(dtype=float, na_value=np.nan)
+        panel[field] = values
+    return dates, tickers, panel, leftovers
+
+def screen_panel(tickers, panel):
+    """Forward/back-fill the panel and split off tickers the ILFO model cannot score"""
+    errors = {}
+    filled = {f: pd.DataFrame(panel[f]).ffill().bfill().to_numpy() for f in PANEL_FIELDS}
+    
+    missing = np.isnan(filled['Close']).all(axis=0) | np.isnan(filled['Volume']).all(axis=0)
+    with np.errstate(invalid='ignore'):
+        non_positive = (filled['Close'] <= 0).any(axis=0)
+    for j in np.flatnonzero(missing):
+        errors[j] = build_ilfo_error(tickers[j], "Insufficient Data", "Missing main series")
+    for j in np.flatnonzero(~missing & non_positive):
+        errors[j] = build_ilfo_error(tickers[j], "Invalid Data", "Non-positive prices detected")
+    
+    return filled, errors, np.flatnonzero(~missing & ~non_positive)
+
+def _panel_inputs(filled, cols):
+    # Everything ilfo_panel_series derives without touching an ILFO parameter
+    open_ = filled['Open'][:, cols]
+    high = filled['High'][:, cols]
+    low = filled['Low'][:, cols]
+    close = filled['Close'][:, cols]
+    volume = filled['Volume'][:, cols]
+    volume = np.clip(np.where(np.isnan(volume) | (volume == 0), 1, volume), 1, None)
+    
+    typicalPrice = (high + low + close) / 3
+    moneyFlow = _fillna(_finite_or_zero(typicalPrice * volume), 0)
+    
+    prevClose = _shift(close, 1)
+    priceBase = np.clip(np.where(prevClose == 0, EPSILON, prevClose), EPSILON, None)
+    priceVelocity = np.clip(_fillna(_finite_or_zero((_diff(close, 1) / priceBase) * 10000), 0), -1000, 1000)
+    
+    return {
+        'open': open_, 'high': high, 'low': low, 'close': close, 'volume': volume,
+        'bodySize': np.abs(close - open_), 'spreadProxy': (high + low) / 2 - open_,
+        'prevClose': prevClose, 'posFlowTerm': moneyFlow * (close > prevClose), 'negFlowTerm': moneyFlow * (close < prevClose),
+        'priceVelocity': priceVelocity
+    }
+
+def ilfo_panel_series(filled, cols, point_in_time=False, params=None, memo=None):
+    """Full ILFO indicator arrays (dates x len(cols)) for the screened panel columns.
+
+    With point_in_time=True a pivot only counts once its right-hand window
+    has printed, so every row sees what a scan run on that date would have.
+    params overrides ILFO_PARAMS. Calls over the same filled/cols that share
+    a memo dict compute each intermediate once per value of the parameters
+    it depends on, which is what makes parameter sweeps cheap.
+    """
+    params = ILFO_PARAMS if params is None else params
+    adaptiveLength = params['adaptiveLength']
+    microLength = params['microLength']
+    impactWindow = params['impactWindow']
+    devMultiplier = params['devMultiplier']
+    divLookback = params['divLookback']
+    volThreshold = params['volThreshold']
+    
+    def shared(key, compute):
+        if memo is None:
+            return compute()
+        if key not in memo:
+            memo[key] = compute()
+        return memo[key]
+    
+    inputs = shared(('inputs',), lambda: _panel_inputs(filled, cols))
+    open_, high, low, close, volume = inputs['open'], inputs['high'], inputs['low'], inputs['close'], inputs['volume']
+    bodySize, spreadProxy, prevClose = inputs['bodySize'], inputs['spreadProxy'], inputs['prevClose']
+    posFlowTerm, negFlowTerm, priceVelocity = inputs['posFlowTerm'], inputs['negFlowTerm'], inputs['priceVelocity']
+    
+    # Market Microstructure
+    def volume_average():
+        volMa = _fillna(_rolling_mean(volume, adaptiveLength), _column_stat(volume, 'mean'))
+        return np.clip(np.where(volMa == 0, EPSILON, volMa), EPSILON, None)
+    volMa = shared(('volMa', adaptiveLength), volume_average)
+    
+    def liquidity():
+        spreadTerm = spreadProxy * volume / volMa
+        impactTerm = (close - _shift(close, impactWindow)) * volume / volMa
+        vwapSpread = _fillna(_rolling_mean(spreadTerm, adaptiveLength), 0)
+        priceImpact = _fillna(_rolling_mean(impactTerm, adaptiveLength), 0)
+        
+        liquidityScore = _fillna(_finite_or_zero(vwapSpread - priceImpact), 0)
+        
+        liqMean = _fillna(_rolling_mean(liquidityScore, adaptiveLength), 0)
+        liqStdev = _fillna(_rolling_stdev(liquidityScore, adaptiveLength), 1)
+        liqStdev = np.clip(np.where(liqStdev == 0, 1, liqStdev), EPSILON, None)
+        
+        normalizedLiq = np.clip(_fillna(_finite_or_zero((liquidityScore - liqMean) / liqStdev), 0), -10, 10)
+        return spreadTerm, impactTerm, liquidityScore, normalizedLiq
+    spreadTerm, impactTerm, liquidityScore, normalizedLiq = shared(('liquidity', adaptiveLength, impactWindow), liquidity)
+    
+    # Volume Flow Analysis
+    def volume_deviation():
+        volStdev = _fillna(_rolling_stdev(volume, microLength), _column_stat(volume, 'std'))
+        return np.clip(np.where(volStdev == 0, EPSILON, volStdev), EPSILON, None)
+    volStdev = shared(('volStdev', microLength), volume_deviation)
+    
+    def accumulation():
+        posFlow = _fillna(_rolling_mean(posFlowTerm, microLength), 0)
+        negFlow = _fillna(_rolling_mean(negFlowTerm, microLength), 0)
+        return np.clip(_fillna(_finite_or_zero((posFlow - negFlow) / (posFlow + negFlow + EPSILON)), 0), -1, 1)
+    accumFlow = shared(('accumFlow', microLength), accumulation)
+    
+    def volume_flow():
+        volZscore = np.clip(_fillna(_finite_or_zero((volume - volMa) / volStdev), 0), -5, 5)
+        volSurge = _fillna(np.clip(50 + (volZscore * 20), 0, 100), 50)
+        volDirection = np.where(close > open_, volSurge, -volSurge)
+        volumeScore = _fillna(_finite_or_zero((volDirection / 100) * 0.5 + accumFlow * 0.5), 0)
+        return volSurge, volumeScore
+    volSurge, volumeScore = shared(('volumeFlow', adaptiveLength, microLength), volume_flow)
+    
+    # Momentum & Conviction
+    bodyConviction = shared(('bodyConviction', microLength), lambda: rolling_body_conviction(bodySize, microLength + 1))
+    
+    def momentum():
+        rsiGain, rsiLoss = _rsi_averages(priceVelocity, microLength)
+        momentumRsi = np.clip(_fillna(_rsi(priceVelocity, microLength, (rsiGain, rsiLoss)), 50), 0, 100)
+        return rsiGain, rsiLoss, momentumRsi
+    rsiGain, rsiLoss, momentumRsi = shared(('momentum', microLength), momentum)
+    
+    # Statistical Bounds
+    def price_moments():
+        priceMean = _fillna(_rolling_mean(close, adaptiveLength), close)
+        priceStdev = _fillna(_rolling_stdev(close, adaptiveLength), _column_stat(close, 'std'))
+        return priceMean, np.clip(np.where(priceStdev == 0, EPSILON, priceStdev), EPSILON, None)
+    priceMean, priceStdev = shared(('priceMoments', adaptiveLength), price_moments)
+    
+    upperBound = priceMean + devMultiplier * priceStdev
+    lowerBound = priceMean - devMultiplier * priceStdev
+    inOverbought = close > upperBound
+    inOversold = close < lowerBound
+    
+    # Composite Oscillator
+    def composite():
+        directionConviction = np.where(close > open_, bodyConviction, -bodyConviction)
+        rawScore = (normalizedLiq * 0.30) + \
+                   (volumeScore * 0.25) + \
+                   (directionConviction / 100 * 0.25) + \
+                   ((momentumRsi - 50) / 50 * 0.20)
+        rawScore = np.clip(_fillna(_finite_or_zero(rawScore), 0), -5, 5)
+        
+        oscillator = np.clip(_fillna(_finite_or_zero(rawScore * 8), 0), -10, 10)
+        oscMomentum = np.clip(_fillna(_diff(oscillator, 2), 0), -15, 15)
+        oscAccel = np.clip(_fillna(_diff(oscMomentum, 1), 0), -15, 15)
+        return oscillator, oscMomentum, oscAccel
+    oscillatorKey = (adaptiveLength, microLength, impactWindow)
+    oscillator, oscMomentum, oscAccel = shared(('oscillator',) + oscillatorKey, composite)
+    
+    # Divergence Detection
+    pivotLows, pivotHighs = shared(
+        ('pivots', divLookback),
+        lambda: (rolling_pivot(low, divLookback, 'low'), rolling_pivot(high, divLookback, 'high'))
+    )
+    
+    volConfirm = volume > volMa * 0.8
+    
+    # A centered pivot is only confirmed divLookback bars after it prints
+    confirmDelay = divLookback if point_in_time else 0
+    
+    priceLL, priceHH = shared(('priceExtremes', divLookback, confirmDelay), lambda: (
+        low < (_last_pivot_value(low, pivotLows, low, confirmDelay) * 0.998),
+        high > (_last_pivot_value(high, pivotHighs, high, confirmDelay) * 1.002)
+    ))
+    oscHL, oscLH = shared(('oscExtremes', divLookback, confirmDelay) + oscillatorKey, lambda: (
+        oscillator > (_last_pivot_value(oscillator, pivotLows, oscillator, confirmDelay) * 1.05),
+        oscillator < (_last_pivot_value(oscillator, pivotHighs, oscillator, confirmDelay) * 0.95)
+    ))
+    bullishDiv = priceLL & oscHL & inOversold & volConfirm
+    bearishDiv = priceHH & oscLH & inOverbought & volConfirm
+    
+    # Signal Generation
+    extremeLong = inOversold & (oscMomentum > 0) & (oscAccel > 0) & (volSurge > volThreshold * 50)
+    extremeShort = inOverbought & (oscMomentum < 0) & (oscAccel < 0) & (volSurge > volThreshold * 50)
+    
+    return {
+        'close': close, 'prevClose': prevClose,
+        'oscillator': oscillator, 'normalizedLiq': normalizedLiq, 'volSurge': volSurge,
+        'momentumRsi': momentumRsi, 'oscMomentum': oscMomentum, 'oscAccel': oscAccel,
+        'volumeScore': volumeScore, 'bodyConviction': bodyConviction,
+        'extremeLong': extremeLong, 'extremeShort': extremeShort,
+        'bullishDiv': bullishDiv, 'bearishDiv': bearishDiv,
+        # Intermediates the incremental calculator seeds its running windows from
+        'open': open_, 'high': high, 'low': low, 'volume': volume, 'volMa': volMa,
+        'spreadTerm': spreadTerm, 'impactTerm': impactTerm, 'liquidityScore': liquidityScore,
+        'posFlowTerm': posFlowTerm, 'negFlowTerm': negFlowTerm,
+        'bodySize': bodySize, 'priceVelocity': priceVelocity, 'rsiGain': rsiGain, 'rsiLoss': rsiLoss,
+        'pivotLows': pivotLows, 'pivotHighs': pivotHighs
+    }
+
+def _set_result_row(columns, j, record):
+    for column, values in columns.items():
+        values[j] = record[column]
+
+def compute_ilfo_panel(tickers, dates, panel, end_date):
+    """ILFO signals for every column of a dates x tickers OHLCV panel in one pass, as a RESULT_COLUMNS frame.
+
+    Scored rows are written straight into preallocated column arrays; only the
+    rare error and fallback rows go through per-ticker records.
+    """
+    def reference(j):
+        ticker_df = pd.DataFrame({f: panel[f][:, j] for f in PANEL_FIELDS}, index=dates)
+        return compute_ilfo_signal(tickers[j], ticker_df, end_date)
+    
+    if len(dates) == 0 or len(dates) < ILFO_PARAMS['adaptiveLength'] * 2:
+        return results_frame(build_ilfo_error(t, "Insufficient Data", "N/A") for t in tickers)
+    
+    n = len(tickers)
+    columns = {
+        'ticker': np.asarray(tickers, dtype=object),
+        'signal': np.full(n, "Neutral", dtype=object),
+        'details': np.full(n, None, dtype=object),
+        'pct_change': np.full(n, np.nan),
+        'confidence_score': np.zeros(n),
+        'confidence_grade': np.full(n, "N/A", dtype=object),
+        'confidence_class': np.full(n, "neutral", dtype=object),
+        **{param: np.full(n, np.nan) for param in CRITERIA_SERIES}
+    }
+    filled, errors, cols = screen_panel(tickers, panel)
+    for j, error in errors.items():
+        _set_result_row(columns, j, error)
+    if len(cols) == 0:
+        return pd.DataFrame(columns)
+    
+    analysis_datetime = datetime.combine(end_date, datetime.max.time())
+    try:
+        index = pd.to_datetime(dates)
+        target_date = index.asof(analysis_datetime)
+    except Exception:
+        target_date = pd.NaT
+    if pd.isna(target_date):
+        for j in cols:
+            _set_result_row(columns, j, reference(j))
+        return pd.DataFrame(columns)
+    row = index.get_loc(target_date)
+    
+    series = ilfo_panel_series(filled, cols)
+    prevClose, close = series['prevClose'][row], series['close'][row]
+    
+    # Extract values at target date
+    criteria = {param: series[name][row] for param, name in CRITERIA_SERIES.items()}
+    invalid = np.zeros(len(cols), dtype=bool)
+    for values in criteria.values():
+        invalid |= ~np.isfinite(values)
+    for j in cols[invalid]:
+        _set_result_row(columns, j, build_ilfo_error(tickers[j], "No Data", "Invalid calculation result"))
+    
+    valid = cols[~invalid]
+    signal = classify_panel_signals(series, [row])[0][~invalid]
+    columns['signal'][valid] = signal
+    with np.errstate(invalid='ignore', divide='ignore'):
+        columns['pct_change'][valid] = np.where(prevClose > 0, ((close / prevClose) - 1) * 100, np.nan)[~invalid]
+    for param, values in criteria.items():
+        columns[param][valid] = values[~invalid]
+    
+    # Score every actionable ticker in one pass
+    actionable = signal != "Neutral"
+    if actionable.any():
+        sides = np.array([text.split()[-1] for text in signal[actionable]], dtype=object)
+        scores = score_confidence_batch(pd.DataFrame({param: values[~invalid] for param, values in criteria.items()})[actionable], sides)
+        for column in ['confidence_score', 'confidence_grade', 'confidence_class']:
+            columns[column][valid[actionable]] = scores[column].to_numpy()
+    
+    return pd.DataFrame(columns)
+
+def compute_ilfo_universe(data_dict, end_date):
+    """RESULT_COLUMNS frame for every ticker in data_dict (in its order), using the panel engine wherever frames line up"""
+    dates, tickers, panel, leftovers = build_ohlcv_panel(data_dict)
+    frames = []
+    
+    if tickers:
+        try:
+            frames.append(compute_ilfo_panel(tickers, dates, panel, end_date))
+        except Exception as e:
+            logging.warning(f"Panel engine failed, falling back to per-ticker path: {e}")
+            frames, leftovers = [], list(data_dict.keys())
+    
+    if leftovers:
+        frames.append(results_frame(compute_ilfo_signal(ticker, data_dict[ticker], end_date) for ticker in leftovers))
+    
+    if not frames:
+        return pd.DataFrame(columns=RESULT_COLUMNS)
+    results = pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+    order = pd.Index(results['ticker']).get_indexer(list(data_dict))
+    return results.iloc[order].reset_index(drop=True)
+
+# --- Signal History (Range Mode) ---
+HISTORY_COLUMNS = [
+    'date', 'ticker', 'signal', 'pct_change',
+    'confidence_score', 'confidence_grade', 'confidence_class'
+] + list(CRITERIA_SERIES.keys())
+
+def history_sessions(dates, panel, filled, start_date, end_date, adaptive_length=None):
+    """Row positions of warmed-up sessions in [start_date, end_date] and the point-in-time scorable mask.
+
+    A ticker becomes scorable once it has printed a close and a volume, and
+    stops being scorable from its first non-positive close onwards.
+    adaptive_length overrides ILFO_PARAMS['adaptiveLength'] for the warm-up.
+    """
+    index = pd.to_datetime(dates)
+    in_range = (index >= pd.Timestamp(start_date)) & (index < pd.Timestamp(end_date) + pd.Timedelta(days=1))
+    # Same minimum history compute_ilfo_signal insists on
+    warmed_up = np.arange(len(index)) >= (adaptive_length or ILFO_PARAMS['adaptiveLength']) * 2 - 1
+    rows = np.flatnonzero(in_range & warmed_up)
+    
+    with np.errstate(invalid='ignore'):
+        scorable = (
+            np.logical_or.accumulate(~np.isnan(panel['Close']), axis=0)
+            & np.logical_or.accumulate(~np.isnan(panel['Volume']), axis=0)
+            & ~np.logical_or.accumulate(filled['Close'] <= 0, axis=0)
+        )
+    return rows, scorable
+
+# Actionable signals in the precedence build_ilfo_result applies
+PANEL_SIGNALS = ["Extreme Long", "Extreme Short", "Long", "Divergence Long", "Short", "Divergence Short"]
+
+def panel_signal_conditions(series, rows):
+    """One mask per PANEL_SIGNALS entry for the given rows of ilfo_panel_series output"""
+    extremeLong, extremeShort = series['extremeLong'][rows], series['extremeShort'][rows]
+    bullishDiv, bearishDiv = series['bullishDiv'][rows], series['bearishDiv'][rows]
+    return [extremeLong & bullishDiv, extremeShort & bearishDiv, extremeLong, bullishDiv, extremeShort, bearishDiv]
+
+def classify_panel_signals(series, rows):
+    """Signal text for the given rows of ilfo_panel_series output, same precedence as build_ilfo_result"""
+    return np.select(panel_signal_conditions(series, rows), PANEL_SIGNALS, default="Neutral")
+
+def score_history_confidence(history):
+    """Fill confidence_score/grade/class for the actionable rows of a long-format signal table"""
+    history['confidence_score'] = 0.0
+    history['confidence_grade'] = "N/A"
+    history['confidence_class'] = "neutral"
+    
+    actionable = (history['signal'] != "Neutral").to_numpy()
+    if not actionable.any():
+        return history
+    
+    # Only the live criteria are scored, whatever extra columns the table carries
+    sides = history.loc[actionable, 'signal'].str.split().str[-1]
+    scores = score_confidence_batch(history.loc[actionable, list(CRITERIA_SERIES.keys())], sides)
+    for column in ['confidence_score', 'confidence_grade', 'confidence_class']:
+        history.loc[actionable, column] = scores[column].to_numpy()
+    return history
+
+def compute_ilfo_panel_history(tickers, dates, panel, start_date, end_date):
+    """Long-format (date, ticker) ILFO signals for every session in [start_date, end_date].
+
+    One pass over the panel; pivots are taken point-in-time so each row shows
+    the signal a scan on that session would have produced.
+    """
+    index = pd.to_datetime(dates)
+    filled, _, _ = screen_panel(tickers, panel)
+    rows, scorable = history_sessions(index, panel, filled, start_date, end_date)
+    cols = np.flatnonzero(scorable[rows].any(axis=0))
+    if len(rows) == 0 or len(cols) == 0:
+        return pd.DataFrame(columns=HISTORY_COLUMNS)
+    
+    series = ilfo_panel_series(filled, cols, point_in_time=True)
+    signal = classify_panel_signals(series, rows)
+    
+    prevClose, close = series['prevClose'][rows], series['close'][rows]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        pct_change = np.where(prevClose > 0, ((close / prevClose) - 1) * 100, np.nan)
+    
+    history = pd.DataFrame({
+        'date': np.repeat(index[rows], len(cols)),
+        'ticker': np.tile(np.asarray(tickers, dtype=object)[cols], len(rows)),
+        'signal': signal.ravel(),
+        'pct_change': pct_change.ravel(),
+        **{param: series[name][rows].ravel() for param, name in CRITERIA_SERIES.items()}
+    })
+    valid = scorable[rows][:, cols].ravel() & np.isfinite(history[list(CRITERIA_SERIES.keys())]).all(axis=1).to_numpy()
+    history = score_history_confidence(history[valid].reset_index(drop=True))
+    
+    return history[HISTORY_COLUMNS]
+
+def compute_ilfo_history(data_dict, start_date, end_date):
+    """Signal history for every ticker in data_dict, one panel pass per distinct date index"""
+    dates, tickers, panel, leftovers = build_ohlcv_panel(data_dict)
+    frames = []
+    if tickers:
+        frames.append(compute_ilfo_panel_history(tickers, dates, panel, start_date, end_date))
+    
+    for ticker in leftovers:
+        dates, tickers, panel, _ = build_ohlcv_panel({ticker: data_dict[ticker]})
+        if tickers:
+            frames.append(compute_ilfo_panel_history(tickers, dates, panel, start_date, end_date))
+    
+    if not frames:
+        return pd.DataFrame(columns=HISTORY_COLUMNS)
+    
+    history = pd.concat(frames, ignore_index=True)
+    return history.sort_values('date', kind='stable').reset_index(drop=True)
@@ -0,0 +1,194 @@
+import argparse
+import copy
+import json
+import logging
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from ilfo import (
+    OPTIMAL_RANGES, STATISTICAL_ANCHORS, CRITERIA_SERIES, SCORING_TABLES_ENV,
+    build_ohlcv_panel, screen_panel, ilfo_panel_series,
+    history_sessions, classify_panel_signals, score_history_confidence
+)
+from ohlcv_store import OHLCVStore, OHLCV_STORE_DIR
+
+# --- Backtest Configuration ---
+BACKTEST_HORIZONS = (5, 10, 20)
+CALIBRATION_HORIZON = 10
+SUCCESS_THRESHOLD = 0.0
+RANGE_QUANTILES = (0.25, 0.75)
+BACKTEST_CHUNK_TICKERS = 100
+
+# Every parameter the scoring tables carry, mapped to its ilfo_panel_series array
+BACKTEST_SERIES = dict(CRITERIA_SERIES, body_conviction='bodyConviction')
+
+# --- Signal Generation & Labelling ---
+def forward_returns(close, horizon):
+    """Percent return from each bar's close to the close horizon bars later (NaN past the end)"""
+    forward = np.full_like(close, np.nan)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        forward[:-horizon] = (close[horizon:] / close[:-horizon] - 1) * 100
+    return forward
+
+def backtest_panel(tickers, dates, panel, horizons=BACKTEST_HORIZONS, start_date=None, end_date=None):
+    """Every actionable point-in-time ILFO signal in the panel, labelled with forward returns"""
+    index = pd.to_datetime(dates)
+    filled, _, _ = screen_panel(tickers, panel)
+    rows, scorable = history_sessions(index, panel, filled, start_date or index[0], end_date or index[-1])
+    cols = np.flatnonzero(scorable[rows].any(axis=0))
+    if len(rows) == 0 or len(cols) == 0:
+        return None
+
+    series = ilfo_panel_series(filled, cols, point_in_time=True)
+    signal = classify_panel_signals(series, rows)
+
+    actionable = (signal != "Neutral") & scorable[rows][:, cols]
+    for name in BACKTEST_SERIES.values():
+        actionable &= np.isfinite(series[name][rows])
+    r, c = np.nonzero(actionable)
+    bars = rows[r]
+
+    events = pd.DataFrame({
+        'date': index[bars],
+        'ticker': np.asarray(tickers, dtype=object)[cols[c]],
+        'signal': signal[r, c],
+        **{param: series[name][bars, c] for param, name in BACKTEST_SERIES.items()}
+    })
+    events['side'] = np.where(events['signal'].str.endswith("Long"), "Long", "Short")
+    for horizon in horizons:
+        events[f'fwd_{horizon}'] = forward_returns(series['close'], horizon)[bars, c]
+    return events
+
+def run_backtest(data_dict, horizons=BACKTEST_HORIZONS, start_date=None, end_date=None, chunk_tickers=BACKTEST_CHUNK_TICKERS):
+    """Signal events for the whole universe, scored in ticker chunks to bound memory"""
+    dates, tickers, panel, leftovers = build_ohlcv_panel(data_dict)
+    groups = []
+    if tickers:
+        for start in range(0, len(tickers), chunk_tickers):
+            chunk = slice(start, start + chunk_tickers)
+            groups.append((dates, tickers[chunk], {f: values[:, chunk] for f, values in panel.items()}))
+    for ticker in leftovers:
+        ticker_dates, ticker_list, ticker_panel, _ = build_ohlcv_panel({ticker: data_dict[ticker]})
+        if ticker_list:
+            groups.append((ticker_dates, ticker_list, ticker_panel))
+
+    frames = []
+    for group_dates, group_tickers, group_panel in groups:
+        events = backtest_panel(group_tickers, group_dates, group_panel, horizons, start_date, end_date)
+        if events is not None and not events.empty:
+            frames.append(events)
+
+    if not frames:
+        return pd.DataFrame()
+
+    events = pd.concat(frames, ignore_index=True).sort_values(['date', 'ticker'], kind='stable')
+    events = score_history_confidence(events.reset_index(drop=True))
+    logging.info(f"Backtest produced {len(events)} signal events across {events['ticker'].nunique()} tickers")
+    return events
+
+# --- Calibration ---
+def summarize_backtest(events, horizons=BACKTEST_HORIZONS, success_threshold=SUCCESS_THRESHOLD):
+    """Hit rate and forward-return statistics per side and horizon"""
+    summary = []
+    for side, direction in (("Long", 1), ("Short", -1)):
+        side_events = events[events['side'] == side]
+        for horizon in horizons:
+            directional = (direction * side_events[f'fwd_{horizon}']).dropna()
+            summary.append({
+                'side': side,
+                'horizon': horizon,
+                'signals': len(side_events),
+                'labelled': len(directional),
+                'hit_rate': float((directional > success_threshold).mean() * 100) if len(directional) else np.nan,
+                'mean_return': float(directional.mean()) if len(directional) else np.nan,
+                'median_return': float(directional.median()) if len(directional) else np.nan
+            })
+    return pd.DataFrame(summary).set_index(['side', 'horizon'])
+
+def calibrate_scoring_tables(events, horizon=CALIBRATION_HORIZON, success_threshold=SUCCESS_THRESHOLD, range_quantiles=RANGE_QUANTILES):
+    """Recompute OPTIMAL_RANGES min/max and STATISTICAL_ANCHORS from labelled signal events.
+
+    A signal succeeds when its forward return over horizon bars, taken in the
+    signal's direction, beats success_threshold percent. Ranges are the
+    range_quantiles of successful signals. Weights and importance are kept.
+    """
+    ranges = copy.deepcopy(OPTIMAL_RANGES)
+    anchors = copy.deepcopy(STATISTICAL_ANCHORS)
+    low_q, high_q = range_quantiles
+
+    for side, direction in (("Long", 1), ("Short", -1)):
+        side_events = events[events['side'] == side] if not events.empty else events
+        if side_events.empty:
+            logging.warning(f"No {side} signals to calibrate against, keeping existing tables")
+            continue
+        directional = direction * side_events[f'fwd_{horizon}']
+        labelled = directional.notna()
+        success = side_events[labelled & (directional > success_threshold)]
+        fail = side_events[labelled & (directional <= success_threshold)]
+        if success.empty:
+            logging.warning(f"No successful {side} signals at {horizon} bars, keeping existing tables")
+            continue
+
+        for param in ranges[side]:
+            if param not in side_events.columns:
+                continue
+            ranges[side][param]['min'] = round(float(success[param].quantile(low_q)), 3)
+            ranges[side][param]['max'] = round(float(success[param].quantile(high_q)), 3)
+            anchors[side][param] = {
+                'Success_Mean': round(float(success[param].mean()), 3),
+                'Success_Median': round(float(success[param].median()), 3),
+                'Fail_Mean': round(float(fail[param].mean() if not fail.empty else success[param].mean()), 3)
+            }
+
+    return ranges, anchors
+
+# --- Command Line ---
+def load_store_universe(store, tickers=None, start_date=None, end_date=None):
+    """Stored bars for the requested tickers, aligned on the union of trading dates"""
+    data_dict = {}
+    for ticker in tickers or store.tickers():
+        ticker_df = store.read(ticker, start_date, end_date)
+        if ticker_df is not None and not ticker_df.empty and not ticker_df['Close'].isnull().all():
+            data_dict[ticker] = ticker_df
+    if not data_dict:
+        return data_dict
+
+    all_dates = data_dict[next(iter(data_dict))].index
+    for ticker_df in data_dict.values():
+        all_dates = all_dates.union(ticker_df.index)
+    return {ticker: ticker_df.reindex(all_dates) for ticker, ticker_df in data_dict.items()}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Backtest ILFO signals and recalibrate the confidence scoring tables")
+    parser.add_argument('--store', default=OHLCV_STORE_DIR, help="OHLCV store directory to read history from")
+    parser.add_argument('--tickers', nargs='*', help="Tickers to include (default: everything in the store)")
+    parser.add_argument('--years', type=float, default=10, help="Years of history to backtest")
+    parser.add_argument('--end-date', type=lambda s: datetime.strptime(s, '%Y-%m-%d').date(), default=datetime.today().date())
+    parser.add_argument('--horizons', type=int, nargs='+', default=list(BACKTEST_HORIZONS))
+    parser.add_argument('--calibration-horizon', type=int, default=CALIBRATION_HORIZON)
+    parser.add_argument('--success-threshold', type=float, default=SUCCESS_THRESHOLD, help="Directional %% return a signal must beat")
+    parser.add_argument('--output', default="scoring_tables.json", help="Where to write the recalibrated tables")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    horizons = sorted(set(args.horizons) | {args.calibration_horizon})
+    start_date = args.end_date - timedelta(days=int(args.years * 365.25))
+
+    data_dict = load_store_universe(OHLCVStore(args.store), args.tickers, start_date, args.end_date)
+    if not data_dict:
+        parser.error(f"No stored history found in {args.store}")
+
+    events = run_backtest(data_dict, horizons, start_date, args.end_date)
+    if events.empty:
+        parser.error("Backtest produced no signals")
+
+    print(summarize_backtest(events, horizons, args.success_threshold).round(3).to_string())
+    ranges, anchors = calibrate_scoring_tables(events, args.calibration_horizon, args.success_threshold)
+    with open(args.output, 'w') as f:
+        json.dump({'OPTIMAL_RANGES': ranges, 'STATISTICAL_ANCHORS': anchors}, f, indent=2)
+    logging.info(f"Recalibrated scoring tables written to {args.output}; set {SCORING_TABLES_ENV}={args.output} to score with them")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,271 @@
+import argparse
+import logging
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+from ilfo import CRITERIA_SERIES, compute_ilfo_signal, compute_ilfo_universe, compute_ilfo_history
+from ilfo_incremental import seed_states
+from ilfo_pool import ILFOPool, DEFAULT_POOL_WORKERS
+from ohlcv_store import OHLCVStore, OHLCV_STORE_DIR
+
+# --- Harness Configuration ---
+GOLDEN_EXACT_FIELDS = ['signal', 'confidence_grade']
+GOLDEN_NUMERIC_FIELDS = ['pct_change', 'confidence_score'] + list(CRITERIA_SERIES.keys())
+GOLDEN_RTOL = 1e-7
+GOLDEN_ATOL = 1e-9
+GOLDEN_SESSIONS = 1
+# Bump when recorded golden outputs stop being comparable (2: sessions scored on bars up to that session only)
+GOLDEN_VERSION = 2
+
+# --- Engines ---
+# An engine takes (data_dict, sessions) and returns one row per (ticker, session)
+# with a 'date' column plus the golden fields. A ticker may be left out of a
+# session it cannot score; the diff reports that as a missing row. Every
+# session is scored point-in-time, from the bars up to that session only.
+def _records_frame(records, session):
+    frame = pd.DataFrame(records)
+    frame.insert(0, 'date', pd.Timestamp(session))
+    return frame
+
+def _session_frames(score, data_dict, sessions):
+    # score(session_data, session) only ever sees bars up to the session it scores
+    frames = [
+        _records_frame(score({ticker: df[df.index <= session] for ticker, df in data_dict.items()}, session), session)
+        for session in sessions
+    ]
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+def reference_engine(data_dict, sessions):
+    """compute_ilfo_signal per ticker and session (the golden source)"""
+    return _session_frames(
+        lambda session_data, session: [compute_ilfo_signal(ticker, df, session) for ticker, df in session_data.items()],
+        data_dict, sessions
+    )
+
+def pool_engine(data_dict, sessions, workers=DEFAULT_POOL_WORKERS):
+    """compute_ilfo_signal fanned out over the shared-memory process pool"""
+    pool = ILFOPool(workers)
+    try:
+        return _session_frames(pool.score, data_dict, sessions)
+    finally:
+        pool.shutdown()
+
+def panel_engine(data_dict, sessions):
+    """compute_ilfo_universe, one vectorized panel pass per session"""
+    return _session_frames(compute_ilfo_universe, data_dict, sessions)
+
+def history_engine(data_dict, sessions):
+    """compute_ilfo_history, every session in one point-in-time pass"""
+    history = compute_ilfo_history(data_dict, sessions[0], sessions[-1])
+    history['date'] = pd.to_datetime(history['date'])
+    return history[history['date'].isin(pd.DatetimeIndex(sessions))].reset_index(drop=True)
+
+def incremental_engine(data_dict, sessions):
+    """ILFOState seeded up to the first session, then fed one bar at a time"""
+    sessions = pd.DatetimeIndex(sessions)
+    first, last = sessions[0], sessions[-1]
+    states = seed_states({ticker: df[df.index <= first] for ticker, df in data_dict.items()})
+    frames = [_records_frame([state.result for state in states.values()], first)]
+
+    later = sessions[sessions > first]
+    if len(later):
+        results = {date: [] for date in later}
+        for ticker, state in states.items():
+            df = data_dict[ticker]
+            bars = df[(df.index > first) & (df.index <= last)]
+            for timestamp, bar in zip(bars.index, bars.to_dict('records')):
+                record = state.update(timestamp, bar)
+                if timestamp in results:
+                    results[timestamp].append(record)
+        frames.extend(_records_frame(records, date) for date, records in results.items())
+    return pd.concat(frames, ignore_index=True)
+
+ENGINES = {
+    'reference': reference_engine,
+    'pool': pool_engine,
+    'panel': panel_engine,
+    'history': history_engine,
+    'incremental': incremental_engine
+}
+
+# --- Golden Outputs ---
+def universe_sessions(data_dict, count=GOLDEN_SESSIONS):
+    """The last count trading dates of the universe"""
+    index = None
+    for df in data_dict.values():
+        index = df.index if index is None else index.union(df.index)
+    return list(index[-count:]) if index is not None else []
+
+def run_engine(engine, data_dict, sessions):
+    """Engine output trimmed to the golden fields, keyed and sorted by (ticker, date)"""
+    frame = ENGINES[engine](data_dict, sessions) if isinstance(engine, str) else engine(data_dict, sessions)
+    if frame.empty:
+        return pd.DataFrame(columns=['ticker', 'date'] + GOLDEN_EXACT_FIELDS + GOLDEN_NUMERIC_FIELDS)
+    frame = frame.reindex(columns=['ticker', 'date'] + GOLDEN_EXACT_FIELDS + GOLDEN_NUMERIC_FIELDS)
+    frame['date'] = pd.to_datetime(frame['date'])
+    frame[GOLDEN_NUMERIC_FIELDS] = frame[GOLDEN_NUMERIC_FIELDS].astype(float)
+    return frame.sort_values(['ticker', 'date'], kind='stable').reset_index(drop=True)
+
+def load_or_record_golden(path, data_dict, sessions, refresh=False):
+    """Reference outputs for sessions, read from path when it already covers them"""
+    if path and os.path.exists(path) and not refresh:
+        golden = pd.read_parquet(path)
+        covered = set(zip(golden['ticker'], golden['date']))
+        current = 'golden_version' in golden.columns and (golden['golden_version'] == GOLDEN_VERSION).all()
+        if current and all((ticker, pd.Timestamp(s)) in covered for ticker in data_dict for s in sessions):
+            logging.info(f"Loaded golden outputs from {path}")
+            golden = golden[golden['date'].isin(pd.DatetimeIndex(sessions)) & golden['ticker'].isin(list(data_dict))]
+            return golden.drop(columns='golden_version').reset_index(drop=True)
+        logging.info(f"Golden outputs in {path} are outdated or do not cover this run, recording them again")
+
+    golden = run_engine('reference', data_dict, sessions)
+    if path:
+        golden.assign(golden_version=GOLDEN_VERSION).to_parquet(path)
+        logging.info(f"Recorded golden outputs for {golden['ticker'].nunique()} tickers x {len(sessions)} sessions to {path}")
+    return golden
+
+# --- Diff ---
+def diff_outputs(golden, candidate, tolerances=None, rtol=GOLDEN_RTOL, atol=GOLDEN_ATOL):
+    """Every (ticker, date, field) where candidate differs from golden.
+
+    Labels must match exactly; numeric fields must agree within
+    atol + rtol * |golden|, with tolerances overriding atol per field. Both
+    sides being NaN counts as agreement. Rows present on one side only are
+    reported with field 'row'.
+    """
+    tolerances = tolerances or {}
+    merged = golden.merge(candidate, on=['ticker', 'date'], how='outer', suffixes=('_golden', '_candidate'), indicator=True)
+    both = (merged['_merge'] == 'both').to_numpy()
+    frames = []
+
+    missing = ~both
+    if missing.any():
+        frames.append(pd.DataFrame({
+            'ticker': merged['ticker'][missing], 'date': merged['date'][missing], 'field': 'row',
+            'golden': np.where(merged['_merge'][missing] == 'left_only', 'present', 'missing'),
+            'candidate': np.where(merged['_merge'][missing] == 'right_only', 'present', 'missing'),
+            'abs_diff': np.nan
+        }))
+
+    for field in GOLDEN_EXACT_FIELDS:
+        g, c = merged[f'{field}_golden'], merged[f'{field}_candidate']
+        differ = both & ~((g == c) | (g.isna() & c.isna())).to_numpy()
+        if differ.any():
+            frames.append(pd.DataFrame({
+                'ticker': merged['ticker'][differ], 'date': merged['date'][differ], 'field': field,
+                'golden': g[differ].astype(object), 'candidate': c[differ].astype(object), 'abs_diff': np.nan
+            }))
+
+    for field in GOLDEN_NUMERIC_FIELDS:
+        g = merged[f'{field}_golden'].to_numpy(dtype=float)
+        c = merged[f'{field}_candidate'].to_numpy(dtype=float)
+        differ = both & ~np.isclose(c, g, rtol=rtol, atol=tolerances.get(field, atol), equal_nan=True)
+        if differ.any():
+            frames.append(pd.DataFrame({
+                'ticker': merged['ticker'][differ], 'date': merged['date'][differ], 'field': field,
+                'golden': g[differ].astype(object), 'candidate': c[differ].astype(object),
+                'abs_diff': np.abs(c[differ] - g[differ])
+            }))
+
+    if not frames:
+        return pd.DataFrame(columns=['ticker', 'date', 'field', 'golden', 'candidate', 'abs_diff'])
+    field_order = {field: k for k, field in enumerate(['row'] + GOLDEN_EXACT_FIELDS + GOLDEN_NUMERIC_FIELDS)}
+    mismatches = pd.concat(frames, ignore_index=True)
+    mismatches['_order'] = mismatches['field'].map(field_order)
+    return mismatches.sort_values(['ticker', 'date', '_order'], kind='stable').drop(columns='_order').reset_index(drop=True)
+
+def ticker_report(mismatches):
+    """One row per diverging ticker: first diverging bar, what diverged there and how often"""
+    if mismatches.empty:
+        return pd.DataFrame(columns=['ticker', 'first_date', 'first_field', 'golden', 'candidate', 'sessions', 'fields'])
+    first = mismatches.groupby('ticker', sort=False).head(1).set_index('ticker')
+    grouped = mismatches.groupby('ticker', sort=False)
+    report = pd.DataFrame({
+        'first_date': first['date'],
+        'first_field': first['field'],
+        'golden': first['golden'],
+        'candidate': first['candidate'],
+        'sessions': grouped['date'].nunique(),
+        'fields': grouped['field'].agg(lambda fields: ",".join(dict.fromkeys(fields)))
+    })
+    return report.sort_values(['first_date', 'sessions'], ascending=[True, False]).reset_index()
+
+def field_summary(mismatches):
+    """Mismatch count and worst absolute difference per field"""
+    rows = []
+    for field in ['row'] + GOLDEN_EXACT_FIELDS + GOLDEN_NUMERIC_FIELDS:
+        field_rows = mismatches[mismatches['field'] == field]
+        rows.append({
+            'field': field,
+            'mismatches': len(field_rows),
+            'tickers': field_rows['ticker'].nunique(),
+            'max_abs_diff': field_rows['abs_diff'].max() if field in GOLDEN_NUMERIC_FIELDS and len(field_rows) else np.nan
+        })
+    return pd.DataFrame(rows).set_index('field')
+
+def compare_engines(data_dict, candidate, sessions=None, golden_path=None, tolerances=None,
+                    rtol=GOLDEN_RTOL, atol=GOLDEN_ATOL, refresh_golden=False):
+    """(mismatches, per-ticker report, per-field summary) of candidate against the reference engine"""
+    sessions = sessions or universe_sessions(data_dict)
+    golden = load_or_record_golden(golden_path, data_dict, sessions, refresh_golden)
+    output = run_engine(candidate, data_dict, sessions)
+    mismatches = diff_outputs(golden, output, tolerances, rtol, atol)
+    return mismatches, ticker_report(mismatches), field_summary(mismatches)
+
+# --- Command Line ---
+def _parse_tolerance(text):
+    field, _, value = text.partition('=')
+    if field not in GOLDEN_NUMERIC_FIELDS or not value:
+        raise argparse.ArgumentTypeError(f"expected <field>=<atol> with field one of {', '.join(GOLDEN_NUMERIC_FIELDS)}")
+    return field, float(value)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Diff an ILFO engine against the compute_ilfo_signal golden outputs")
+    parser.add_argument('--engine', choices=[name for name in ENGINES if name != 'reference'], default='panel')
+    parser.add_argument('--store', default=None, help=f"OHLCV store (or recording ohlcv/ directory) to read panels from (default: {OHLCV_STORE_DIR})")
+    parser.add_argument('--tickers', nargs='*', help="Tickers to include (default: everything in the store)")
+    parser.add_argument('--synthetic', type=int, help="Use a synthetic universe of this many tickers instead of a store")
+    parser.add_argument('--days', type=int, default=300, help="History length of the synthetic universe")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--sessions', type=int, default=GOLDEN_SESSIONS, help="Compare the last N sessions")
+    parser.add_argument('--golden', help="Parquet file the reference outputs are recorded to and reused from")
+    parser.add_argument('--refresh-golden', action='store_true', help="Re-record the golden outputs even if the file covers the run")
+    parser.add_argument('--rtol', type=float, default=GOLDEN_RTOL)
+    parser.add_argument('--atol', type=float, default=GOLDEN_ATOL)
+    parser.add_argument('--tolerance', type=_parse_tolerance, action='append', default=[], help="Per-field absolute tolerance, e.g. vol_surge=1e-6")
+    parser.add_argument('--report', help="Write the per-ticker mismatch report to this CSV")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    if args.synthetic:
+        from benchmarks import synthetic_universe
+        data_dict = synthetic_universe(args.synthetic, args.days, seed=args.seed)
+    else:
+        from ilfo_backtest import load_store_universe
+        data_dict = load_store_universe(OHLCVStore(args.store or OHLCV_STORE_DIR), args.tickers)
+        if not data_dict:
+            parser.error(f"No stored history found in {args.store or OHLCV_STORE_DIR}")
+
+    sessions = universe_sessions(data_dict, args.sessions)
+    logging.info(f"Comparing '{args.engine}' to the reference on {len(data_dict)} tickers x {len(sessions)} sessions")
+    mismatches, report, summary = compare_engines(
+        data_dict, args.engine, sessions, args.golden, dict(args.tolerance), args.rtol, args.atol, args.refresh_golden
+    )
+
+    print(summary.to_string())
+    if report.empty:
+        print(f"✓ '{args.engine}' matches the reference on every ticker and session")
+        return 0
+
+    print(f"✗ {len(report)} of {len(data_dict)} tickers diverge; first diverging bars:")
+    print(report.head(25).to_string(index=False))
+    if args.report:
+        report.to_csv(args.report, index=False)
+        logging.info(f"Per-ticker mismatch report written to {args.report}")
+    return 1
+
+if __name__ == "__main__":
+    sys.exit(main())
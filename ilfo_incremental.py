@@ -0,0 +1,378 @@
+import copy
+import logging
+import math
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+from ilfo import (
+    ILFO_PARAMS, EPSILON, PANEL_FIELDS,
+    build_ilfo_error, build_ilfo_result, build_ohlcv_panel, screen_panel, ilfo_panel_series
+)
+
+# --- Running Window Statistics ---
+class RollingWindow:
+    """Fixed-length window with a running mean and sum of squared deviations.
+
+    Values are added and removed Welford-style, so each push is O(1). A run of
+    identical values reports a variance of exactly 0, as pandas rolling does.
+    """
+
+    def __init__(self, length, values=()):
+        self.length = length
+        self.values = deque()
+        self.mean = 0.0
+        self.ssqdm = 0.0
+        self.same_run = 0
+        for value in values:
+            self.push(value)
+
+    def push(self, value):
+        value = float(value)
+        if len(self.values) == self.length:
+            self._remove(self.values.popleft())
+        self.same_run = self.same_run + 1 if self.values and self.values[-1] == value else 1
+        self.values.append(value)
+        delta = value - self.mean
+        self.mean += delta / len(self.values)
+        self.ssqdm += delta * (value - self.mean)
+
+    def _remove(self, value):
+        remaining = len(self.values)
+        if remaining == 0:
+            self.mean = 0.0
+            self.ssqdm = 0.0
+            return
+        delta = value - self.mean
+        self.mean -= delta / remaining
+        self.ssqdm -= delta * (value - self.mean)
+
+    def copy(self):
+        clone = copy.copy(self)
+        clone.values = self.values.copy()
+        return clone
+
+    def std(self):
+        if len(self.values) < 2 or self.same_run >= len(self.values):
+            return 0.0
+        return math.sqrt(max(self.ssqdm, 0.0) / (len(self.values) - 1))
+
+class EwmMean:
+    """Running ewm(alpha, adjust=True).mean() state, same recurrence as pandas"""
+
+    def __init__(self, alpha, min_periods):
+        self.factor = 1.0 - alpha
+        self.min_periods = min_periods
+        self.weighted = np.nan
+        self.old_wt = 1.0
+        self.nobs = 0
+
+    def push(self, value):
+        is_observation = not np.isnan(value)
+        self.nobs += is_observation
+        if not np.isnan(self.weighted):
+            self.old_wt *= self.factor
+            if is_observation:
+                if self.weighted != value:
+                    self.weighted = (self.old_wt * self.weighted + value) / (self.old_wt + 1.0)
+                self.old_wt += 1.0
+        elif is_observation:
+            self.weighted = value
+        return self.weighted if self.nobs >= self.min_periods else np.nan
+
+    def copy(self):
+        return copy.copy(self)
+
+    @classmethod
+    def from_state(cls, alpha, min_periods, weighted, nobs):
+        """Resume from a pandas ewm result over nobs gap-free observations"""
+        state = cls(alpha, min_periods)
+        state.weighted = float(weighted)
+        state.nobs = int(nobs)
+        state.old_wt = (1.0 - state.factor ** nobs) / (1.0 - state.factor) if nobs else 1.0
+        return state
+
+def _clip(value, lower, upper):
+    return min(max(value, lower), upper)
+
+def _finite(value, fill=0.0):
+    return value if np.isfinite(value) else fill
+
+# --- Incremental ILFO State ---
+class ILFOState:
+    """Constant-time ILFO update for one ticker, seeded from the batch computation.
+
+    The seed runs ilfo_panel_series over all but the last bar of the history
+    once and keeps only the windows each indicator needs: rolling sums, the
+    Wilder RSI state, the pivot candidate buffers and the last few oscillator
+    values. The last bar is then applied incrementally, so it can be revised
+    like any later one. update() folds in one new bar, or revises the latest
+    one, in O(1).
+    """
+
+    def __init__(self, ticker, df=None):
+        self.ticker = ticker
+        self.error = None
+        self.result = None
+        self.last_timestamp = None
+        self._previous = None
+        if df is not None:
+            self._seed(df)
+
+    def _fail(self, error):
+        self.error = error
+        self.result = error
+
+    def _seed(self, df):
+        if df.empty or len(df) <= ILFO_PARAMS['adaptiveLength'] * 2:
+            return self._fail(build_ilfo_error(self.ticker, "Insufficient Data", "N/A"))
+        dates, tickers, panel, _ = build_ohlcv_panel({self.ticker: df.iloc[:-1]})
+        if not tickers:
+            return self._fail(build_ilfo_error(self.ticker, "Insufficient Data", "Missing OHLCV columns"))
+        filled, errors, cols = screen_panel(tickers, panel)
+        if errors:
+            return self._fail(errors[0])
+
+        series = {name: values[:, 0] for name, values in ilfo_panel_series(filled, cols).items()}
+        self._seed_from_series(series, dates, {field: filled[field][-1, 0] for field in PANEL_FIELDS})
+        self._apply_last_bar(df)
+
+    def _apply_last_bar(self, df):
+        last_bar = df.iloc[-1]
+        self.update(df.index[-1], {field: last_bar.get(field, np.nan) for field in PANEL_FIELDS})
+
+    def _seed_from_series(self, series, dates, last_bar):
+        """Initialise every running window from one ticker's batch series"""
+        adaptiveLength = ILFO_PARAMS['adaptiveLength']
+        microLength = ILFO_PARAMS['microLength']
+        divLookback = ILFO_PARAMS['divLookback']
+
+        self.last_timestamp = pd.Timestamp(dates[-1])
+        self.last_bar = {field: float(value) for field, value in last_bar.items()}
+
+        # Rolling windows, filled from the tail of the batch series
+        self.volume_long = RollingWindow(adaptiveLength, series['volume'][-adaptiveLength:])
+        self.volume_short = RollingWindow(microLength, series['volume'][-microLength:])
+        self.spread_terms = RollingWindow(adaptiveLength, series['spreadTerm'][-adaptiveLength:])
+        self.impact_terms = RollingWindow(adaptiveLength, series['impactTerm'][-adaptiveLength:])
+        self.liquidity = RollingWindow(adaptiveLength, series['liquidityScore'][-adaptiveLength:])
+        self.pos_flow = RollingWindow(microLength, series['posFlowTerm'][-microLength:])
+        self.neg_flow = RollingWindow(microLength, series['negFlowTerm'][-microLength:])
+        self.closes = RollingWindow(adaptiveLength, series['close'][-adaptiveLength:])
+        self.impact_closes = deque(series['close'][-ILFO_PARAMS['impactWindow']:], maxlen=ILFO_PARAMS['impactWindow'])
+        self.bodies = deque(series['bodySize'][-microLength:], maxlen=microLength)
+
+        # Wilder RSI of price velocity; every bar after the first is an observation
+        observations = len(dates) - 1
+        self.rsi_gain = EwmMean.from_state(1.0 / microLength, microLength, series['rsiGain'][-1], observations)
+        self.rsi_loss = EwmMean.from_state(1.0 / microLength, microLength, series['rsiLoss'][-1], observations)
+        self.last_velocity = float(series['priceVelocity'][-1])
+
+        # Oscillator history for momentum/acceleration
+        self.oscillators = deque(series['oscillator'][-2:], maxlen=2)
+        self.last_osc_momentum = float(series['oscMomentum'][-1])
+
+        # Pivot candidates: a bar is a pivot once divLookback bars have printed after it
+        window = divLookback * 2 + 1
+        self.pivot_lows = deque(series['low'][-window:], maxlen=window)
+        self.pivot_highs = deque(series['high'][-window:], maxlen=window)
+        self.pivot_oscillators = deque(series['oscillator'][-window:], maxlen=window)
+        self.bars_seen = len(dates)
+        self.pivot_low = self._seed_pivot(series, 'low', 'pivotLows')
+        self.pivot_high = self._seed_pivot(series, 'high', 'pivotHighs')
+
+    @staticmethod
+    def _seed_pivot(series, extreme, mask):
+        # (price, oscillator) at the most recent confirmed pivot, or None before the first
+        pivots = np.flatnonzero(series[mask])
+        if len(pivots) == 0:
+            return None
+        return float(series[extreme][pivots[-1]]), float(series['oscillator'][pivots[-1]])
+
+    def _build_result(self, isExtremeLong, isBullishDiv, isExtremeShort, isBearishDiv, values_for_scoring, close, prev_close):
+        for value in values_for_scoring.values():
+            if not np.isfinite(value):
+                return build_ilfo_error(self.ticker, "No Data", "Invalid calculation result")
+        pct_change_val = ((close / prev_close) - 1) * 100 if pd.notna(prev_close) and prev_close > 0 else np.nan
+        return build_ilfo_result(
+            self.ticker, isExtremeLong, isBullishDiv, isExtremeShort, isBearishDiv,
+            values_for_scoring, pct_change_val
+        )
+
+    def update(self, timestamp, bar):
+        """Fold in one bar (a dict of Open/High/Low/Close/Volume) and return the refreshed ILFO record.
+
+        A bar with the same timestamp as the last one revises it in place of
+        appending, so a forming session can be updated tick by tick.
+        """
+        if self.error is not None:
+            return self.error
+
+        timestamp = pd.Timestamp(timestamp)
+        if timestamp == self.last_timestamp and self._previous is not None:
+            self.__dict__.update(self._previous)
+        elif timestamp <= self.last_timestamp:
+            raise ValueError(f"{self.ticker}: bar at {timestamp} is older than the last bar {self.last_timestamp}")
+
+        # Windows are a few dozen floats, so the pre-bar snapshot is O(1) as well
+        previous = {
+            key: value.copy() if hasattr(value, 'copy') else value
+            for key, value in self.__dict__.items() if key != '_previous'
+        }
+        self._apply(bar)
+        self._previous = previous
+        self.last_timestamp = timestamp
+        return self.result
+
+    def _apply(self, bar):
+        adaptiveLength = ILFO_PARAMS['adaptiveLength']
+        devMultiplier = ILFO_PARAMS['devMultiplier']
+        divLookback = ILFO_PARAMS['divLookback']
+        volThreshold = ILFO_PARAMS['volThreshold']
+
+        # Missing fields carry the previous bar forward, as ffill does in the batch path
+        values = {}
+        for field in PANEL_FIELDS:
+            value = bar.get(field, np.nan)
+            values[field] = float(value) if value is not None and pd.notna(value) else self.last_bar[field]
+        open_, high, low, close = values['Open'], values['High'], values['Low'], values['Close']
+        volume = _clip(values['Volume'] if values['Volume'] != 0 else 1.0, 1.0, np.inf)
+        prev_close = self.last_bar['Close']
+        self.last_bar = values
+
+        if close <= 0:
+            self.error = build_ilfo_error(self.ticker, "Invalid Data", "Non-positive prices detected")
+            self.result = self.error
+            return
+
+        # Market Microstructure
+        self.volume_long.push(volume)
+        self.volume_short.push(volume)
+        volMa = self.volume_long.mean
+        volMa = max(volMa if volMa != 0 else EPSILON, EPSILON)
+
+        self.spread_terms.push(((high + low) / 2 - open_) * volume / volMa)
+        self.impact_terms.push((close - self.impact_closes[0]) * volume / volMa)
+        self.impact_closes.append(close)
+        liquidityScore = _finite(self.spread_terms.mean - self.impact_terms.mean)
+
+        self.liquidity.push(liquidityScore)
+        liqStdev = self.liquidity.std()
+        liqStdev = max(liqStdev if liqStdev != 0 else 1.0, EPSILON)
+        normalizedLiq = _clip(_finite((liquidityScore - self.liquidity.mean) / liqStdev), -10, 10)
+
+        # Volume Flow Analysis
+        volStdev = self.volume_short.std()
+        volStdev = max(volStdev if volStdev != 0 else EPSILON, EPSILON)
+        volZscore = _clip(_finite((volume - volMa) / volStdev), -5, 5)
+        volSurge = _clip(50 + (volZscore * 20), 0, 100)
+        volDirection = volSurge if close > open_ else -volSurge
+
+        moneyFlow = _finite((high + low + close) / 3 * volume)
+        self.pos_flow.push(moneyFlow * (close > prev_close))
+        self.neg_flow.push(moneyFlow * (close < prev_close))
+        posFlow, negFlow = self.pos_flow.mean, self.neg_flow.mean
+        accumFlow = _clip(_finite((posFlow - negFlow) / (posFlow + negFlow + EPSILON)), -1, 1)
+        volumeScore = _finite((volDirection / 100) * 0.5 + accumFlow * 0.5)
+
+        # Momentum & Conviction
+        bodySize = abs(close - open_)
+        bodyConviction = sum(bodySize > body for body in self.bodies) / len(self.bodies) * 100
+        self.bodies.append(bodySize)
+        directionConviction = bodyConviction if close > open_ else -bodyConviction
+
+        priceBase = max(prev_close if prev_close != 0 else EPSILON, EPSILON)
+        priceVelocity = _clip(_finite((close - prev_close) / priceBase * 10000), -1000, 1000)
+        change = priceVelocity - self.last_velocity
+        self.last_velocity = priceVelocity
+        gain = self.rsi_gain.push(max(change, 0.0))
+        loss = self.rsi_loss.push(min(change, 0.0))
+        with np.errstate(invalid='ignore', divide='ignore'):
+            momentumRsi = 100 * gain / (gain + abs(loss))
+        momentumRsi = _clip(momentumRsi if not np.isnan(momentumRsi) else 50, 0, 100)
+
+        # Statistical Bounds
+        self.closes.push(close)
+        priceStdev = self.closes.std()
+        priceStdev = max(priceStdev if priceStdev != 0 else EPSILON, EPSILON)
+        inOverbought = close > self.closes.mean + devMultiplier * priceStdev
+        inOversold = close < self.closes.mean - devMultiplier * priceStdev
+
+        # Composite Oscillator
+        rawScore = (normalizedLiq * 0.30) + \
+                   (volumeScore * 0.25) + \
+                   (directionConviction / 100 * 0.25) + \
+                   ((momentumRsi - 50) / 50 * 0.20)
+        rawScore = _clip(_finite(rawScore), -5, 5)
+        oscillator = _clip(_finite(rawScore * 8), -10, 10)
+        oscMomentum = _clip(oscillator - self.oscillators[0], -15, 15)
+        oscAccel = _clip(oscMomentum - self.last_osc_momentum, -15, 15)
+        self.oscillators.append(oscillator)
+        self.last_osc_momentum = oscMomentum
+
+        # Divergence Detection: the bar divLookback back now has its full centred window
+        self.pivot_lows.append(low)
+        self.pivot_highs.append(high)
+        self.pivot_oscillators.append(oscillator)
+        self.bars_seen += 1
+        if self.bars_seen >= divLookback * 2 + 1:
+            if self.pivot_lows[divLookback] == min(self.pivot_lows):
+                self.pivot_low = (self.pivot_lows[divLookback], self.pivot_oscillators[divLookback])
+            if self.pivot_highs[divLookback] == max(self.pivot_highs):
+                self.pivot_high = (self.pivot_highs[divLookback], self.pivot_oscillators[divLookback])
+
+        pivotLowPrice, pivotLowOsc = self.pivot_low if self.pivot_low is not None else (low, oscillator)
+        pivotHighPrice, pivotHighOsc = self.pivot_high if self.pivot_high is not None else (high, oscillator)
+        volConfirm = volume > volMa * 0.8
+        bullishDiv = low < pivotLowPrice * 0.998 and oscillator > pivotLowOsc * 1.05 and inOversold and volConfirm
+        bearishDiv = high > pivotHighPrice * 1.002 and oscillator < pivotHighOsc * 0.95 and inOverbought and volConfirm
+
+        # Signal Generation
+        extremeLong = inOversold and oscMomentum > 0 and oscAccel > 0 and volSurge > volThreshold * 50
+        extremeShort = inOverbought and oscMomentum < 0 and oscAccel < 0 and volSurge > volThreshold * 50
+
+        values_for_scoring = {
+            'ilfo_value': oscillator, 'normalized_liq': normalizedLiq, 'vol_surge': volSurge,
+            'momentum_rsi': momentumRsi, 'osc_momentum': oscMomentum, 'osc_accel': oscAccel,
+            'volume_score': volumeScore
+        }
+        self.result = self._build_result(
+            bool(extremeLong), bool(bullishDiv), bool(extremeShort), bool(bearishDiv),
+            values_for_scoring, close, prev_close
+        )
+
+def seed_states(data_dict):
+    """ILFOState for every ticker in data_dict, seeded from one panel pass where frames line up"""
+    adaptiveLength = ILFO_PARAMS['adaptiveLength']
+    states = {}
+    history = {ticker: df.iloc[:-1] for ticker, df in data_dict.items()}
+    dates, tickers, panel, leftovers = build_ohlcv_panel(history)
+
+    if tickers and len(dates) >= adaptiveLength * 2:
+        filled, errors, cols = screen_panel(tickers, panel)
+        for j, error in errors.items():
+            states[tickers[j]] = ILFOState(tickers[j])
+            states[tickers[j]]._fail(error)
+        series = ilfo_panel_series(filled, cols) if len(cols) else {}
+        for k, j in enumerate(cols):
+            ticker = tickers[j]
+            state = ILFOState(ticker)
+            try:
+                state._seed_from_series(
+                    {name: values[:, k] for name, values in series.items()}, dates,
+                    {field: filled[field][-1, j] for field in PANEL_FIELDS}
+                )
+                state._apply_last_bar(data_dict[ticker])
+            except Exception as e:
+                state._fail(build_ilfo_error(ticker, "Error (Calc)", "Incremental seed failed", e))
+            states[ticker] = state
+    else:
+        leftovers = list(data_dict.keys())
+
+    for ticker in leftovers:
+        try:
+            states[ticker] = ILFOState(ticker, data_dict[ticker])
+        except Exception as e:
+            logging.warning(f"Could not seed incremental state for {ticker}: {e}")
+    return {ticker: states[ticker] for ticker in data_dict if ticker in states}
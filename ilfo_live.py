@@ -0,0 +1,167 @@
+import json
+import logging
+import socket
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from ilfo import PANEL_FIELDS
+from ilfo_incremental import seed_states
+
+# --- Live Scan Configuration ---
+LIVE_FEED_PORT = 8765
+
+# Record fields that decide whether a ticker is pushed to the dashboard again
+CHANGE_FIELDS = {'signal': None, 'confidence_grade': None, 'confidence_score': 1, 'pct_change': 2}
+
+# --- Bar Feeds ---
+# A feed yields batches of forming daily bars. On disk and on the wire a batch is
+# one JSON line: {"received_at": "<iso time>", "bars": [{"ticker": ..., "date":
+# "YYYY-MM-DD", "Open": ..., "High": ..., "Low": ..., "Close": ..., "Volume": ...}]}
+def parse_batch(line):
+    """(received_at, bars) from one JSON batch line"""
+    message = json.loads(line)
+    received_at = pd.Timestamp(message.get('received_at') or datetime.now())
+    return received_at, message.get('bars', [])
+
+def format_batch(received_at, bars):
+    return json.dumps({'received_at': pd.Timestamp(received_at).isoformat(), 'bars': bars}, default=float)
+
+class BarFeed:
+    """Source of forming-bar batches; a production feed subclasses this and implements batches()"""
+
+    def batches(self):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+    def __iter__(self):
+        return self.batches()
+
+class FileReplayFeed(BarFeed):
+    """Replays a recorded batch file, optionally paced by the recorded arrival times"""
+
+    def __init__(self, path, speed=None):
+        self.path = path
+        self.speed = speed
+
+    def batches(self):
+        previous = None
+        with open(self.path, 'r') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                received_at, bars = parse_batch(line)
+                if self.speed and previous is not None:
+                    time.sleep(max(0.0, (received_at - previous).total_seconds() / self.speed))
+                previous = received_at
+                yield received_at, bars
+
+class SocketFeed(BarFeed):
+    """Reads newline-delimited JSON batches from a TCP socket"""
+
+    def __init__(self, host='127.0.0.1', port=LIVE_FEED_PORT, timeout=None):
+        self.sock = socket.create_connection((host, port), timeout=timeout)
+        self.stream = self.sock.makefile('r')
+
+    def batches(self):
+        for line in self.stream:
+            if line.strip():
+                yield parse_batch(line)
+
+    def close(self):
+        self.stream.close()
+        self.sock.close()
+
+class BarRecorder(BarFeed):
+    """Passes another feed through unchanged while writing every batch to a replay file"""
+
+    def __init__(self, feed, path):
+        self.feed = feed
+        self.path = path
+
+    def batches(self):
+        with open(self.path, 'a') as f:
+            for received_at, bars in self.feed:
+                f.write(format_batch(received_at, bars) + "\n")
+                f.flush()
+                yield received_at, bars
+
+    def close(self):
+        self.feed.close()
+
+def serve_replay(path, host='127.0.0.1', port=LIVE_FEED_PORT, speed=None):
+    """Serve a recorded batch file to the first client that connects (for tests and demos)"""
+    with socket.create_server((host, port)) as server:
+        conn, _ = server.accept()
+        with conn, conn.makefile('w') as stream:
+            for received_at, bars in FileReplayFeed(path, speed).batches():
+                stream.write(format_batch(received_at, bars) + "\n")
+                stream.flush()
+
+# --- Incremental Live Scanner ---
+def _record_changed(old, new):
+    if old is None:
+        return True
+    for field, digits in CHANGE_FIELDS.items():
+        a, b = old.get(field), new.get(field)
+        if digits is None:
+            if a != b:
+                return True
+        elif not (pd.isna(a) and pd.isna(b)) and (pd.isna(a) or pd.isna(b) or round(a, digits) != round(b, digits)):
+            return True
+    return False
+
+class LiveScanner:
+    """Keeps one incremental ILFO state per ticker and re-scores only the tickers a batch touches"""
+
+    def __init__(self, data_dict):
+        started = time.perf_counter()
+        self.states = seed_states(data_dict)
+        self.results = {ticker: state.result for ticker, state in self.states.items()}
+        self.stats = {
+            'seed_seconds': time.perf_counter() - started, 'batches': 0, 'bars': 0,
+            'last_latency': 0.0, 'max_latency': 0.0, 'last_changed': 0
+        }
+        logging.info(f"Live scanner seeded {len(self.states)} tickers in {self.stats['seed_seconds']:.2f}s")
+
+    def apply(self, bars):
+        """Fold a batch of bars into the states; returns {ticker: record} for tickers whose record changed"""
+        started = time.perf_counter()
+        changed = {}
+        for bar in bars:
+            ticker = bar.get('ticker')
+            state = self.states.get(ticker)
+            if state is None:
+                continue
+            try:
+                record = state.update(bar.get('date') or bar.get('timestamp'), {field: bar.get(field, np.nan) for field in PANEL_FIELDS})
+            except ValueError as e:
+                logging.warning(f"Skipping bar: {e}")
+                continue
+            if _record_changed(self.results.get(ticker), record):
+                changed[ticker] = record
+            self.results[ticker] = record
+
+        # Latency from the batch reaching the scanner to every signal being current
+        latency = time.perf_counter() - started
+        self.stats['batches'] += 1
+        self.stats['bars'] += len(bars)
+        self.stats['last_latency'] = latency
+        self.stats['max_latency'] = max(self.stats['max_latency'], latency)
+        self.stats['last_changed'] = len(changed)
+        return changed
+
+    def run(self, feed, on_change, max_batches=None):
+        """Drive the scanner from a feed, calling on_change(changed, stats) after every batch"""
+        try:
+            for n, (received_at, bars) in enumerate(feed, start=1):
+                changed = self.apply(bars)
+                on_change(changed, self.stats)
+                if max_batches is not None and n >= max_batches:
+                    break
+        finally:
+            feed.close()
@@ -0,0 +1,215 @@
+import logging
+import math
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from ilfo import PANEL_FIELDS, build_ilfo_error, compute_ilfo_signal
+
+# --- Process Pool Configuration ---
+DEFAULT_POOL_WORKERS = max(1, os.cpu_count() or 1)
+CHUNKS_PER_WORKER = 4
+
+# --- Shared-Memory Transport ---
+# A chunk of tickers travels as one block: a (rows x 5) float64 OHLCV matrix
+# followed by the matching int64 nanosecond timestamps. Only the small
+# per-ticker layout (offsets, lengths, present columns, timezone) is pickled.
+def _attach(name):
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        return shared_memory.SharedMemory(name=name)
+
+def _pack_chunk(items):
+    """Copy a chunk of ticker frames into one shared-memory block.
+
+    Returns (shm, meta, skipped); tickers whose frames cannot be converted
+    are skipped rather than failing the chunk, and score them inline.
+    """
+    packed, skipped = [], []
+    for ticker, df in items:
+        if not isinstance(df.index, pd.DatetimeIndex):
+            skipped.append(ticker)
+            continue
+        try:
+            stamps = df.index.as_unit('ns').asi8
+            values = np.column_stack([
+                pd.to_numeric(df[field], errors='coerce').to_numpy(dtype=float, na_value=np.nan)
+                if field in df.columns else np.full(len(df), np.nan)
+                for field in PANEL_FIELDS
+            ])
+        except Exception as e:
+            logging.warning(f"Scoring {ticker} outside the pool, its bars could not be packed: {e}")
+            skipped.append(ticker)
+            continue
+        fields = [f for f in PANEL_FIELDS if f in df.columns]
+        tz = str(df.index.tz) if df.index.tz is not None else None
+        packed.append((ticker, values, stamps, fields, tz))
+
+    if not packed:
+        return None, None, skipped
+
+    total_rows = sum(len(stamps) for _, _, stamps, _, _ in packed)
+    n_fields = len(PANEL_FIELDS)
+    shm = shared_memory.SharedMemory(create=True, size=max(1, total_rows * (n_fields + 1) * 8))
+    meta = {'total_rows': total_rows, 'tickers': [], 'offsets': [], 'lengths': [], 'fields': [], 'tz': []}
+    try:
+        block = np.ndarray((total_rows, n_fields), dtype=np.float64, buffer=shm.buf)
+        block_stamps = np.ndarray((total_rows,), dtype=np.int64, buffer=shm.buf, offset=block.nbytes)
+
+        offset = 0
+        for ticker, values, stamps, fields, tz in packed:
+            length = len(stamps)
+            block[offset:offset + length] = values
+            block_stamps[offset:offset + length] = stamps
+
+            meta['tickers'].append(ticker)
+            meta['offsets'].append(offset)
+            meta['lengths'].append(length)
+            meta['fields'].append(fields)
+            meta['tz'].append(tz)
+            offset += length
+        del block, block_stamps
+    except BaseException:
+        # The block would otherwise outlive the process in /dev/shm
+        shm.close()
+        shm.unlink()
+        raise
+
+    return shm, meta, skipped
+
+def _score_shared_chunk(shm_name, meta, end_date, use_kernels):
+    """Worker entry point: rebuild each ticker frame from shared memory and score it.
+
+    Returns (results, seconds) with each ticker's compute time alongside its record.
+    """
+    shm = _attach(shm_name)
+    results = []
+    seconds = []
+    try:
+        total_rows = meta['total_rows']
+        values = np.ndarray((total_rows, len(PANEL_FIELDS)), dtype=np.float64, buffer=shm.buf)
+        stamps = np.ndarray((total_rows,), dtype=np.int64, buffer=shm.buf, offset=values.nbytes)
+
+        for ticker, start, length, fields, tz in zip(
+            meta['tickers'], meta['offsets'], meta['lengths'], meta['fields'], meta['tz']
+        ):
+            started = time.perf_counter()
+            try:
+                index = pd.DatetimeIndex(stamps[start:start + length].copy().view('datetime64[ns]'))
+                if tz is not None:
+                    index = index.tz_localize('UTC').tz_convert(tz)
+                ticker_df = pd.DataFrame(values[start:start + length].copy(), index=index, columns=PANEL_FIELDS)
+                results.append(compute_ilfo_signal(ticker, ticker_df[fields], end_date, use_kernels))
+            except Exception as e:
+                results.append(build_ilfo_error(ticker, "Error (Calc)", str(e), e))
+            seconds.append(time.perf_counter() - started)
+
+        del values, stamps
+    finally:
+        shm.close()
+    return results, seconds
+
+def _warm_up():
+    return os.getpid()
+
+# --- Warm, Reusable Process Pool ---
+class ILFOPool:
+    """Process pool that scores ticker chunks passed through shared memory"""
+
+    def __init__(self, workers=None, chunks_per_worker=CHUNKS_PER_WORKER):
+        self.workers = max(1, int(workers or DEFAULT_POOL_WORKERS))
+        self.chunks_per_worker = max(1, int(chunks_per_worker))
+        self._lock = threading.Lock()
+        self._executor = None
+        self._start()
+
+    def _start(self):
+        # spawn keeps workers independent of the Streamlit server's threads
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers, mp_context=multiprocessing.get_context('spawn')
+        )
+        for future in [self._executor.submit(_warm_up) for _ in range(self.workers)]:
+            future.result()
+        logging.info(f"ILFO process pool ready with {self.workers} workers")
+
+    def _restart(self):
+        with self._lock:
+            logging.warning("ILFO process pool broke, restarting workers")
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._start()
+
+    def score(self, data_dict, end_date, use_kernels=True, timings=None):
+        """compute_ilfo_signal for every ticker, returned in data_dict order.
+
+        Pass a dict as timings to have it filled with each ticker's compute seconds.
+        """
+        tickers = list(data_dict.keys())
+        if not tickers:
+            return []
+
+        chunk_size = math.ceil(len(tickers) / (self.workers * self.chunks_per_worker))
+        results = {}
+        inline = []
+        pending = []
+        broken = False
+
+        # Every block created here is released in the finally, whatever raises in between
+        try:
+            for start in range(0, len(tickers), chunk_size):
+                chunk = tickers[start:start + chunk_size]
+                shm, meta, skipped = _pack_chunk([(t, data_dict[t]) for t in chunk])
+                inline.extend(skipped)
+                if shm is None:
+                    continue
+                try:
+                    future = self._executor.submit(_score_shared_chunk, shm.name, meta, end_date, use_kernels)
+                except (BrokenProcessPool, RuntimeError) as e:
+                    broken = True
+                    future = e
+                pending.append((future, shm, meta['tickers']))
+
+            for future, shm, chunk_tickers in pending:
+                try:
+                    if isinstance(future, Exception):
+                        raise future
+                    chunk_results, chunk_seconds = future.result()
+                    for result, seconds in zip(chunk_results, chunk_seconds):
+                        results[result["ticker"]] = result
+                        if timings is not None:
+                            timings[result["ticker"]] = seconds
+                except Exception as e:
+                    broken = broken or isinstance(e, BrokenProcessPool)
+                    for ticker in chunk_tickers:
+                        results[ticker] = build_ilfo_error(ticker, "Error (Calc)", "Worker failure", e)
+        finally:
+            for future, shm, _ in pending:
+                if not isinstance(future, Exception):
+                    # Chunks still queued never attach; running ones keep their mapping after unlink
+                    future.cancel()
+                shm.close()
+                shm.unlink()
+
+        for ticker in inline:
+            started = time.perf_counter()
+            try:
+                results[ticker] = compute_ilfo_signal(ticker, data_dict[ticker], end_date, use_kernels)
+            except Exception as e:
+                results[ticker] = build_ilfo_error(ticker, "Error (Calc)", str(e), e)
+            if timings is not None:
+                timings[ticker] = time.perf_counter() - started
+
+        if broken:
+            self._restart()
+
+        return [results[ticker] for ticker in tickers]
+
+    def shutdown(self):
+        self._executor.shutdown(wait=True)
@@ -0,0 +1,219 @@
+import argparse
+import itertools
+import json
+import logging
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from ilfo import (
+    ILFO_PARAMS, CRITERIA_SERIES, PANEL_SIGNALS,
+    build_ohlcv_panel, screen_panel, ilfo_panel_series,
+    history_sessions, panel_signal_conditions
+)
+from ilfo_backtest import load_store_universe
+from ohlcv_store import OHLCVStore, OHLCV_STORE_DIR
+
+# --- Sweep Configuration ---
+# Cube codes index SWEEP_SIGNALS; UNSCORED marks sessions a parameter set has no signal for
+SWEEP_SIGNALS = ["Neutral"] + PANEL_SIGNALS
+UNSCORED = -1
+SWEEP_CHUNK_TICKERS = 100
+# Parameters that set a window or lag length, so have to be positive integers
+WINDOW_PARAMS = ('adaptiveLength', 'microLength', 'impactWindow', 'divLookback')
+
+# --- Parameter Grids ---
+def parameter_grid(**values):
+    """Every combination of the given ILFO_PARAMS values, e.g. parameter_grid(adaptiveLength=[14, 21], devMultiplier=[1.5, 2.0])"""
+    names = list(values)
+    return [dict(zip(names, combo)) for combo in itertools.product(*(values[name] for name in names))]
+
+def resolve_parameter_sets(param_sets):
+    """Full ILFO parameter dicts for a list of overrides of ILFO_PARAMS"""
+    resolved = []
+    for overrides in param_sets:
+        unknown = sorted(set(overrides) - set(ILFO_PARAMS))
+        if unknown:
+            raise ValueError(f"Unknown ILFO parameter(s): {', '.join(unknown)}")
+        params = dict(ILFO_PARAMS, **overrides)
+        for name in WINDOW_PARAMS:
+            if params[name] != int(params[name]) or params[name] < 1:
+                raise ValueError(f"{name} has to be a positive integer, got {params[name]!r}")
+            params[name] = int(params[name])
+        resolved.append(params)
+    if not resolved:
+        raise ValueError("The parameter grid is empty")
+    return resolved
+
+# --- Signal Cube ---
+class SignalCube:
+    """Point-in-time ILFO signals for every parameter set x ticker x session.
+
+    codes is an int8 (len(params), len(tickers), len(dates)) array of
+    SWEEP_SIGNALS indices, UNSCORED where a ticker had not listed yet, had
+    bad data or was still warming up under that parameter set.
+    """
+
+    def __init__(self, params, tickers, dates, codes):
+        self.params = params
+        self.tickers = list(tickers)
+        self.dates = pd.DatetimeIndex(dates)
+        self.codes = codes
+
+    @property
+    def varied(self):
+        """Names of the parameters that differ between sets"""
+        return [name for name in ILFO_PARAMS if len({params[name] for params in self.params}) > 1]
+
+    def parameters(self):
+        """One row per parameter set with the parameters that vary across the grid"""
+        frame = pd.DataFrame(self.params, columns=list(ILFO_PARAMS))[self.varied or list(ILFO_PARAMS)]
+        frame.index.name = 'param_set'
+        return frame
+
+    def signals(self, param_set):
+        """tickers x dates signal text for one parameter set, None where unscored"""
+        labels = np.asarray(SWEEP_SIGNALS + [None], dtype=object)
+        return pd.DataFrame(labels[self.codes[param_set]], index=self.tickers, columns=self.dates)
+
+    def signal_counts(self):
+        """How often each parameter set printed each signal, next to its parameters"""
+        counts = np.stack([np.bincount(codes.ravel() + 1, minlength=len(SWEEP_SIGNALS) + 1) for codes in self.codes])
+        counts = pd.DataFrame(np.roll(counts, -1, axis=1), columns=SWEEP_SIGNALS + ["Unscored"])
+        return self.parameters().join(counts)
+
+    def agreement(self, baseline=0):
+        """Share of the sessions both sets scored where each parameter set's signal matches the baseline set's"""
+        base = self.codes[baseline]
+        scored = (self.codes != UNSCORED) & (base != UNSCORED)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            share = ((self.codes == base) & scored).sum(axis=(1, 2)) / scored.sum(axis=(1, 2))
+        return pd.Series(share, index=self.parameters().index, name='agreement')
+
+    def to_frame(self, actionable_only=True):
+        """Long-format (param_set, date, ticker, signal) rows, by default only the non-Neutral ones"""
+        mask = self.codes > 0 if actionable_only else self.codes != UNSCORED
+        p, t, d = np.nonzero(mask)
+        return pd.DataFrame({
+            'param_set': p,
+            'date': self.dates[d],
+            'ticker': np.asarray(self.tickers, dtype=object)[t],
+            'signal': np.asarray(SWEEP_SIGNALS, dtype=object)[self.codes[p, t, d]]
+        })
+
+    def save(self, path):
+        """Write the cube to a compressed .npz"""
+        np.savez_compressed(
+            path, codes=self.codes, tickers=np.asarray(self.tickers, dtype=str),
+            dates=self.dates.asi8, params=json.dumps(self.params)
+        )
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as archive:
+            return cls(
+                json.loads(str(archive['params'])), archive['tickers'].tolist(),
+                pd.to_datetime(archive['dates']), archive['codes']
+            )
+
+# --- Batched Sweep ---
+def sweep_ilfo(data_dict, param_sets, start_date=None, end_date=None, chunk_tickers=SWEEP_CHUNK_TICKERS):
+    """SignalCube of every parameter set over the universe, computed in one pass per ticker chunk.
+
+    Within a chunk every parameter set shares one ilfo_panel_series memo, so
+    the parameter-free inputs (typical price, money flow, price velocity) are
+    built once and each rolling mean, stdev, RSI or pivot window once per
+    distinct length; thresholds like devMultiplier and volThreshold only
+    re-run the final comparisons. Frames are expected on one date index, as
+    load_ohlcv and load_store_universe return them; others are skipped.
+    """
+    param_sets = resolve_parameter_sets(param_sets)
+    dates, tickers, panel, leftovers = build_ohlcv_panel(data_dict)
+    if leftovers:
+        logging.warning(f"Sweep skipped {len(leftovers)} tickers whose bars do not line up with the universe")
+    if not tickers:
+        raise ValueError("No tickers with aligned OHLCV bars to sweep")
+
+    started = time.perf_counter()
+    index = pd.to_datetime(dates)
+    filled, _, _ = screen_panel(tickers, panel)
+    min_length = min(params['adaptiveLength'] for params in param_sets)
+    rows, scorable = history_sessions(
+        index, panel, filled, start_date or index[0], end_date or index[-1], adaptive_length=min_length
+    )
+    scorable = scorable[rows]
+    codes = np.full((len(param_sets), len(tickers), len(rows)), UNSCORED, dtype=np.int8)
+    choices = list(range(1, len(SWEEP_SIGNALS)))
+
+    for start in range(0, len(tickers), chunk_tickers):
+        chunk = np.arange(start, min(start + chunk_tickers, len(tickers)))
+        cols = chunk[scorable[:, chunk].any(axis=0)]
+        if len(rows) == 0 or len(cols) == 0:
+            continue
+
+        memo = {}
+        for p, params in enumerate(param_sets):
+            series = ilfo_panel_series(filled, cols, point_in_time=True, params=params, memo=memo)
+            signal = np.select(panel_signal_conditions(series, rows), choices, default=0)
+            valid = scorable[:, cols] & (rows >= params['adaptiveLength'] * 2 - 1)[:, None]
+            for name in CRITERIA_SERIES.values():
+                valid &= np.isfinite(series[name][rows])
+            codes[p, cols] = np.where(valid, signal, UNSCORED).T
+
+    logging.info(
+        f"🧪 Swept {len(param_sets)} parameter sets over {len(tickers)} tickers x {len(rows)} sessions "
+        f"in {time.perf_counter() - started:.2f}s"
+    )
+    return SignalCube(param_sets, tickers, index[rows], codes)
+
+# --- Command Line ---
+def parse_param_values(text):
+    """('name', [values]) from NAME=V1,V2,..."""
+    name, _, values = text.partition('=')
+    if not values:
+        raise argparse.ArgumentTypeError(f"Expected NAME=V1,V2,... but got '{text}'")
+    try:
+        return name.strip(), [json.loads(value) for value in values.split(',')]
+    except json.JSONDecodeError as e:
+        raise argparse.ArgumentTypeError(f"Bad value in '{text}': {e}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Sweep ILFO parameter grids over stored history into a (params x ticker x date) signal cube")
+    parser.add_argument('--store', default=OHLCV_STORE_DIR, help="OHLCV store directory to read history from")
+    parser.add_argument('--tickers', nargs='*', help="Tickers to include (default: everything in the store)")
+    parser.add_argument('--years', type=float, default=2, help="Years of signals to sweep")
+    parser.add_argument('--end-date', type=lambda s: datetime.strptime(s, '%Y-%m-%d').date(), default=datetime.today().date())
+    parser.add_argument('--param', type=parse_param_values, action='append', default=[], metavar="NAME=V1,V2",
+                        help="Values to sweep for one ILFO parameter; repeat to cross several")
+    parser.add_argument('--grid', help="JSON file with a list of parameter overrides, swept as given")
+    parser.add_argument('--chunk-tickers', type=int, default=SWEEP_CHUNK_TICKERS)
+    parser.add_argument('--output', default="ilfo_sweep.npz", help="Where to write the signal cube")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    if args.grid:
+        with open(args.grid) as f:
+            param_sets = json.load(f)
+    else:
+        param_sets = parameter_grid(**dict(args.param))
+    try:
+        param_sets = resolve_parameter_sets(param_sets)
+    except ValueError as e:
+        parser.error(str(e))
+
+    start_date = args.end_date - timedelta(days=int(args.years * 365.25))
+    # Pad the window so the longest adaptiveLength is warmed up by start_date
+    warmup_days = max(params['adaptiveLength'] for params in param_sets) * 2 * 7 // 5 + 14
+    data_dict = load_store_universe(OHLCVStore(args.store), args.tickers, start_date - timedelta(days=warmup_days), args.end_date)
+    if not data_dict:
+        parser.error(f"No stored history found in {args.store}")
+
+    cube = sweep_ilfo(data_dict, param_sets, start_date, args.end_date, args.chunk_tickers)
+    print(cube.signal_counts().join(cube.agreement()).round(3).to_string())
+    cube.save(args.output)
+    logging.info(f"Signal cube {cube.codes.shape} written to {args.output}")
+
+if __name__ == "__main__":
+    main()
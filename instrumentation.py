@@ -0,0 +1,207 @@
+import functools
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+import numpy as np
+
+# --- Instrumentation Configuration ---
+PERF_DIR = "perf_logs"
+PROMETHEUS_FILE = "sanket.prom"
+SLOW_TICKER_COUNT = 20
+METRIC_PREFIX = "sanket"
+
+# --- Cache Layer Counters ---
+class CacheStats:
+    """Process-wide call and miss counts per cache layer; hits are calls that did not miss"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self._misses = {}
+
+    def record_call(self, layer):
+        with self._lock:
+            self._calls[layer] = self._calls.get(layer, 0) + 1
+
+    def record_miss(self, layer):
+        with self._lock:
+            self._misses[layer] = self._misses.get(layer, 0) + 1
+
+    def snapshot(self):
+        """{layer: {'calls', 'hits', 'misses'}}"""
+        with self._lock:
+            return {
+                layer: {'calls': calls, 'hits': calls - self._misses.get(layer, 0), 'misses': self._misses.get(layer, 0)}
+                for layer, calls in self._calls.items()
+            }
+
+CACHE_STATS = CacheStats()
+
+def tracked_cache(cache_decorator, layer=None, stats=CACHE_STATS):
+    """Apply a cache decorator (st.cache_data(...), st.cache_resource(...)) and count its hits and misses.
+
+    The miss counter lives inside the cached body, so it only runs when the
+    cache actually calls through; every call through the wrapper is counted.
+    """
+    def wrap(fn):
+        name = layer or fn.__name__
+
+        @functools.wraps(fn)
+        def body(*args, **kwargs):
+            stats.record_miss(name)
+            return fn(*args, **kwargs)
+
+        cached = cache_decorator(body)
+
+        @functools.wraps(fn)
+        def call(*args, **kwargs):
+            stats.record_call(name)
+            return cached(*args, **kwargs)
+
+        call.clear = getattr(cached, 'clear', None)
+        return call
+    return wrap
+
+# --- Run Profiles ---
+class RunProfile:
+    """Timed stages, per-ticker compute durations, cache counters and gauges for one run"""
+
+    def __init__(self, run, cache_stats=CACHE_STATS, **meta):
+        self.run = run
+        self.meta = meta
+        self.started_at = datetime.now()
+        self.spans = []
+        self.ticker_seconds = {}
+        self.gauges = {}
+        self._cache_stats = cache_stats
+        self._cache_before = cache_stats.snapshot()
+        self._started = time.perf_counter()
+        self.total_seconds = None
+
+    @contextmanager
+    def span(self, stage, **meta):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.spans.append({
+                'stage': stage,
+                'offset': started - self._started,
+                'seconds': time.perf_counter() - started,
+                **meta
+            })
+
+    def record_tickers(self, durations):
+        """Merge {ticker: compute seconds}"""
+        self.ticker_seconds.update(durations)
+
+    def record_gauges(self, **values):
+        """Point-in-time readings to report with the run, e.g. cache memory in use"""
+        self.gauges.update(values)
+
+    def finish(self):
+        self.total_seconds = time.perf_counter() - self._started
+        return self
+
+    def stage_totals(self):
+        """[{'stage', 'calls', 'seconds'}] summed over repeated spans, in first-seen order"""
+        totals = {}
+        for span in self.spans:
+            entry = totals.setdefault(span['stage'], {'stage': span['stage'], 'calls': 0, 'seconds': 0.0})
+            entry['calls'] += 1
+            entry['seconds'] += span['seconds']
+        return list(totals.values())
+
+    def cache_deltas(self):
+        """Hits and misses per cache layer during this run, next to the process totals"""
+        after = self._cache_stats.snapshot()
+        deltas = {}
+        for layer, totals in after.items():
+            before = self._cache_before.get(layer, {'calls': 0, 'hits': 0, 'misses': 0})
+            deltas[layer] = {
+                'hits': totals['hits'] - before['hits'],
+                'misses': totals['misses'] - before['misses'],
+                'total_hits': totals['hits'],
+                'total_misses': totals['misses']
+            }
+        return deltas
+
+    def ticker_summary(self, slowest=SLOW_TICKER_COUNT):
+        if not self.ticker_seconds:
+            return {'count': 0, 'slowest': []}
+        seconds = np.fromiter(self.ticker_seconds.values(), dtype=float)
+        ranked = sorted(self.ticker_seconds.items(), key=lambda item: item[1], reverse=True)[:slowest]
+        return {
+            'count': len(seconds),
+            'total': float(seconds.sum()),
+            'mean': float(seconds.mean()),
+            'p50': float(np.percentile(seconds, 50)),
+            'p95': float(np.percentile(seconds, 95)),
+            'max': float(seconds.max()),
+            'slowest': [{'ticker': ticker, 'seconds': s} for ticker, s in ranked]
+        }
+
+    def to_dict(self):
+        return {
+            'run': self.run,
+            'started_at': self.started_at.isoformat(timespec='seconds'),
+            'total_seconds': self.total_seconds,
+            'meta': self.meta,
+            'stages': self.stage_totals(),
+            'spans': self.spans,
+            'tickers': self.ticker_summary(),
+            'caches': self.cache_deltas(),
+            'gauges': self.gauges
+        }
+
+    def to_prometheus(self):
+        """Prometheus text exposition of the run (textfile-collector format)"""
+        p = METRIC_PREFIX
+        lines = [
+            f"# HELP {p}_run_seconds Wall time of the last {self.run}",
+            f"# TYPE {p}_run_seconds gauge",
+            f'{p}_run_seconds{{run="{self.run}"}} {self.total_seconds or 0.0:.6f}',
+            f"# HELP {p}_stage_seconds Wall time per stage of the last run",
+            f"# TYPE {p}_stage_seconds gauge"
+        ]
+        lines += [f'{p}_stage_seconds{{run="{self.run}",stage="{s["stage"]}"}} {s["seconds"]:.6f}' for s in self.stage_totals()]
+
+        tickers = self.ticker_summary()
+        if tickers['count']:
+            lines += [
+                f"# HELP {p}_ticker_compute_seconds Per-ticker compute time of the last run",
+                f"# TYPE {p}_ticker_compute_seconds summary",
+                f'{p}_ticker_compute_seconds{{quantile="0.5"}} {tickers["p50"]:.6f}',
+                f'{p}_ticker_compute_seconds{{quantile="0.95"}} {tickers["p95"]:.6f}',
+                f'{p}_ticker_compute_seconds{{quantile="1"}} {tickers["max"]:.6f}',
+                f"{p}_ticker_compute_seconds_sum {tickers['total']:.6f}",
+                f"{p}_ticker_compute_seconds_count {tickers['count']}"
+            ]
+
+        caches = self.cache_deltas()
+        for kind in ('hits', 'misses'):
+            lines += [f"# HELP {p}_cache_{kind}_total Cache {kind} per layer since the process started", f"# TYPE {p}_cache_{kind}_total counter"]
+            lines += [f'{p}_cache_{kind}_total{{layer="{layer}"}} {counts[f"total_{kind}"]}' for layer, counts in caches.items()]
+        for name, value in self.gauges.items():
+            lines += [f"# HELP {p}_{name} Reading at the end of the last {self.run}", f"# TYPE {p}_{name} gauge", f"{p}_{name} {value}"]
+        return "\n".join(lines) + "\n"
+
+    def dump(self, directory=PERF_DIR):
+        """Write the run as JSON (one file per run) and refresh the Prometheus text file; returns both paths"""
+        os.makedirs(directory, exist_ok=True)
+        json_path = os.path.join(directory, f"{self.run}_{self.started_at:%Y%m%d_%H%M%S}.json")
+        with open(json_path, 'w') as f:
+            json.dump(self.to_dict(), f, indent=2, default=str)
+
+        prom_path = os.path.join(directory, PROMETHEUS_FILE)
+        tmp_path = f"{prom_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            f.write(self.to_prometheus())
+        os.replace(tmp_path, prom_path)
+        logging.info(f"Run profile written to {json_path} and {prom_path}")
+        return json_path, prom_path
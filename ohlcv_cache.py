@@ -0,0 +1,149 @@
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from instrumentation import CACHE_STATS
+
+# --- OHLCV Cache Configuration ---
+OHLCV_CACHE_ENV = "SANKET_OHLCV_CACHE_MB"
+OHLCV_CACHE_MB = 1024
+OHLCV_CACHE_TTL_SECONDS = 300
+OHLCV_CACHE_LAYER = "ohlcv_bars"
+
+def ohlcv_cache_max_bytes():
+    """Memory ceiling from $SANKET_OHLCV_CACHE_MB, else OHLCV_CACHE_MB"""
+    megabytes = os.environ.get(OHLCV_CACHE_ENV, "").strip()
+    try:
+        return int(float(megabytes or OHLCV_CACHE_MB) * 1024 * 1024)
+    except ValueError:
+        logging.warning(f"Ignoring {OHLCV_CACHE_ENV}={megabytes!r}, using {OHLCV_CACHE_MB} MB")
+        return OHLCV_CACHE_MB * 1024 * 1024
+
+# --- Packed Ticker Bars ---
+class TickerBars:
+    """One ticker's bars in a single read-only dates x fields float64 block"""
+
+    def __init__(self, dates, columns, values):
+        values.setflags(write=False)
+        self.dates = dates
+        self.columns = columns
+        self.values = values
+
+    @classmethod
+    def pack(cls, df):
+        """Bars of a load_ohlcv frame, without the empty rows aligning it to its universe added"""
+        df = df.dropna(how='all')
+        return cls(df.index, pd.Index(df.columns), df.to_numpy(dtype=float, na_value=np.nan))
+
+    @property
+    def nbytes(self):
+        return self.values.nbytes + self.dates.nbytes
+
+    def frame(self, dates=None):
+        """DataFrame of the bars, viewing the shared block unless it has to be realigned to dates"""
+        df = pd.DataFrame(self.values, index=self.dates, columns=self.columns, copy=False)
+        return df if dates is None or dates.equals(self.dates) else df.reindex(dates)
+
+def assemble_universe(bars):
+    """{ticker: DataFrame} on the union of the tickers' dates, as load_ohlcv aligns them"""
+    dates = None
+    for ticker_bars in bars.values():
+        if dates is None:
+            dates = ticker_bars.dates
+        elif not ticker_bars.dates.equals(dates):
+            dates = dates.union(ticker_bars.dates)
+    return {ticker: ticker_bars.frame(dates) for ticker, ticker_bars in bars.items()}
+
+# --- Bounded Process-Wide Cache ---
+class OHLCVCache:
+    """LRU of per-ticker bars under a memory ceiling, shared by every session and universe in the process.
+
+    Entries are keyed by (ticker, window), window being e.g. (end_date,
+    buffer_days), so overlapping universes (NIFTY 50 inside NIFTY 500) hold
+    each ticker's bars once and only load the tickers no one has loaded yet.
+    Hits are handed out as DataFrame views over the cached blocks, so
+    nothing is pickled or copied unless a universe's dates have to be
+    realigned. Entries expire after ttl seconds so intraday bars are picked
+    up again. Lookups count one call per ticker against the
+    OHLCV_CACHE_LAYER cache counters.
+    """
+
+    def __init__(self, max_bytes=None, ttl=OHLCV_CACHE_TTL_SECONDS, stats=CACHE_STATS, layer=OHLCV_CACHE_LAYER):
+        self.max_bytes = ohlcv_cache_max_bytes() if max_bytes is None else max_bytes
+        self.ttl = ttl
+        self.evictions = 0
+        self.expirations = 0
+        self._bytes = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = stats
+        self._layer = layer
+
+    def get_or_load(self, tickers, window, load):
+        """(data_dict, message) for tickers over window; load(missing_tickers) -> (data_dict, message) fetches the rest"""
+        tickers = list(dict.fromkeys(tickers))
+        found = {}
+        with self._lock:
+            now = time.monotonic()
+            for ticker in tickers:
+                key = (ticker, window)
+                entry = self._entries.get(key)
+                if entry is not None and now - entry[1] > self.ttl:
+                    self._drop(key)
+                    self.expirations += 1
+                    entry = None
+                if entry is not None:
+                    self._entries.move_to_end(key)
+                    found[ticker] = entry[0]
+        for ticker in tickers:
+            self._stats.record_call(self._layer)
+            if ticker not in found:
+                self._stats.record_miss(self._layer)
+
+        missing = [ticker for ticker in tickers if ticker not in found]
+        cached = len(found)
+        message = f"✓ Loaded {cached} tickers from the shared OHLCV cache"
+        if missing:
+            data_dict, message = load(missing)
+            for ticker, ticker_df in (data_dict or {}).items():
+                found[ticker] = TickerBars.pack(ticker_df)
+                self._put((ticker, window), found[ticker])
+            if cached and data_dict:
+                message = f"{message}; {cached} more from the shared OHLCV cache"
+        if not found:
+            return None, message
+        return assemble_universe({ticker: found[ticker] for ticker in tickers if ticker in found}), message
+
+    def _put(self, key, bars):
+        if bars.nbytes > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (bars, time.monotonic())
+            self._bytes += bars.nbytes
+            while self._bytes > self.max_bytes:
+                self._drop(next(iter(self._entries)))
+                self.evictions += 1
+
+    def _drop(self, key):
+        bars, _ = self._entries.pop(key)
+        self._bytes -= bars.nbytes
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def usage(self):
+        """Tickers held, bytes held, the ceiling, evictions and expirations so far"""
+        with self._lock:
+            return {
+                'entries': len(self._entries), 'bytes': self._bytes, 'max_bytes': self.max_bytes,
+                'evictions': self.evictions, 'expirations': self.expirations
+            }
@@ -0,0 +1,175 @@
+import logging
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import timedelta
+
+import pandas as pd
+
+# --- Downloader Configuration ---
+DOWNLOAD_CHUNK_SIZE = 50
+DOWNLOAD_WORKERS = 4
+DOWNLOAD_RETRIES = 3
+DOWNLOAD_RETRY_BACKOFF = 1.0
+DOWNLOAD_TIMEOUT = 20
+# How long a ticker the source answered without (delisted, renamed) is skipped for that window
+MISSING_TICKER_TTL_SECONDS = 6 * 3600
+
+# --- Single Request ---
+def split_download(all_data, tickers):
+    """{ticker: bars} from one yf.download frame, skipping tickers without a single close"""
+    if all_data is None or all_data.empty:
+        return {}
+
+    data_dict = {}
+    if isinstance(all_data.columns, pd.MultiIndex):
+        available = set(all_data.columns.get_level_values(0))
+        for ticker in tickers:
+            if ticker not in available:
+                continue
+            ticker_df = all_data.xs(ticker, level=0, axis=1)
+            if not ticker_df.empty and not ticker_df['Close'].isnull().all():
+                data_dict[ticker] = ticker_df
+    elif len(tickers) == 1 and 'Close' in all_data.columns and not all_data['Close'].isnull().all():
+        data_dict[tickers[0]] = all_data
+    return data_dict
+
+def download_ohlcv(tickers, start_date, end_date, timeout=DOWNLOAD_TIMEOUT):
+    """Download daily bars for [start_date, end_date] in one request and split them per ticker"""
+    import yfinance as yf
+    all_data = yf.download(
+        list(tickers),
+        start=start_date,
+        end=end_date + timedelta(days=1),
+        progress=False,
+        auto_adjust=True,
+        group_by='ticker',
+        threads=False,
+        timeout=timeout
+    )
+    return split_download(all_data, list(tickers))
+
+# --- Known Misses ---
+class MissingTickers:
+    """Tickers a download window definitively came back without, skipped for ttl seconds.
+
+    Delisted or renamed index constituents never reach the OHLCV store, so
+    without this every scan would ask for them again.
+    """
+
+    def __init__(self, ttl=MISSING_TICKER_TTL_SECONDS):
+        self.ttl = ttl
+        self._seen = {}
+        self._lock = threading.Lock()
+
+    def add(self, tickers, start_date, end_date):
+        now = time.monotonic()
+        with self._lock:
+            for ticker in tickers:
+                self._seen[(ticker, start_date, end_date)] = now
+
+    def known(self, ticker, start_date, end_date):
+        with self._lock:
+            seen = self._seen.get((ticker, start_date, end_date))
+            if seen is not None and time.monotonic() - seen > self.ttl:
+                del self._seen[(ticker, start_date, end_date)]
+                seen = None
+        return seen is not None
+
+# --- Chunked, Retrying, Parallel Download ---
+def _download_chunk(download, chunk_id, attempt, tickers, start_date, end_date):
+    started = time.perf_counter()
+    error = None
+    try:
+        data = download(tickers, start_date, end_date)
+    except Exception as e:
+        data, error = {}, e
+    stats = {
+        'window': f"{start_date} → {end_date}",
+        'chunk': chunk_id,
+        'attempt': attempt,
+        'tickers': len(tickers),
+        'downloaded': len(data),
+        'failed': len(tickers) - len(data),
+        'seconds': time.perf_counter() - started,
+        'error': str(error) if error is not None else None
+    }
+    return tickers, data, error, stats
+
+def download_chunked(tickers, start_date, end_date, on_chunk=None, chunk_size=DOWNLOAD_CHUNK_SIZE,
+                     workers=DOWNLOAD_WORKERS, retries=DOWNLOAD_RETRIES, backoff=DOWNLOAD_RETRY_BACKOFF,
+                     download=download_ohlcv, misses=None):
+    """Download tickers in chunks on a bounded thread pool, retrying only the tickers that failed.
+
+    Every chunk is handed to on_chunk(data) on the calling thread as soon as it
+    completes, so callers can persist it before the rest of the window is done.
+    A ticker fails when its chunk raised or came back empty; failed tickers
+    are re-chunked and retried with exponential backoff. A ticker missing from
+    a chunk that returned bars for others has no bars to give and is not
+    retried; with a MissingTickers as misses it is recorded there and skipped
+    by later calls for the same window. A window in which no chunk returned
+    any bars at all is treated as having nothing to download (weekend/holiday)
+    and is not retried. Returns (data_dict, chunk_stats).
+    """
+    tickers = list(tickers)
+    if misses is not None:
+        skipped = {ticker for ticker in tickers if misses.known(ticker, start_date, end_date)}
+        if skipped:
+            logging.info(f"Skipping {len(skipped)} tickers with no bars for {start_date} → {end_date} earlier this session")
+            tickers = [ticker for ticker in tickers if ticker not in skipped]
+    data_dict = {}
+    chunk_stats = []
+    absent = []
+    pending = tickers
+    raised = False
+    if not tickers:
+        return data_dict, chunk_stats
+
+    for attempt in range(1, max(1, retries) + 1):
+        if attempt > 1:
+            delay = backoff * (2 ** (attempt - 2)) * (1 + random.random() * 0.25)
+            logging.info(f"Retrying {len(pending)} failed tickers for {start_date} → {end_date} in {delay:.1f}s (attempt {attempt}/{retries})")
+            time.sleep(delay)
+
+        chunks = [pending[i:i + chunk_size] for i in range(0, len(pending), max(1, chunk_size))]
+        failed = []
+        with ThreadPoolExecutor(max_workers=max(1, min(workers, len(chunks)))) as pool:
+            futures = [
+                pool.submit(_download_chunk, download, chunk_id, attempt, chunk, start_date, end_date)
+                for chunk_id, chunk in enumerate(chunks)
+            ]
+            for future in as_completed(futures):
+                chunk, data, error, stats = future.result()
+                chunk_stats.append(stats)
+                if error is not None:
+                    raised = True
+                    logging.warning(f"Chunk {stats['chunk']} ({len(chunk)} tickers) failed on attempt {attempt}: {error}")
+                data_dict.update(data)
+                missing = [ticker for ticker in chunk if ticker not in data]
+                if error is not None or not data:
+                    failed.extend(missing)
+                else:
+                    # The source answered for the rest of the chunk, so a retry would not find these either
+                    absent.extend(missing)
+                if data and on_chunk is not None:
+                    on_chunk(data)
+
+        failed = set(failed)
+        pending = [ticker for ticker in tickers if ticker in failed]
+        if not pending or (not data_dict and not raised):
+            break
+
+    if pending and (data_dict or raised):
+        logging.warning(f"{len(pending)} tickers still missing for {start_date} → {end_date} after {attempt} attempts")
+    if absent:
+        logging.info(f"{len(absent)} tickers returned no bars for {start_date} → {end_date} (delisted or renamed?)")
+        if misses is not None:
+            misses.add(absent, start_date, end_date)
+    return data_dict, chunk_stats
+
+def summarize_chunks(chunk_stats):
+    """Per-chunk timing and failure statistics as a frame, slowest first"""
+    if not chunk_stats:
+        return pd.DataFrame(columns=['window', 'chunk', 'attempt', 'tickers', 'downloaded', 'failed', 'seconds', 'error'])
+    return pd.DataFrame(chunk_stats).sort_values('seconds', ascending=False, kind='stable').reset_index(drop=True)
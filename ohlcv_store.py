@@ -0,0 +1,201 @@
+import json
+import logging
+import os
+import re
+import threading
+from datetime import date, datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+# --- Store Configuration ---
+OHLCV_STORE_DIR = "ohlcv_store"
+MANIFEST_FILE = "manifest.json"
+RECONCILE_OVERLAP_DAYS = 10
+ADJUSTMENT_TOLERANCE = 1e-4
+
+def _to_date(value):
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(str(value)[:10])
+
+# --- Persistent Per-Ticker OHLCV Store ---
+class OHLCVStore:
+    """Parquet file per ticker plus a manifest of the date range each one covers.
+
+    For every ticker the manifest records covered_from/covered_to (the
+    download window already requested) and last_date (the last bar actually
+    stored), so a scan only has to fetch from last_date to the analysis date.
+    """
+
+    def __init__(self, root=OHLCV_STORE_DIR):
+        self.root = root
+        self._lock = threading.RLock()
+        os.makedirs(self.root, exist_ok=True)
+        self._manifest = self._load_manifest()
+
+    def _manifest_path(self):
+        return os.path.join(self.root, MANIFEST_FILE)
+
+    def _load_manifest(self):
+        path = self._manifest_path()
+        if not os.path.exists(path):
+            return {}
+        try:
+            with open(path, 'r') as f:
+                return json.load(f)
+        except Exception as e:
+            logging.warning(f"OHLCV store manifest unreadable, starting fresh: {e}")
+            return {}
+
+    def _save_manifest(self):
+        path = self._manifest_path()
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self._manifest, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, path)
+
+    def path(self, ticker):
+        return os.path.join(self.root, re.sub(r'[^A-Za-z0-9._&-]', '_', ticker) + ".parquet")
+
+    def coverage(self, ticker):
+        """Manifest entry for ticker with dates parsed, or None if never stored"""
+        with self._lock:
+            entry = self._manifest.get(ticker)
+        if not entry:
+            return None
+        return {key: _to_date(value) for key, value in entry.items()}
+
+    def tickers(self):
+        with self._lock:
+            return list(self._manifest.keys())
+
+    def read(self, ticker, start=None, end=None):
+        """Stored bars for ticker, optionally sliced to [start, end]"""
+        path = self.path(ticker)
+        if ticker not in self._manifest or not os.path.exists(path):
+            return None
+        try:
+            df = pd.read_parquet(path)
+        except Exception as e:
+            logging.warning(f"Could not read stored bars for {ticker}: {e}")
+            return None
+        if start is not None:
+            df = df[df.index >= pd.Timestamp(start)]
+        if end is not None:
+            df = df[df.index < pd.Timestamp(end) + timedelta(days=1)]
+        return df
+
+    def write(self, ticker, new_bars, covered_from, covered_to, replace=False, flush=True):
+        """Merge freshly downloaded bars into the store; newer bars win on overlap.
+
+        Bars are replaced on disk before the manifest moves forward, so an
+        interrupted write only ever makes the store look older than it is.
+        Pass flush=False when writing many tickers and call flush() once.
+        """
+        covered_from, covered_to = _to_date(covered_from), _to_date(covered_to)
+        new_bars = new_bars.dropna(how='all')
+        with self._lock:
+            entry = self.coverage(ticker)
+            if entry is not None and (covered_to < entry['covered_from'] - timedelta(days=1)
+                                      or covered_from > entry['covered_to'] + timedelta(days=1)):
+                # Disjoint windows would leave a hole inside the recorded coverage
+                replace = True
+            existing = None if replace else self.read(ticker)
+
+            if existing is not None and not existing.empty and new_bars.empty:
+                merged = existing
+                covered_from = min(covered_from, entry['covered_from'])
+                covered_to = max(covered_to, entry['covered_to'])
+            elif existing is not None and not existing.empty:
+                merged = pd.concat([existing, new_bars])
+                merged = merged[~merged.index.duplicated(keep='last')].sort_index()
+                covered_from = min(covered_from, entry['covered_from'])
+                covered_to = max(covered_to, entry['covered_to'])
+            else:
+                merged = new_bars.sort_index()
+
+            if merged.empty:
+                return
+
+            if merged is not existing:
+                path = self.path(ticker)
+                tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+                merged.to_parquet(tmp_path)
+                os.replace(tmp_path, path)
+
+            self._manifest[ticker] = {
+                'covered_from': covered_from.isoformat(),
+                'covered_to': covered_to.isoformat(),
+                'last_date': merged.index.max().date().isoformat()
+            }
+            if flush:
+                self._save_manifest()
+
+    def flush(self):
+        with self._lock:
+            self._save_manifest()
+
+    def drop(self, ticker):
+        with self._lock:
+            self._manifest.pop(ticker, None)
+            self._save_manifest()
+            if os.path.exists(self.path(ticker)):
+                os.remove(self.path(ticker))
+
+def plan_fetches(store, tickers, start_date, end_date, today=None, overlap_days=RECONCILE_OVERLAP_DAYS):
+    """Group tickers by the download window their missing bars fall in.
+
+    Returns {(fetch_start, fetch_end): [tickers]} covering only what the
+    store lacks for [start_date, end_date]: a backfill before the stored
+    range and/or a gap after it. A gap fetch reaches overlap_days back past
+    the last stored bar, so a partial (still forming) session gets
+    overwritten and adjustment_drift has settled bars to compare against;
+    a backfill reaches overlap_days into the stored range for the same check.
+    """
+    start_date, end_date = _to_date(start_date), _to_date(end_date)
+    today = _to_date(today) or datetime.today().date()
+    plan = {}
+
+    for ticker in tickers:
+        entry = store.coverage(ticker)
+        if entry is None or end_date < entry['covered_from']:
+            windows = [(start_date, end_date)]
+        else:
+            windows = []
+            if entry['covered_from'] > start_date:
+                backfill_end = min(entry['covered_from'] + timedelta(days=overlap_days), entry['last_date'])
+                windows.append((start_date, max(backfill_end, entry['covered_from'] - timedelta(days=1))))
+            if end_date > entry['covered_to'] or (entry['covered_to'] >= today and end_date >= entry['last_date']):
+                gap_start = max(entry['last_date'] - timedelta(days=overlap_days), entry['covered_from'])
+                windows.append((min(gap_start, end_date), end_date))
+        for window in windows:
+            plan.setdefault(window, []).append(ticker)
+
+    return plan
+
+# --- Corporate-Action Reconciliation ---
+# Prices are downloaded with auto_adjust=True, so a split or dividend rescales
+# every earlier bar. Stored bars are only safe to extend while the overlap of a
+# fresh download still agrees with them.
+def adjustment_drift(stored, fresh, tolerance=ADJUSTMENT_TOLERANCE):
+    """Median fresh/stored close ratio over the overlap, or None if they agree"""
+    if stored is None or stored.empty or fresh is None or fresh.empty:
+        return None
+
+    # The last stored bar may have been a forming session, so only settled bars count
+    settled = stored.index[stored.index < stored.index.max()]
+    common = settled.intersection(fresh.index)
+    if len(common) == 0:
+        return None
+
+    ratio = (fresh.loc[common, 'Close'] / stored.loc[common, 'Close']).replace([np.inf, -np.inf], np.nan).dropna()
+    if ratio.empty:
+        return None
+
+    factor = float(ratio.median())
+    return factor if abs(factor - 1) > tolerance else None
@@ -0,0 +1,149 @@
+import hashlib
+import json
+import logging
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from ilfo import ILFO_PARAMS, OPTIMAL_RANGES, STATISTICAL_ANCHORS, PANEL_FIELDS
+from instrumentation import CACHE_STATS
+
+# --- Result Cache Configuration ---
+RESULT_CACHE_ENTRIES = 20000
+RESULT_SPILL_ENTRIES = 500000
+RESULT_CACHE_DB_FILE = "ilfo_results.db"
+RESULT_CACHE_LAYER = "ilfo_results"
+# Bump when the ILFO code changes its output without touching ILFO_PARAMS or the scoring tables
+RESULT_CACHE_VERSION = 1
+
+# --- Cache Keys ---
+def model_fingerprint():
+    """Digest of the ILFO parameters, scoring tables and RESULT_CACHE_VERSION"""
+    model = json.dumps([RESULT_CACHE_VERSION, ILFO_PARAMS, OPTIMAL_RANGES, STATISTICAL_ANCHORS], sort_keys=True)
+    return hashlib.blake2b(model.encode(), digest_size=16).hexdigest()
+
+def bars_digest(df):
+    """Digest of the bars a ticker is scored from: the dates and the OHLCV values"""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(np.ascontiguousarray(pd.DatetimeIndex(df.index).asi8).tobytes())
+    digest.update(np.ascontiguousarray(df.reindex(columns=PANEL_FIELDS).to_numpy(dtype=float)).tobytes())
+    return digest.hexdigest()
+
+def result_key(ticker, df, end_date, fingerprint):
+    """Cache key of one ticker's ILFO result: ticker, scan date, bars and model all have to match"""
+    return f"{ticker}|{end_date}|{bars_digest(df)}|{fingerprint}"
+
+# --- Bounded Result Cache ---
+class ResultCache:
+    """LRU of per-ticker ILFO records keyed by result_key, shared by every universe, date and session.
+
+    Holds at most max_entries records in memory. With a spill_path, evicted
+    records (and everything on flush()) go to a SQLite table (WAL, like the
+    sector store) and memory misses are looked up there before being reported
+    as misses; the table keeps the spill_entries most recently written rows. Lookups count one call per
+    ticker against the RESULT_CACHE_LAYER cache counters.
+    """
+
+    def __init__(self, max_entries=RESULT_CACHE_ENTRIES, spill_path=None, spill_entries=RESULT_SPILL_ENTRIES,
+                 stats=CACHE_STATS, layer=RESULT_CACHE_LAYER):
+        self.max_entries = max_entries
+        self.spill_entries = spill_entries
+        self.fingerprint = model_fingerprint()
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = stats
+        self._layer = layer
+        self._conn = None
+        if spill_path:
+            self._conn = sqlite3.connect(spill_path, timeout=30, check_same_thread=False)
+            self._spill_lock = threading.Lock()
+            with self._spill_lock, self._conn:
+                self._conn.execute("PRAGMA journal_mode=WAL")
+                self._conn.execute("CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, record BLOB NOT NULL, stored_at REAL NOT NULL)")
+                self._conn.execute("CREATE INDEX IF NOT EXISTS results_stored_at ON results (stored_at)")
+
+    def __len__(self):
+        return len(self._entries)
+
+    def key(self, ticker, df, end_date):
+        return result_key(ticker, df, end_date, self.fingerprint)
+
+    def get_many(self, keys):
+        """{key: record} for the keys held in memory or in the spill table"""
+        keys = list(keys)
+        found = {}
+        with self._lock:
+            for key in keys:
+                record = self._entries.get(key)
+                if record is not None:
+                    self._entries.move_to_end(key)
+                    found[key] = record
+
+        missing = [key for key in keys if key not in found]
+        if missing and self._conn is not None:
+            spilled = self._read_spill(missing)
+            if spilled:
+                self.put_many(spilled)
+                found.update(spilled)
+
+        for key in keys:
+            self._stats.record_call(self._layer)
+            if key not in found:
+                self._stats.record_miss(self._layer)
+        return found
+
+    def put_many(self, records):
+        """Store {key: record}, evicting (and spilling) the least recently used beyond max_entries"""
+        evicted = {}
+        with self._lock:
+            for key, record in records.items():
+                self._entries[key] = record
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                key, record = self._entries.popitem(last=False)
+                evicted[key] = record
+            self.evictions += len(evicted)
+        if evicted and self._conn is not None:
+            self._write_spill(evicted)
+
+    def flush(self):
+        """Write every in-memory record to the spill table, so a later process starts warm"""
+        if self._conn is None:
+            return
+        with self._lock:
+            records = dict(self._entries)
+        if records:
+            self._write_spill(records)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def _read_spill(self, keys):
+        spilled = {}
+        with self._spill_lock:
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                query = f"SELECT key, record FROM results WHERE key IN ({','.join('?' * len(chunk))})"
+                for key, blob in self._conn.execute(query, chunk):
+                    spilled[key] = pickle.loads(blob)
+        return spilled
+
+    def _write_spill(self, records):
+        stored_at = time.time()
+        rows = [(key, pickle.dumps(record, protocol=pickle.HIGHEST_PROTOCOL), stored_at) for key, record in records.items()]
+        try:
+            with self._spill_lock, self._conn:
+                self._conn.executemany("INSERT OR REPLACE INTO results (key, record, stored_at) VALUES (?, ?, ?)", rows)
+                self._conn.execute(
+                    "DELETE FROM results WHERE key IN (SELECT key FROM results ORDER BY stored_at DESC LIMIT -1 OFFSET ?)",
+                    (self.spill_entries,)
+                )
+        except sqlite3.Error as e:
+            logging.warning(f"Could not spill {len(rows)} ILFO results: {e}")
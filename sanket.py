@@ -1,21 +1,27 @@
 import streamlit as st
 import pandas as pd
-import yfinance as yf
 import time
 from datetime import datetime, timedelta
-import pandas_ta as ta
 import numpy as np
 import urllib3
-from nsepython import nse_get_advances_declines
-import requests
-import io
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
 import logging
-import base64
-from io import BytesIO
+import functools
+import math
 import os
-import pickle
+from ilfo import compute_ilfo_signal, compute_ilfo_history, fill_ilfo_details, CRITERIA_SERIES
+from ilfo_pool import ILFOPool, DEFAULT_POOL_WORKERS
+from data_sources import make_data_source
+from exports import EXPORT_FORMATS, export_bytes
+from scan_pipeline import (
+    SCAN_ENGINES, DEFAULT_BUFFER_DAYS, RESULT_CRITERIA_COLUMNS,
+    open_ohlcv_store, open_sector_store, open_result_cache, load_ohlcv, load_sector_map, score_universe, build_results_frame
+)
+from instrumentation import RunProfile, tracked_cache
+from ohlcv_cache import OHLCVCache
+from ohlcv_download import MissingTickers
+from result_cache import model_fingerprint
+from scan_jobs import ScanJobs, ScanFailed
+from ilfo_live import LiveScanner, FileReplayFeed, SocketFeed, LIVE_FEED_PORT
 
 # --- System Configuration ---
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
@@ -35,508 +41,33 @@ st.set_page_config(
 
 # --- Constants ---
 VERSION = "v3.5.0" # UPDATED VERSION: Removed ROC Model, ILFO only
-SECTOR_MAP_FILE = "sector_map.pkl"
 INDEX_LIST = [
     "NIFTY 50", "NIFTY NEXT 50", "NIFTY 100", "NIFTY 200", "NIFTY 500",
     "NIFTY MIDCAP 50", "NIFTY MIDCAP 100", "NIFTY SMLCAP 100", "NIFTY BANK",
     "NIFTY AUTO", "NIFTY FIN SERVICE", "NIFTY FMCG", "NIFTY IT",
     "NIFTY MEDIA", "NIFTY METAL", "NIFTY PHARMA"
 ]
-BASE_URL = "https.www.niftyindices.com/IndexConstituent/"
-INDEX_URL_MAP = {
-    "NIFTY 50": f"{BASE_URL}ind_nifty50list.csv",
-    "NIFTY NEXT 50": f"{BASE_URL}ind_niftynext50list.csv",
-    "NIFTY 100": f"{BASE_URL}ind_nifty100list.csv",
-    "NIFTY 200": f"{BASE_URL}ind_nifty200list.csv",
-    "NIFTY 500": f"{BASE_URL}ind_nifty500list.csv",
-    "NIFTY MIDCAP 50": f"{BASE_URL}ind_niftymidcap50list.csv",
-    "NIFTY MIDCAP 100": f"{BASE_URL}ind_niftymidcap100list.csv",
-    "NIFTY SMLCAP 100": f"{BASE_URL}ind_niftysmallcap100list.csv",
-    "NIFTY BANK": f"{BASE_URL}ind_niftybanklist.csv",
-    "NIFTY AUTO": f"{BASE_URL}ind_niftyautolist.csv",
-    "NIFTY FIN SERVICE": f"{BASE_URL}ind_niftyfinancelist.csv",
-    "NIFTY FMCG": f"{BASE_URL}ind_niftyfmcglist.csv",
-    "NIFTY IT": f"{BASE_URL}ind_niftyitlist.csv",
-    "NIFTY MEDIA": f"{BASE_URL}ind_niftymedialist.csv",
-    "NIFTY METAL": f"{BASE_URL}ind_niftymetallist.csv",
-    "NIFTY PHARMA": f"{BASE_URL}ind_niftypharmalist.csv"
-}
 ANALYSIS_UNIVERSE_OPTIONS = ["F&O Stocks", "Index Constituents"]
-
-# --- Backtested Optimal Ranges (Weights & Importance) ---
-OPTIMAL_RANGES = {
-    "Long": {
-        'ilfo_value': {'min': 0.362, 'max': 2.521, 'weight': 0.13, 'importance': 'critical'},
-        'normalized_liq': {'min': 1.158, 'max': 2.010, 'weight': 0.12, 'importance': 'low'},
-        'vol_surge': {'min': 60.354, 'max': 72.076, 'weight': 0.13, 'importance': 'high'},
-        'momentum_rsi': {'min': 41.230, 'max': 45.518, 'weight': 0.13, 'importance': 'high'},
-        'osc_momentum': {'min': 1.973, 'max': 4.491, 'weight': 0.13, 'importance': 'medium'},
-        'osc_accel': {'min': -0.438, 'max': 1.962, 'weight': 0.12, 'importance': 'medium'},
-        'volume_score': {'min': -0.551, 'max': -0.318, 'weight': 0.12, 'importance': 'low'},
-        'confidence_score': {'min': 7.148, 'max': 57.958, 'weight': 0.0, 'importance': 'low'}, # New
-        'body_conviction': {'min': 88.889, 'max': 100.000, 'weight': 0.12, 'importance': 'low'} # New
-    },
-    "Short": {
-        'ilfo_value': {'min': -2.600, 'max': -0.590, 'weight': 0.13, 'importance': 'critical'},
-        'normalized_liq': {'min': -1.359, 'max': 2.527, 'weight': 0.12, 'importance': 'low'},
-        'vol_surge': {'min': 60.449, 'max': 72.079, 'weight': 0.12, 'importance': 'high'},
-        'momentum_rsi': {'min': 53.625, 'max': 57.618, 'weight': 0.12, 'importance': 'high'},
-        'osc_momentum': {'min': -1.931, 'max': -0.160, 'weight': 0.13, 'importance': 'medium'},
-        'osc_accel': {'min': -4.572, 'max': -1.777, 'weight': 0.12, 'importance': 'medium'},
-        'volume_score': {'min': 0.737, 'max': 1.000, 'weight': 0.13, 'importance': 'low'},
-        'confidence_score': {'min': 8.149, 'max': 45.797, 'weight': 0.0, 'importance': 'low'}, # New
-        'body_conviction': {'min': 66.667, 'max': 88.889, 'weight': 0.13, 'importance': 'low'} # New
-    }
+COMPUTE_ENGINE_OPTIONS = ["Panel (Vectorized)", "Process Pool (Parallel)", "Per-Ticker (Reference)"]
+ANALYSIS_MODE_OPTIONS = ["Single Session", "Signal History", "Intraday Live"]
+LIVE_FEED_OPTIONS = ["Replay File", "Socket Feed"]
+HISTORY_DEFAULT_DAYS = 90
+RESULTS_PAGE_SIZE = 100
+SIGNAL_CLASSES = {
+    "Extreme Long": "signal-extreme-long", "Long": "signal-long", "Divergence Long": "signal-div-long",
+    "Extreme Short": "signal-extreme-short", "Short": "signal-short", "Divergence Short": "signal-div-short"
 }
-
-# --- NEW: Statistical Anchors for Median-Based Scoring ---
-STATISTICAL_ANCHORS = {
-    "Long": {
-        'ilfo_value': {'Success_Mean': 2.206, 'Success_Median': 2.399, 'Fail_Mean': 2.315},
-        'normalized_liq': {'Success_Mean': 1.746, 'Success_Median': 1.999, 'Fail_Mean': 1.798},
-        'vol_surge': {'Success_Mean': 73.493, 'Success_Median': 71.887, 'Fail_Mean': 74.562},
-        'momentum_rsi': {'Success_Mean': 44.888, 'Success_Median': 45.282, 'Fail_Mean': 45.023},
-        'osc_momentum': {'Success_Mean': 2.317, 'Success_Median': 1.983, 'Fail_Mean': 2.384},
-        'osc_accel': {'Success_Mean': 1.928, 'Success_Median': 1.858, 'Fail_Mean': 1.856},
-        'volume_score': {'Success_Mean': -0.449, 'Success_Median': -0.541, 'Fail_Mean': -0.455},
-        'confidence_score': {'Success_Mean': 4.917, 'Success_Median': 0.000, 'Fail_Mean': 4.231},
-        'body_conviction': {'Success_Mean': 64.343, 'Success_Median': 72.222, 'Fail_Mean': 62.500}
-    },
-    "Short": {
-        'ilfo_value': {'Success_Mean': -2.264, 'Success_Median': -2.532, 'Fail_Mean': -2.415},
-        'normalized_liq': {'Success_Mean': -1.842, 'Success_Median': -2.024, 'Fail_Mean': -1.865},
-        'vol_surge': {'Success_Mean': 74.617, 'Success_Median': 72.262, 'Fail_Mean': 73.775},
-        'momentum_rsi': {'Success_Mean': 54.560, 'Success_Median': 53.762, 'Fail_Mean': 54.208},
-        'osc_momentum': {'Success_Mean': -1.999, 'Success_Median': -1.788, 'Fail_Mean': -2.122},
-        'osc_accel': {'Success_Mean': -1.780, 'Success_Median': -1.809, 'Fail_Mean': -1.654},
-        'volume_score': {'Success_Mean': 0.526, 'Success_Median': 0.635, 'Fail_Mean': 0.507},
-        'confidence_score': {'Success_Mean': 5.117, 'Success_Median': 0.558, 'Fail_Mean': 4.855},
-        'body_conviction': {'Success_Mean': 62.891, 'Success_Median': 66.667, 'Fail_Mean': 60.488}
-    }
-}
-
-# --- UPDATED: Advanced Confidence Scoring Function ---
-def calculate_weighted_confidence_score(values_dict, signal_type):
-    """
-    Calculate sophisticated confidence score based on:
-    - Proximity to statistical Success_Median (vs. Fail_Mean)
-    - Weighted contribution of each parameter
-    - Penalties for values outside optimal range
-    - Bonus for multiple strong signals
-    
-    Returns: confidence_score (0-100), detailed_breakdown (dict)
-    """
-    if signal_type not in ["Long", "Short"]:
-        logging.warning(f"Unsupported signal type for confidence scoring: {signal_type}")
-        return 0.0, {}
-    
-    ranges = OPTIMAL_RANGES[signal_type]
-    total_score = 0.0
-    max_possible_score = 0.0
-    breakdown = {}
-    critical_hits = 0
-    high_hits = 0
-    
-    # --- Median-based logic for ILFO model ---
-    for param, config in ranges.items():
-        if param not in values_dict or pd.isna(values_dict[param]):
-            breakdown[param] = {
-                'value': None, 'status': 'missing', 'contribution': 0.0,
-                'max_contribution': config['weight'] * 100
-            }
-            max_possible_score += config['weight'] * 100
-            continue
-        
-        value = values_dict[param]
-        weight = config['weight']
-        importance = config['importance']
-        
-        if param not in STATISTICAL_ANCHORS[signal_type]:
-            # This parameter (from OPTIMAL_RANGES) doesn't have a statistical anchor.
-            # Score it as 0 but count its max possible score.
-            breakdown[param] = {
-                'value': value, 'status': 'no_stats', 'contribution': 0.0,
-                'max_contribution': config['weight'] * 100, 'importance': importance
-            }
-            max_possible_score += config['weight'] * 100
-            continue
-        
-        stats = STATISTICAL_ANCHORS[signal_type][param]
-        target_median = stats['Success_Median']
-        fail_mean = stats['Fail_Mean']
-        
-        # Calculate spread, with fallback for division by zero
-        spread = abs(target_median - fail_mean)
-        if spread < 1e-6:
-            spread = abs(target_median * 0.1) # 10% of median as a fallback
-            if spread < 1e-6: # If median is also zero
-                spread = 0.1 # Absolute fallback
-        
-        distance = abs(value - target_median)
-        
-        # Proximity score: 1.0 at median, 0.0 at/beyond fail_mean
-        proximity_score = max(0.0, 1.0 - (distance / spread))
-        
-        contribution = weight * proximity_score * 100
-        status = 'far_from_median'
-        
-        # Check for "hit" status
-        if proximity_score > 0.0: # Is it better than the fail_mean?
-            status = 'near_median'
-            # Is it more than halfway to the median?
-            if proximity_score > 0.5: 
-                 status = 'optimal_proximity'
-                 if importance == 'critical':
-                     critical_hits += 1
-                 elif importance == 'high':
-                     high_hits += 1
-
-        breakdown[param] = {
-            'value': value,
-            'target_median': target_median,
-            'fail_mean': fail_mean,
-            'status': status,
-            'proximity_score': proximity_score,
-            'contribution': contribution,
-            'max_contribution': weight * 100,
-            'importance': importance
-        }
-        
-        total_score += contribution
-        max_possible_score += weight * 100
-
-    
-    # --- COMMON LOGIC ---
-    # Apply synergy bonus if multiple critical/high criteria are met
-    synergy_bonus = 0
-    if critical_hits >= 2:
-        synergy_bonus = 5  # 5 point bonus for 2+ critical hits
-    if critical_hits >= 1 and high_hits >= 2:
-        synergy_bonus = max(synergy_bonus, 3)  # 3 point bonus for mixed strong signals
-    
-    total_score = min(total_score + synergy_bonus, 100)
-    
-    # Calculate final confidence percentage
-    confidence_score = (total_score / max_possible_score) * 100 if max_possible_score > 0 else 0
-    
-    breakdown['summary'] = {
-        'raw_score': total_score,
-        'max_possible': max_possible_score,
-        'synergy_bonus': synergy_bonus,
-        'critical_hits': critical_hits,
-        'high_hits': high_hits,
-        'confidence_percentage': confidence_score
-    }
-    
-    return confidence_score, breakdown
-
-def get_confidence_grade(score):
-    """Convert confidence score to letter grade"""
-    if score >= 90:
-        return 'A+', 'exceptional'
-    elif score >= 80:
-        return 'A', 'excellent'
-    elif score >= 70:
-        return 'B+', 'good'
-    elif score >= 60:
-        return 'B', 'acceptable'
-    elif score >= 50:
-        return 'C+', 'marginal'
-    elif score >= 40:
-        return 'C', 'weak'
-    else:
-        return 'D', 'poor'
+STYLESHEET_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets", "sanket.css")
+COMPUTE_ENGINE_KEYS = dict(zip(COMPUTE_ENGINE_OPTIONS, SCAN_ENGINES))
 
 # --- Premium Professional CSS ---
-st.markdown("""
-<style>
-    @import url('https://fonts.googleapis.com/css2?family=Inter:wght@300;400;500;600;700;800&display=swap');
-    
-    :root {
-        --primary-color: #FFC300;
-        --primary-rgb: 255, 195, 0;
-        --background-color: #0F0F0F;
-        --secondary-background-color: #1A1A1A;
-        --bg-card: #1A1A1A;
-        --bg-elevated: #2A2A2A;
-        --text-primary: #EAEAEA;
-        --text-secondary: #EAEAEA;
-        --text-muted: #888888;
-        --border-color: #2A2A2A;
-        --border-light: #3A3A3A;
-        
-        --success-green: #10b981;
-        --success-dark: #059669;
-        --danger-red: #ef4444;
-        --danger-dark: #dc2626;
-        --warning-amber: #f59e0b;
-        --info-cyan: #06b6d4;
-        
-        --extreme-long: #10b981;
-        --long: #34d399;
-        --div-long: #6ee7b7;
-        --extreme-short: #ef4444;
-        --short: #f87171;
-        --div-short: #fca5a5;
-        --neutral: #888888;
-        
-        --grade-a-plus: #10b981;
-        --grade-a: #34d399;
-        --grade-b-plus: #6ee7b7;
-        --grade-b: #fbbf24;
-        --grade-c: #f59e0b;
-        --grade-d: #ef4444;
-    }
-    
-    * {
-        font-family: 'Inter', -apple-system, BlinkMacSystemFont, sans-serif;
-    }
-    
-    .main, [data-testid="stSidebar"] {
-        background-color: var(--background-color);
-        color: var(--text-primary);
-    }
-    
-    .stApp > header {
-        background-color: transparent;
-    }
-    
-    .block-container {
-        padding-top: 1rem;
-        max-width: 1400px;
-    }
-    
-    .premium-header {
-        background: var(--secondary-background-color);
-        padding: 1.25rem 2rem;
-        border-radius: 16px;
-        margin-bottom: 1.5rem;
-        box-shadow: 0 0 20px rgba(var(--primary-rgb), 0.1);
-        border: 1px solid var(--border-color);
-        position: relative;
-        overflow: hidden;
-        margin-top: 2.5rem;
-    }
-    
-    .premium-header::before {
-        content: '';
-        position: absolute;
-        top: 0;
-        left: 0;
-        right: 0;
-        bottom: 0;
-        background: radial-gradient(circle at 20% 50%, rgba(var(--primary-rgb),0.08) 0%, transparent 50%);
-        pointer-events: none;
-    }
-    
-    .premium-header h1 {
-        margin: 0;
-        font-size: 2.50rem;
-        font-weight: 700;
-        color: var(--text-primary);
-        letter-spacing: -0.50px;
-        position: relative;
-    }
-    
-    .premium-header .tagline {
-        color: var(--text-muted);
-        font-size: 1rem;
-        margin-top: 0.25rem;
-        font-weight: 400;
-        position: relative;
-    }
-    
-    .metric-card {
-        background-color: var(--bg-card);
-        padding: 1.25rem;
-        border-radius: 12px;
-        border: 1px solid var(--border-color);
-        box-shadow: 0 0 15px rgba(var(--primary-rgb), 0.08);
-        margin-bottom: 0.5rem;
-        transition: all 0.3s cubic-bezier(0.4, 0, 0.2, 1);
-        position: relative;
-        overflow: hidden;
-    }
-    
-    .metric-card:hover {
-        transform: translateY(-2px);
-        box-shadow: 0 8px 30px rgba(0,0,0,0.3);
-        border-color: var(--border-light);
-    }
-    
-    .metric-card h4 {
-        color: var(--text-muted);
-        font-size: 0.8rem;
-        margin-bottom: 0.5rem;
-        font-weight: 600;
-        text-transform: uppercase;
-        letter-spacing: 1px;
-    }
-    
-    .metric-card h2 {
-        color: var(--text-primary);
-        font-size: 2rem;
-        font-weight: 700;
-        margin: 0;
-        line-height: 1;
-    }
-    
-    .metric-card .sub-metric {
-        font-size: 0.8rem;
-        color: var(--text-muted);
-        margin-top: 0.5rem;
-        font-weight: 500;
-    }
-    
-    .metric-card.success h2 { color: var(--success-green); }
-    .metric-card.danger h2 { color: var(--danger-red); }
-    .metric-card.warning h2 { color: var(--warning-amber); }
-    .metric-card.info h2 { color: var(--info-cyan); }
-    .metric-card.neutral h2 { color: var(--neutral); }
-    .metric-card.primary h2 { color: var(--primary-color); } /* New class for 6th color */
-    .metric-card.white h2 { color: var(--text-primary); } /* New class for white text */
-    
-    .status-badge {
-        display: inline-flex;
-        align-items: center;
-        gap: 0.5rem;
-        padding: 0.5rem 1rem;
-        border-radius: 20px;
-        font-size: 0.8rem;
-        font-weight: 600;
-        text-transform: uppercase;
-        letter-spacing: 0.5px;
-    }
-    
-    .info-box {
-        background: var(--secondary-background-color);
-        border: 1px solid var(--border-color);
-        border-left: 4px solid var(--primary-color);
-        padding: 1.25rem;
-        border-radius: 12px;
-        margin: 0.5rem 0;
-        box-shadow: 0 0 15px rgba(var(--primary-rgb), 0.08);
-    }
-    
-    .info-box h4 {
-        color: var(--primary-color);
-        margin: 0 0 0.5rem 0;
-        font-size: 1rem;
-        font-weight: 700;
-    }
-
-    /* --- START: Button CSS from sanket.py --- */
-    /* Buttons */
-    .stButton>button {
-        border: 2px solid var(--primary-color);
-        background: transparent;
-        color: var(--primary-color);
-        font-weight: 700;
-        border-radius: 12px;
-        padding: 0.75rem 2rem;
-        transition: all 0.3s cubic-bezier(0.4, 0, 0.2, 1);
-        text-transform: uppercase;
-        letter-spacing: 0.5px;
-    }
-    
-    .stButton>button:hover {
-        box-shadow: 0 0 25px rgba(var(--primary-rgb), 0.6);
-        background: var(--primary-color);
-        color: #1A1A1A; /* Dark text on hover for contrast */
-        transform: translateY(-2px);
-    }
-    
-    .stButton>button:active {
-        transform: translateY(0);
-    }
+@tracked_cache(st.cache_resource(show_spinner=False))
+def load_stylesheet(path=STYLESHEET_FILE):
+    """The app stylesheet as a <style> block, read once per process"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return f"<style>\n{f.read()}</style>"
 
-    /* Download Links */
-    .download-link {
-        display: inline-flex;
-        align-items: center;
-        gap: 0.5rem;
-        padding: 0.75rem 1.5rem;
-        border: 2px solid var(--primary-color);
-        background: transparent;
-        color: var(--primary-color);
-        text-decoration: none;
-        border-radius: 12px;
-        font-weight: 700;
-        transition: all 0.3s ease;
-        text-transform: uppercase;
-        letter-spacing: 0.5px;
-    }
-    
-    .download-link:hover {
-        box-shadow: 0 0 25px rgba(var(--primary-rgb), 0.6);
-        background: var(--primary-color);
-        color: #1A1A1A; /* Dark text on hover for contrast */
-        transform: translateY(-2px);
-    }
-    /* --- END: Button CSS from sanket.py --- */
-    
-    .stMarkdown table {
-        width: 100%;
-        border-collapse: collapse;
-        background: var(--bg-card);
-        border-radius: 16px;
-        overflow: hidden;
-        border: 1px solid var(--border-color);
-        box-shadow: 0 4px 20px rgba(0,0,0,0.2);
-    }
-    
-    .stMarkdown table th,
-    .stMarkdown table td {
-        text-align: left !important;
-        padding: 12px 10px;
-        border-bottom: 1px solid var(--border-color);
-    }
-    
-    .stMarkdown table th {
-        background-color: var(--bg-elevated);
-        font-size: 0.9rem;
-        letter-spacing: 0.5px;
-    }
-    
-    .stMarkdown table tr:last-child td {
-        border-bottom: none;
-    }
-    
-    .stMarkdown table tr:hover {
-        background-color: var(--bg-elevated);
-    }
-    
-    .signal-extreme-long { color: var(--extreme-long) !important; font-weight: 700; }
-    .signal-long { color: var(--long) !important; font-weight: 600; }
-    .signal-div-long { color: var(--div-long) !important; font-weight: 600; }
-    .signal-extreme-short { color: var(--extreme-short) !important; font-weight: 700; }
-    .signal-short { color: var(--short) !important; font-weight: 600; }
-    .signal-div-short { color: var(--div-short) !important; font-weight: 600; }
-    .signal-neutral { color: var(--neutral) !important; }
-    .signal-error { color: var(--warning-amber) !important; }
-    
-    .pct-positive { color: var(--success-green) !important; font-weight: 600; }
-    .pct-negative { color: var(--danger-red) !important; font-weight: 600; }
-    .pct-neutral { color: var(--neutral) !important; }
-    
-    .grade-a-plus { color: var(--grade-a-plus) !important; font-weight: 700; }
-    .grade-a { color: var(--grade-a) !important; font-weight: 700; }
-    .grade-b-plus { color: var(--grade-b-plus) !important; font-weight: 600; }
-    .grade-b { color: var(--grade-b) !important; font-weight: 600; }
-    .grade-c { color: var(--grade-c) !important; font-weight: 600; }
-    .grade-d { color: var(--grade-d) !important; font-weight: 600; }
-    
-    .confidence-high { background: linear-gradient(135deg, var(--success-green), var(--success-dark)); color: white; padding: 0.25rem 0.75rem; border-radius: 12px; font-weight: 700; }
-    .confidence-medium { background: var(--warning-amber); color: var(--background-color); padding: 0.25rem 0.75rem; border-radius: 12px; font-weight: 700; }
-    .confidence-low { background: var(--danger-red); color: white; padding: 0.25rem 0.75rem; border-radius: 12px; font-weight: 700; }
-    
-    .section-divider {
-        height: 1px;
-        background: linear-gradient(90deg, transparent 0%, var(--border-color) 50%, transparent 100%);
-        margin: 1rem 0;
-    }
-</style>
-""", unsafe_allow_html=True)
+st.markdown(load_stylesheet(), unsafe_allow_html=True)
 
 st.markdown(f"""
 <div class="premium-header">
@@ -545,588 +76,161 @@ st.markdown(f"""
 """, unsafe_allow_html=True)
 
 # --- Stock List Functions (Keep existing) ---
-@st.cache_data(ttl=3600)
+@tracked_cache(st.cache_resource(show_spinner=False))
+def get_data_source():
+    """Market data backend chosen by $SANKET_DATA_SOURCE (live, record[:dir] or replay[:dir])"""
+    source = make_data_source()
+    logging.info(f"📡 Market data source: {source.describe()}")
+    return source
+
+@tracked_cache(st.cache_data(ttl=3600))
 def get_fno_stock_list():
-    try:
-        stock_data = nse_get_advances_declines()
-        if not isinstance(stock_data, pd.DataFrame):
-            return None, f"API returned unexpected type: {type(stock_data)}"
-        
-        symbols = None
-        if 'SYMBOL' in stock_data.columns:
-            symbols = stock_data['SYMBOL'].tolist()
-        elif 'symbol' in stock_data.columns:
-            symbols = stock_data['symbol'].tolist()
-        elif stock_data.index.name in ['SYMBOL', 'symbol']:
-            symbols = stock_data.index.tolist()
-        else:
-            if isinstance(stock_data.index, pd.RangeIndex):
-                return None, f"Could not find SYMBOL column"
-            elif len(stock_data.index) > 0:
-                symbols = stock_data.index.tolist()
-
-        if symbols is None:
-             return None, f"Could not extract symbols"
-            
-        symbols_ns = [str(s) + ".NS" for s in symbols if s and str(s).strip()]
-        
-        if not symbols_ns:
-            return None, "Symbol list empty after cleaning"
+    return get_data_source().fno_universe()
 
-        return symbols_ns, f"✓ Fetched {len(symbols_ns)} F&O securities"
-            
-    except Exception as e:
-        return None, f"Error: {e}"
-
-@st.cache_data(ttl=3600)
+@tracked_cache(st.cache_data(ttl=3600))
 def get_index_stock_list(index):
-    url = INDEX_URL_MAP.get(index)
-    if not url:
-        return None, f"No URL for {index}"
-        
-    try:
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        }
-        response = requests.get(url, headers=headers, verify=False, timeout=10)
-        response.raise_for_status()
-        
-        csv_file = io.StringIO(response.text)
-        stock_df = pd.read_csv(csv_file)
-        
-        if 'Symbol' in stock_df.columns:
-            symbols = stock_df['Symbol'].tolist()
-            symbols_ns = [str(s) + ".NS" for s in symbols if s and str(s).strip()]
-            return symbols_ns, f"✓ Fetched {len(symbols_ns)} constituents"
-        else:
-            return None, f"No Symbol column found"
-            
-    except Exception as e:
-        return None, f"Error: {e}"
-
-@st.cache_data(ttl=300, show_spinner=False)
-def fetch_all_data(stock_list, end_date):
-    buffer_days = 250 
-    start_date = end_date - timedelta(days=buffer_days)
-    download_end_date = end_date + timedelta(days=1)
-    
-    try:
-        all_data = yf.download(
-            stock_list,
-            start=start_date,
-            end=download_end_date,
-            progress=False,
-            auto_adjust=True,
-            group_by='ticker'
-        )
-        
-        if all_data.empty:
-            return None, "No data returned"
-            
-        if isinstance(all_data, pd.DataFrame) and isinstance(all_data.columns, pd.MultiIndex):
-            data_dict = {}
-            for ticker in stock_list:
-                try:
-                    ticker_df = all_data.xs(ticker, level=0, axis=1)
-                    if not ticker_df.empty and not ticker_df['Close'].isnull().all():
-                        data_dict[ticker] = ticker_df
-                except KeyError:
-                    logging.warning(f"No data for {ticker}")
-            return data_dict, f"✓ Downloaded {len(data_dict)} tickers"
-
-        elif isinstance(all_data, dict):
-            valid_data = {t:df for t,df in all_data.items() if not df.empty and not df['Close'].isnull().all()}
-            return valid_data, f"✓ Downloaded {len(valid_data)} tickers"
-
-        else:
-             return None, "Unexpected data structure"
-
-    except Exception as e:
-        return None, f"Download error: {e}"
-
-@st.cache_resource(show_spinner=False)
-def load_sector_map():
-    if os.path.exists(SECTOR_MAP_FILE):
-        logging.info(f"Loading cached sector map from {SECTOR_MAP_FILE}")
-        with open(SECTOR_MAP_FILE, 'rb') as f:
-            return pickle.load(f)
-    logging.info("No cached sector map found, starting with an empty map.")
-    return {}
-
-def save_sector_map(sector_map):
-    logging.info(f"Saving updated sector map ({len(sector_map)} entries) to {SECTOR_MAP_FILE}")
-    with open(SECTOR_MAP_FILE, 'wb') as f:
-        pickle.dump(sector_map, f)
-
-def fetch_sectors_for_list(stock_list):
-    logging.info(f"Fetching sector info for {len(stock_list)} new tickers...")
-    new_sectors = {}
-    
-    if not stock_list:
-        return new_sectors
-        
-    tickers = yf.Tickers(stock_list)
-    
-    for i, ticker_symbol in enumerate(stock_list):
-        try:
-            info = tickers.tickers[ticker_symbol].info
-            sector = info.get('sector')
-            new_sectors[ticker_symbol] = sector if sector else "Other"
-            
-            if (i + 1) % 25 == 0:
-                logging.info(f"Fetched {i+1}/{len(stock_list)} new tickers")
-                
-        except Exception as e:
-            logging.warning(f"Could not fetch .info for {ticker_symbol}: {e}")
-            new_sectors[ticker_symbol] = "Other"
-            
-    logging.info("Finished fetching new sectors.")
-    return new_sectors
-
-# --- ILFO Signal Calculation (Keep existing, add confidence scoring) ---
-def compute_ilfo_signal(ticker, df, end_date):
-    """ILFO signal with enhanced confidence scoring"""
-    
-    adaptiveLength = 21
-    microLength = 9
-    impactWindow = 5
-    devMultiplier = 2.0
-    signalSmooth = 5
-    divLookback = 10
-    volThreshold = 1.2
-    
-    EPSILON = 1e-10
-
-    def get_error_dict(signal, details, e=""):
-        logging.error(f"Error for {ticker}: {details} - {e}")
-        return {
-            "ticker": ticker, "signal": signal, "details": details, "pct_change": np.nan,
-            "confidence_score": 0.0, "confidence_grade": "D", "confidence_class": "poor",
-            "ilfo_value": np.nan, "vol_surge": np.nan, "momentum_rsi": np.nan,
-            "osc_momentum": np.nan, "osc_accel": np.nan, "volume_score": np.nan,
-            "normalized_liq": np.nan
-        }
-    
-    try:
-        if df.empty or len(df) < adaptiveLength * 2:
-            return get_error_dict("Insufficient Data", "N/A")
-        
-        df = df.copy()
-        df = df.ffill().bfill()
-        
-        if df['Close'].isnull().all() or df['Volume'].isnull().all():
-            return get_error_dict("Insufficient Data", "Missing main series")
-        
-        df['Volume'] = df['Volume'].fillna(0).replace(0, 1).clip(lower=1)
-        
-        if (df['Close'] <= 0).any():
-            return get_error_dict("Invalid Data", "Non-positive prices detected")
-        
-        # [Keep all existing ILFO calculation logic - lines 29-209 from original]
-        # Market Microstructure
-        bodySize = (df['Close'] - df['Open']).abs()
-        spreadProxy = (df['High'] + df['Low']) / 2 - df['Open']
-        
-        volMa = ta.sma(df['Volume'], adaptiveLength)
-        volMa = volMa.fillna(df['Volume'].mean()).replace(0, EPSILON).clip(lower=EPSILON)
-        
-        vwapSpread = ta.sma(spreadProxy * df['Volume'] / volMa, adaptiveLength)
-        vwapSpread = vwapSpread.fillna(0)
-        
-        priceImpact = ta.sma((df['Close'] - df['Close'].shift(impactWindow)) * df['Volume'] / volMa, adaptiveLength)
-        priceImpact = priceImpact.fillna(0)
-        
-        liquidityScore = vwapSpread - priceImpact
-        liquidityScore = liquidityScore.replace([np.inf, -np.inf], 0).fillna(0)
-        
-        liqMean = ta.sma(liquidityScore, adaptiveLength).fillna(0)
-        liqStdev = ta.stdev(liquidityScore, adaptiveLength)
-        liqStdev = liqStdev.fillna(1).replace(0, 1).clip(lower=EPSILON)
-        
-        normalizedLiq = (liquidityScore - liqMean) / liqStdev
-        normalizedLiq = normalizedLiq.replace([np.inf, -np.inf], 0).fillna(0).clip(-10, 10)
-
-        # Volume Flow Analysis
-        volStdev = ta.stdev(df['Volume'], microLength)
-        volStdev = volStdev.fillna(df['Volume'].std()).replace(0, EPSILON).clip(lower=EPSILON)
-        
-        volZscore = (df['Volume'] - volMa) / volStdev
-        volZscore = volZscore.replace([np.inf, -np.inf], 0).fillna(0).clip(-5, 5)
-        
-        volSurge = (50 + (volZscore * 20)).clip(0, 100).fillna(50)
-        
-        volDirection = np.where(df['Close'] > df['Open'], volSurge, -volSurge)
-        
-        typicalPrice = (df['High'] + df['Low'] + df['Close']) / 3
-        moneyFlow = typicalPrice * df['Volume']
-        moneyFlow = moneyFlow.replace([np.inf, -np.inf], 0).fillna(0)
-        
-        posFlow = ta.sma(moneyFlow * (df['Close'] > df['Close'].shift(1)), microLength)
-        negFlow = ta.sma(moneyFlow * (df['Close'] < df['Close'].shift(1)), microLength)
-        posFlow = posFlow.fillna(0)
-        negFlow = negFlow.fillna(0)
-        
-        accumFlow = (posFlow - negFlow) / (posFlow + negFlow + EPSILON)
-        accumFlow = accumFlow.replace([np.inf, -np.inf], 0).fillna(0).clip(-1, 1)
-        
-        volumeScore = (volDirection / 100) * 0.5 + accumFlow * 0.5
-        volumeScore = volumeScore.replace([np.inf, -np.inf], 0).fillna(0)
-
-        # Momentum & Conviction
-        def safe_body_conviction(x):
-            try:
-                if len(x) < 2 or pd.isna(x.iloc[-1]):
-                    return 0.0
-                return float((x.iloc[-1] > x.iloc[:-1]).mean() * 100)
-            except:
-                return 0.0
-        
-        bodyConviction = bodySize.rolling(window=microLength + 1, min_periods=2).apply(
-            safe_body_conviction, raw=False
-        ).fillna(0)
-        
-        directionConviction = np.where(df['Close'] > df['Open'], bodyConviction, -bodyConviction)
-        
-        price_change = df['Close'].diff()
-        price_base = df['Close'].shift(1).replace(0, EPSILON).clip(lower=EPSILON)
-        
-        priceVelocity = (price_change / price_base) * 10000
-        priceVelocity = priceVelocity.replace([np.inf, -np.inf], 0).fillna(0).clip(-1000, 1000)
-        
-        momentumRsi = ta.rsi(priceVelocity, microLength)
-        momentumRsi = momentumRsi.fillna(50).clip(0, 100)
-
-        # Statistical Bounds
-        priceMean = ta.sma(df['Close'], adaptiveLength).fillna(df['Close'])
-        priceStdev = ta.stdev(df['Close'], adaptiveLength)
-        priceStdev = priceStdev.fillna(df['Close'].std()).replace(0, EPSILON).clip(lower=EPSILON)
-        
-        upperBound = priceMean + devMultiplier * priceStdev
-        lowerBound = priceMean - devMultiplier * priceStdev
-
-        inOverbought = df['Close'] > upperBound
-        inOversold = df['Close'] < lowerBound
-
-        # Composite Oscillator
-        rawScore = (normalizedLiq * 0.30) + \
-                   (volumeScore * 0.25) + \
-                   (directionConviction / 100 * 0.25) + \
-                   ((momentumRsi - 50) / 50 * 0.20)
-        
-        rawScore = rawScore.replace([np.inf, -np.inf], 0).fillna(0).clip(-5, 5)
-        
-        oscillator = (rawScore * 8)
-        oscillator = oscillator.replace([np.inf, -np.inf], 0).fillna(0).clip(-10, 10)
-        
-        signal = ta.sma(oscillator, signalSmooth)
-        signal = signal.fillna(0).clip(-10, 10)
-        
-        oscMomentum = oscillator.diff(2).fillna(0).clip(-15, 15)
-        oscAccel = oscMomentum.diff().fillna(0).clip(-15, 15)
-
-        # Divergence Detection
-        def safe_is_pivot_low(x):
-            try:
-                if len(x) < divLookback * 2 + 1:
-                    return 0
-                mid = divLookback
-                return 1 if x.iloc[mid] == x.min() else 0
-            except:
-                return 0
-        
-        def safe_is_pivot_high(x):
-            try:
-                if len(x) < divLookback * 2 + 1:
-                    return 0
-                mid = divLookback
-                return 1 if x.iloc[mid] == x.max() else 0
-            except:
-                return 0
-        
-        price_lows = df['Low'].rolling(window=divLookback*2+1, center=True, min_periods=divLookback+1).apply(
-            safe_is_pivot_low, raw=False
-        ).fillna(0)
-        
-        price_highs = df['High'].rolling(window=divLookback*2+1, center=True, min_periods=divLookback+1).apply(
-            safe_is_pivot_high, raw=False
-        ).fillna(0)
-        
-        pivot_lows_idx = df.index[price_lows > 0]
-        pivot_highs_idx = df.index[price_highs > 0]
-        
-        df['last_pivot_low_price'] = df.loc[pivot_lows_idx, 'Low'].reindex(df.index).ffill().fillna(df['Low'])
-        df['last_pivot_low_osc'] = oscillator.loc[pivot_lows_idx].reindex(df.index).ffill().fillna(oscillator)
-        
-        df['last_pivot_high_price'] = df.loc[pivot_highs_idx, 'High'].reindex(df.index).ffill().fillna(df['High'])
-        df['last_pivot_high_osc'] = oscillator.loc[pivot_highs_idx].reindex(df.index).ffill().fillna(oscillator)
-
-        volConfirm = df['Volume'] > volMa * 0.8
-        
-        priceLL = df['Low'] < (df['last_pivot_low_price'] * 0.998)
-        oscHL = oscillator > (df['last_pivot_low_osc'] * 1.05)
-        bullishDiv = priceLL & oscHL & inOversold & volConfirm
-        
-        priceHH = df['High'] > (df['last_pivot_high_price'] * 1.002)
-        oscLH = oscillator < (df['last_pivot_high_osc'] * 0.95)
-        bearishDiv = priceHH & oscLH & inOverbought & volConfirm
-
-        # Signal Generation
-        extremeLong = inOversold & (oscMomentum > 0) & (oscAccel > 0) & (volSurge > volThreshold * 50)
-        extremeShort = inOverbought & (oscMomentum < 0) & (oscAccel < 0) & (volSurge > volThreshold * 50)
-
-        # Extract values at target date
-        analysis_datetime = datetime.combine(end_date, datetime.max.time())
-        df.index = pd.to_datetime(df.index)
-        target_date = df.index.asof(analysis_datetime)
-        
-        if pd.isna(target_date):
-            return get_error_dict("No Data", f"No data at {end_date.date()}")
-        
-        try:
-            test_values = [
-                oscillator.loc[target_date],
-                volSurge.loc[target_date],
-                normalizedLiq.loc[target_date],
-                momentumRsi.loc[target_date],
-                oscMomentum.loc[target_date],
-                oscAccel.loc[target_date],
-                volumeScore.loc[target_date]
-            ]
-            
-            for val in test_values:
-                if pd.isna(val) or np.isinf(val):
-                    return get_error_dict("No Data", "Invalid calculation result")
-                    
-        except (KeyError, IndexError):
-            return get_error_dict("No Data", "Target date not in index")
-
-        isExtremeLong = bool(extremeLong.loc[target_date])
-        isBullishDiv = bool(bullishDiv.loc[target_date])
-        isExtremeShort = bool(extremeShort.loc[target_date])
-        isBearishDiv = bool(bearishDiv.loc[target_date])
-
-        signal_text = "Neutral"
-        if isExtremeLong and isBullishDiv:
-            signal_text = "Extreme Long"
-        elif isExtremeShort and isBearishDiv:
-            signal_text = "Extreme Short"
-        elif isExtremeLong:
-            signal_text = "Long"
-        elif isBullishDiv:
-            signal_text = "Divergence Long"
-        elif isExtremeShort:
-            signal_text = "Short"
-        elif isBearishDiv:
-            signal_text = "Divergence Short"
-
-        nl_value = float(normalizedLiq.loc[target_date])
-        ilfo_value = float(oscillator.loc[target_date])
-        vol_value = float(volSurge.loc[target_date])
-        mom_rsi_val = float(momentumRsi.loc[target_date])
-        osc_mom_val = float(oscMomentum.loc[target_date])
-        osc_accel_val = float(oscAccel.loc[target_date])
-        vol_score_val = float(volumeScore.loc[target_date])
-
-        # --- NEW: Calculate Confidence Score ---
-        # --- MODIFIED: Added 'normalized_liq' to the dictionary ---
-        values_for_scoring = {
-            'ilfo_value': ilfo_value,
-            'normalized_liq': nl_value,
-            'vol_surge': vol_value,
-            'momentum_rsi': mom_rsi_val,
-            'osc_momentum': osc_mom_val,
-            'osc_accel': osc_accel_val,
-            'volume_score': vol_score_val
-        }
-        
-        # Only calculate confidence for actionable signals
-        if "Long" in signal_text or "Short" in signal_text:
-            signal_type_for_scoring = signal_text.split()[-1] # Gets "Long" or "Short"
-            if signal_type_for_scoring not in ["Long", "Short"]:
-                signal_type_for_scoring = "Long" if "Long" in signal_text else "Short"
-                
-            confidence_score, breakdown = calculate_weighted_confidence_score(
-                values_for_scoring, 
-                signal_type_for_scoring
-            )
-            grade, grade_class = get_confidence_grade(confidence_score)
-        else:
-            confidence_score = 0.0
-            grade = "N/A"
-            grade_class = "neutral"
-        # --- END NEW ---
-
-        # Build details string with formatted values
-        ilfo_string = f'<span class="signal-neutral">{ilfo_value:.2f}</span>'
-        vol_string = f'<span class="signal-neutral">{vol_value:.1f}</span>'
-        mom_rsi_string = f'<span class="signal-neutral">{mom_rsi_val:.2f}</span>'
-        osc_mom_string = f'<span class="signal-neutral">{osc_mom_val:.2f}</span>'
-        osc_accel_string = f'<span class="signal-neutral">{osc_accel_val:.2f}</span>'
-        vol_score_string = f'<span class="signal-neutral">{vol_score_val:.2f}</span>'
-        
-        # --- FIX: Removed "NL" prefix from variable, it's already in the f-string ---
-        # Default to neutral
-        nl_string = f'<span class="signal-neutral">{nl_value:.2f}</span>'
+    return get_data_source().index_universe(index)
+
+@tracked_cache(st.cache_resource(show_spinner=False))
+def get_ohlcv_store():
+    return open_ohlcv_store(get_data_source())
+
+@tracked_cache(st.cache_resource(show_spinner=False))
+def get_ohlcv_cache():
+    """Process-wide per-ticker OHLCV bars every session and universe reads through zero-copy views"""
+    return OHLCVCache()
+
+@tracked_cache(st.cache_resource(show_spinner=False))
+def get_missing_tickers():
+    """Process-wide record of tickers the data source returned no bars for"""
+    return MissingTickers()
+
+def fetch_all_data(stock_list, end_date, buffer_days=DEFAULT_BUFFER_DAYS):
+    return get_ohlcv_cache().get_or_load(
+        stock_list, (end_date, buffer_days),
+        lambda missing: load_ohlcv(get_data_source(), get_ohlcv_store(), missing, end_date, buffer_days, get_missing_tickers())
+    )
 
+@tracked_cache(st.cache_resource(show_spinner=False))
+def get_sector_store():
+    """Process-wide sector metadata store and its background refresher"""
+    return open_sector_store(get_data_source())
 
-        # Highlight based on optimal ranges (This is now just for visual display)
-        # The actual scoring is handled by the new median-based function
-        if "Long" in signal_text:
-            ranges = OPTIMAL_RANGES["Long"]
-            if ranges['ilfo_value']['min'] <= ilfo_value <= ranges['ilfo_value']['max']:
-                ilfo_string = f'<span class="pct-positive">{ilfo_value:.2f}</span>'
-            if ranges['normalized_liq']['min'] <= nl_value <= ranges['normalized_liq']['max']:
-                 nl_string = f'<span class="pct-positive">{nl_value:.2f}</span>' # FIX
-            if ranges['vol_surge']['min'] <= vol_value <= ranges['vol_surge']['max']:
-                vol_string = f'<span class="pct-positive">{vol_value:.1f}</span>'
-            if ranges['momentum_rsi']['min'] <= mom_rsi_val <= ranges['momentum_rsi']['max']:
-                mom_rsi_string = f'<span class="pct-positive">{mom_rsi_val:.2f}</span>'
-            if ranges['osc_momentum']['min'] <= osc_mom_val <= ranges['osc_momentum']['max']:
-                osc_mom_string = f'<span class="pct-positive">{osc_mom_val:.2f}</span>'
-            if ranges['osc_accel']['min'] <= osc_accel_val <= ranges['osc_accel']['max']:
-                osc_accel_string = f'<span class="pct-positive">{osc_accel_val:.2f}</span>'
-            if ranges['volume_score']['min'] <= vol_score_val <= ranges['volume_score']['max']:
-                vol_score_string = f'<span class="pct-positive">{vol_score_val:.2f}</span>'
-                
-        elif "Short" in signal_text:
-            ranges = OPTIMAL_RANGES["Short"]
-            if ranges['ilfo_value']['min'] <= ilfo_value <= ranges['ilfo_value']['max']:
-                ilfo_string = f'<span class="pct-negative">{ilfo_value:.2f}</span>'
-            if ranges['normalized_liq']['min'] <= nl_value <= ranges['normalized_liq']['max']:
-                 nl_string = f'<span class="pct-negative">{nl_value:.2f}</span>' # FIX
-            if ranges['vol_surge']['min'] <= vol_value <= ranges['vol_surge']['max']:
-                vol_string = f'<span class="pct-negative">{vol_value:.1f}</span>'
-            if ranges['momentum_rsi']['min'] <= mom_rsi_val <= ranges['momentum_rsi']['max']:
-                mom_rsi_string = f'<span class="pct-negative">{mom_rsi_val:.2f}</span>'
-            if ranges['osc_momentum']['min'] <= osc_mom_val <= ranges['osc_momentum']['max']:
-                osc_mom_string = f'<span class="pct-negative">{osc_mom_val:.2f}</span>'
-            if ranges['osc_accel']['min'] <= osc_accel_val <= ranges['osc_accel']['max']:
-                osc_accel_string = f'<span class="pct-negative">{osc_accel_val:.2f}</span>'
-            if ranges['volume_score']['min'] <= vol_score_val <= ranges['volume_score']['max']:
-                vol_score_string = f'<span class="pct-negative">{vol_score_val:.2f}</span>'
+@tracked_cache(st.cache_resource(show_spinner=False))
+def get_result_cache():
+    """Per-ticker ILFO results shared by every universe, date and session"""
+    return open_result_cache(get_data_source())
 
-        details_text = (
-            f"ILFO: {ilfo_string} | NL: {nl_string} | VolSurge: {vol_string} | MomRSI: {mom_rsi_string}<br>"
-            f"OscMom: {osc_mom_string} | OscAcc: {osc_accel_string} | VolScore: {vol_score_string}"
-        )
-        
-        try:
-            prev_close = df['Close'].shift(1).loc[target_date]
-            curr_close = df['Close'].loc[target_date]
-            if pd.notna(prev_close) and prev_close > 0:
-                pct_change_val = ((curr_close / prev_close) - 1) * 100
-            else:
-                pct_change_val = np.nan
-        except:
-            pct_change_val = np.nan
-            
-        return {
-            "ticker": ticker,
-            "signal": signal_text,
-            "details": details_text,
-            "pct_change": pct_change_val,
-            "confidence_score": confidence_score,
-            "confidence_grade": grade,
-            "confidence_class": grade_class,
-            "ilfo_value": ilfo_value,
-            "vol_surge": vol_value,
-            "momentum_rsi": mom_rsi_val,
-            "osc_momentum": osc_mom_val,
-            "osc_accel": osc_accel_val,
-            "volume_score": vol_score_val,
-            "normalized_liq": nl_value
-        }
+@tracked_cache(st.cache_resource(show_spinner=False))
+def get_scan_jobs():
+    """Scans in flight or recently finished, shared so identical requests from several sessions run once"""
+    return ScanJobs()
 
-    except Exception as e:
-        return get_error_dict("Error (Calc)", str(e), e)
+@tracked_cache(st.cache_resource(show_spinner=False))
+def get_ilfo_pool(workers):
+    """Warm process pool shared by every session and rerun"""
+    return ILFOPool(workers)
 
 # --- UI Functions ---
+def format_numbers(values, fmt):
+    """printf-style text for a float array, as an object array ready for string concatenation"""
+    return np.array([fmt % value for value in values.tolist()], dtype=object)
+
+def signal_css_class(signal):
+    if signal in SIGNAL_CLASSES:
+        return SIGNAL_CLASSES[signal]
+    # --- REMOVED "Buy"/"Sell" ---
+    if "Error" in signal or "Data" in signal:
+        return "signal-error"
+    return "signal-neutral"
+
 def format_dataframe_for_display(df):
-    """Format dataframe with proper HTML for colored display"""
+    """Format dataframe with proper HTML for colored display, one vectorized pass per column"""
     if df.empty:
         return df
     
     display_df = df.copy()
     
+    # Details HTML is only built for the rows being shown, from their criteria columns
+    if 'Details' in display_df.columns and 'Signal' in display_df.columns:
+        display_df['Details'] = fill_ilfo_details(display_df, 'Signal', 'Details')
+    
+    # Signal and grade take a handful of distinct values: format each once and map
     if 'Signal' in display_df.columns:
-        def format_signal(val):
-            if pd.isna(val):
-                return '<span class="signal-neutral">N/A</span>'
-            val_str = str(val)
-            
-            if val_str == "Extreme Long":
-                return f'<span class="signal-extreme-long">{val_str}</span>'
-            elif val_str == "Long":
-                return f'<span class="signal-long">{val_str}</span>'
-            elif val_str == "Divergence Long":
-                return f'<span class="signal-div-long">{val_str}</span>'
-            # --- REMOVED "Buy" ---
-            elif val_str == "Extreme Short":
-                return f'<span class="signal-extreme-short">{val_str}</span>'
-            elif val_str == "Short":
-                return f'<span class="signal-short">{val_str}</span>'
-            elif val_str == "Divergence Short":
-                return f'<span class="signal-div-short">{val_str}</span>'
-            # --- REMOVED "Sell" ---
-            elif "Error" in val_str or "Data" in val_str:
-                return f'<span class="signal-error">{val_str}</span>'
-            return f'<span class="signal-neutral">{val_str}</span>'
-        
-        display_df['Signal'] = display_df['Signal'].apply(format_signal)
+        signal = display_df['Signal']
+        signal_html = {val: f'<span class="{signal_css_class(str(val))}">{val}</span>' for val in signal.dropna().unique()}
+        display_df['Signal'] = signal.map(signal_html).fillna('<span class="signal-neutral">N/A</span>')
     
     if '% Change' in display_df.columns:
-        def format_pct(val):
-            if pd.isna(val):
-                return '<span class="pct-neutral">N/A</span>'
-            if val > 0:
-                return f'<span class="pct-positive">+{val:.2f}%</span>'
-            elif val < 0:
-                return f'<span class="pct-negative">{val:.2f}%</span>'
-            else:
-                return f'<span class="pct-neutral">{val:.2f}%</span>'
-        
-        display_df['% Change'] = display_df['% Change'].apply(format_pct)
+        pct = pd.to_numeric(display_df['% Change'], errors='coerce').to_numpy(dtype=float)
+        pct_text = format_numbers(pct, '%.2f%%')
+        pct_text = np.where(pct > 0, '+' + pct_text, pct_text)
+        pct_class = np.select([pct > 0, pct < 0], ['pct-positive', 'pct-negative'], 'pct-neutral')
+        pct_html = '<span class="' + pct_class.astype(object) + '">' + pct_text + '</span>'
+        display_df['% Change'] = np.where(np.isnan(pct), '<span class="pct-neutral">N/A</span>', pct_html)
     
     # --- NEW: Format Confidence Score ---
     if 'Confidence' in display_df.columns:
-        def format_confidence(val):
-            if pd.isna(val) or val == 0:
-                return '<span class="pct-neutral">N/A</span>'
-            if val >= 80:
-                return f'<span class="confidence-high">{val:.1f}%</span>'
-            elif val >= 60:
-                return f'<span class="confidence-medium">{val:.1f}%</span>'
-            else:
-                return f'<span class="confidence-low">{val:.1f}%</span>'
-        
-        display_df['Confidence'] = display_df['Confidence'].apply(format_confidence)
+        confidence = pd.to_numeric(display_df['Confidence'], errors='coerce').to_numpy(dtype=float)
+        confidence_class = np.select([confidence >= 80, confidence >= 60], ['confidence-high', 'confidence-medium'], 'confidence-low')
+        confidence_html = '<span class="' + confidence_class.astype(object) + '">' + format_numbers(confidence, '%.1f%%') + '</span>'
+        missing = np.isnan(confidence) | (confidence == 0)
+        display_df['Confidence'] = np.where(missing, '<span class="pct-neutral">N/A</span>', confidence_html)
     
     # --- NEW: Format Grade ---
     if 'Grade' in display_df.columns:
-        def format_grade(val):
-            if pd.isna(val) or val == "N/A":
-                return '<span class="signal-neutral">N/A</span>'
-            val_str = str(val).replace('+', '-plus')
-            class_name = f"grade-{val_str.lower()}"
-            return f'<span class="{class_name}">{val}</span>'
-        
-        display_df['Grade'] = display_df['Grade'].apply(format_grade)
+        grade = display_df['Grade']
+        grade_html = {
+            val: f'<span class="grade-{str(val).replace("+", "-plus").lower()}">{val}</span>'
+            for val in grade.dropna().unique() if val != "N/A"
+        }
+        display_df['Grade'] = grade.map(grade_html).fillna('<span class="signal-neutral">N/A</span>')
     # --- END NEW ---
     
     display_df = display_df.reset_index()
     return display_df
 
-def create_export_link(df, filename):
-    """Create downloadable CSV link"""
-    csv = df.to_csv(index=True)
-    b64 = base64.b64encode(csv.encode()).decode()
-    href = f'<a href="data:file/csv;base64,{b64}" download="{filename}" class="download-link">📥 Download CSV Report</a>'
-    return href
+def render_styled_html(df, hidden=RESULT_CRITERIA_COLUMNS):
+    """Applies formatting and renders the table HTML, built column-wise rather than cell by cell"""
+    formatted_df = format_dataframe_for_display(df)
+    columns = [col for col in formatted_df.columns if col not in hidden]
+    
+    header = "".join(f"<th>{col}</th>" for col in columns)
+    if formatted_df.empty:
+        return f'<table class="stMarkdown table"><thead><tr>{header}</tr></thead><tbody></tbody></table>'
+    
+    rows = "<tr><td>" + formatted_df[columns[0]].astype(str)
+    for col in columns[1:]:
+        rows = rows + "</td><td>" + formatted_df[col].astype(str)
+    rows = rows + "</td></tr>"
+    return f'<table class="stMarkdown table"><thead><tr>{header}</tr></thead><tbody>{"".join(rows)}</tbody></table>'
+
+def render_results_grid(df, key, hidden=RESULT_CRITERIA_COLUMNS, page_size=RESULTS_PAGE_SIZE):
+    """One page of the results table; only the rows on that page are formatted and sent to the browser"""
+    pages = max(1, math.ceil(len(df) / page_size))
+    page = 1
+    if pages > 1:
+        page = st.number_input(f"Page (of {pages})", min_value=1, max_value=pages, value=1, step=1, key=f"{key}_page")
+    start = (page - 1) * page_size
+    page_df = df.iloc[start:start + page_size]
+    
+    st.markdown(render_styled_html(page_df, hidden), unsafe_allow_html=True)
+    if pages > 1:
+        st.caption(f"Rows {start + 1:,}–{start + len(page_df):,} of {len(df):,}")
+
+def render_export_buttons(df, file_stem, key):
+    """One download button per export format; a file is only built, and streamed, when its button is clicked"""
+    for column, (export_format, (extension, mime)) in zip(st.columns(len(EXPORT_FORMATS)), EXPORT_FORMATS.items()):
+        with column:
+            st.download_button(
+                f"📥 Download {export_format}", functools.partial(export_bytes, df, export_format),
+                file_name=f"{file_stem}{extension}", mime=mime, key=f"{key}_{export_format}",
+                on_click="ignore", width="stretch"
+            )
 
 # --- Main Analysis Function ---
-def run_analysis(analysis_universe, selected_index, analysis_date): # --- REMOVED selected_model
-    """Main analysis orchestrator with confidence scoring"""
-    
+def fetch_stock_list(analysis_universe, selected_index):
+    """(analysis title, constituent tickers, fetch message) for the selected universe"""
     if analysis_universe == "F&O Stocks":
         analysis_title = "F&O Stocks"
         logging.info(f"🔍 Analyzing {analysis_title}...")
@@ -1135,12 +239,35 @@ def run_analysis(analysis_universe, selected_index, analysis_date): # --- REMOVE
         analysis_title = selected_index
         logging.info(f"🔍 Analyzing {analysis_title}...")
         stock_list, fetch_msg = get_index_stock_list(selected_index)
+    return analysis_title, stock_list, fetch_msg
+
+def resolve_stock_list(analysis_universe, selected_index):
+    """Analysis title and constituent tickers for the selected universe"""
+    analysis_title, stock_list, fetch_msg = fetch_stock_list(analysis_universe, selected_index)
     
     if not stock_list:
         st.error(f"Failed to fetch stock list: {fetch_msg}")
         st.stop()
         
     logging.info(fetch_msg)
+    return analysis_title, stock_list
+
+def get_sector_map(stock_list):
+    """Sector for every ticker, fetching unseen tickers now and refreshing stale ones in the background"""
+    logging.info(f"📡 Loading sector metadata store...")
+    store, refresher = get_sector_store()
+    return load_sector_map(get_data_source(), store, stock_list, refresher)
+
+def scan_session(job, analysis_universe, selected_index, analysis_date, compute_engine, pool_workers):
+    """Body of a shared scan job: no Streamlit calls, progress reported to every attached session"""
+    
+    profile = RunProfile("run_analysis", universe=selected_index or analysis_universe, date=str(analysis_date), engine=compute_engine)
+    job.report(0.02, "Resolving universe...")
+    with profile.span("universe"):
+        analysis_title, stock_list, fetch_msg = fetch_stock_list(analysis_universe, selected_index)
+    if not stock_list:
+        raise ScanFailed(f"Failed to fetch stock list: {fetch_msg}")
+    logging.info(fetch_msg)
     
     # --- HARCODED ILFO MODEL ---
     compute_function = compute_ilfo_signal
@@ -1155,112 +282,111 @@ def run_analysis(analysis_universe, selected_index, analysis_date): # --- REMOVE
     )
     # --- END HARCODED ---
 
-    logging.info(f"📡 Loading persistent sector map...")
-    sector_map = load_sector_map()
-    required_tickers = set(stock_list)
-    cached_tickers = set(sector_map.keys())
-    missing_tickers = list(required_tickers - cached_tickers)
-    
-    if missing_tickers:
-        logging.info(f"New tickers found. Fetching sector data for {len(missing_tickers)} stocks...")
-        new_sector_data = fetch_sectors_for_list(missing_tickers)
-        sector_map.update(new_sector_data)
-        save_sector_map(sector_map)
-        logging.info(f"✓ Sector map updated and saved.")
-    else:
-        logging.info(f"✓ All sectors found in cache.")
+    job.report(0.1, "Loading sector metadata...")
+    with profile.span("sectors"):
+        sector_map = get_sector_map(stock_list)
 
     logging.info(f"⬇️ Downloading historical data for {len(stock_list)} stocks...")
-    all_data_dict, batch_msg = fetch_all_data(stock_list, analysis_date)
+    job.report(0.2, f"Downloading historical data for {len(stock_list)} stocks...")
+    with profile.span("download"):
+        all_data_dict, batch_msg = fetch_all_data(stock_list, analysis_date)
     
     if all_data_dict is None:
-        st.error(f"Failed to download data: {batch_msg}")
-        st.stop()
+        raise ScanFailed(f"Failed to download data: {batch_msg}")
     
     logging.info(batch_msg)
     
     total_stocks = len(stock_list)
-    results = []
-    signal_counts = {sig: 0 for sig in signal_types}
-    sector_signals = {}
     
     valid_tickers = list(all_data_dict.keys())
     total_to_process = len(valid_tickers)
     
-    for i, ticker in enumerate(valid_tickers):
-        ticker_df = all_data_dict[ticker]
-        result_dict = compute_function(ticker, ticker_df, analysis_date)
-        
-        signal = result_dict["signal"]
-        sector = sector_map.get(ticker, "Other") 
+    job.report(0.6, f"Scoring {total_to_process} tickers...")
+    ticker_seconds = {}
+    with profile.span("compute", tickers=total_to_process):
+        engine = COMPUTE_ENGINE_KEYS.get(compute_engine, "reference")
+        pool = get_ilfo_pool(pool_workers) if engine == "pool" else None
+        ticker_results = score_universe(all_data_dict, analysis_date, engine, pool, ticker_seconds, get_result_cache())
+    profile.record_tickers(ticker_seconds)
+    
+    job.report(0.9, "Assembling results...")
+    with profile.span("assembly"):
+        # Each ticker counts once: under its own signal, as an Error if it could not be scored, else as Neutral
+        signals = ticker_results['signal']
+        buckets = signals.where(signals.isin(signal_types), np.where(signals.str.contains("Error|Data"), "Error", "Neutral"))
+        sectors = ticker_results['ticker'].map(lambda t: sector_map.get(t, "Other"))
+        
+        signal_counts = buckets.value_counts().reindex(signal_types, fill_value=0).to_dict()
+        sector_signals = pd.crosstab(sectors, buckets).reindex(index=sectors.unique(), columns=signal_types, fill_value=0).to_dict('index')
+            
+        download_errors = total_stocks - total_to_process
+        signal_counts["Error"] += download_errors
 
-        if sector not in sector_signals:
-            sector_signals[sector] = {sig: 0 for sig in signal_types}
-        
-        result_dict["Sector"] = sector
-        results.append(result_dict)
+        logging.info("✅ Analysis Complete!")
         
-        if signal in signal_counts:
-            signal_counts[signal] += 1
-            if signal not in sector_signals[sector]:
-                 sector_signals[sector][signal] = 0
-            sector_signals[sector][signal] += 1
-        elif "Error" in signal or "Data" in signal:
-            signal_counts["Error"] += 1
-            if "Error" not in sector_signals[sector]:
-                 sector_signals[sector]["Error"] = 0
-            sector_signals[sector]["Error"] += 1
-        else:
-            signal_counts["Neutral"] += 1
-            if "Neutral" not in sector_signals[sector]:
-                 sector_signals[sector]["Neutral"] = 0
-            sector_signals[sector]["Neutral"] += 1
+        results_df = build_results_frame(ticker_results)
         
-        if (i + 1) % 50 == 0:
-            logging.info(f"Analyzing {ticker} ({i+1}/{total_to_process})...")
-        
-    download_errors = total_stocks - total_to_process
-    signal_counts["Error"] += download_errors
-
-    logging.info("✅ Analysis Complete!")
-    
-    results_df = pd.DataFrame(results)
-    
-    results_df = results_df.rename(columns={
-        "ticker": "Ticker", 
-        "signal": "Signal", 
-        "pct_change": "% Change", 
-        "details": "Details",
-        "confidence_score": "Confidence",
-        "confidence_grade": "Grade"
-    })
-    results_df = results_df.set_index("Ticker")
+        total_buy_signals, total_sell_signals = get_buy_sell_counts(signal_counts)
     
-    # --- NEW: Sort by Confidence Score (descending) for actionable signals ---
-    actionable_mask = results_df['Signal'].str.contains('Long|Short', na=False) # --- REMOVED Buy/Sell
-    actionable_df = results_df[actionable_mask].copy()
-    if not actionable_df.empty:
-        actionable_df = actionable_df.sort_values('Confidence', ascending=False)
-    
-    neutral_df = results_df[~actionable_mask].copy()
-    results_df = pd.concat([actionable_df, neutral_df])
-    # --- END NEW ---
-    
-    display_columns = ["Signal", "% Change", "Confidence", "Grade", "Details"]
-    criteria_columns = [
-        "ilfo_value", "vol_surge", "momentum_rsi", 
-        "osc_momentum", "osc_accel", "volume_score", "normalized_liq",
-        "confidence_class"
-    ]
-    all_columns = display_columns + criteria_columns
+    profile.record_gauges(**{f"ohlcv_cache_{name}": value for name, value in get_ohlcv_cache().usage().items()})
+    profile.record_gauges(**{f"scan_jobs_{name}": value for name, value in get_scan_jobs().usage().items()})
+    profile.finish()
+    try:
+        dump_paths = profile.dump()
+    except OSError as e:
+        logging.warning(f"Could not write run profile: {e}")
+        dump_paths = None
+    
+    return {
+        'run_id': f"{profile.started_at:%Y%m%d%H%M%S%f}",
+        'title': analysis_title,
+        'date': analysis_date,
+        'results_df': results_df,
+        'signal_counts': signal_counts,
+        'sector_signals': sector_signals,
+        'long_short': (total_buy_signals, total_sell_signals),
+        'profile': profile,
+        'dump_paths': dump_paths
+    }
+
+def run_analysis(analysis_universe, selected_index, analysis_date, compute_engine="Panel (Vectorized)", pool_workers=DEFAULT_POOL_WORKERS): # --- REMOVED selected_model
+    """Main analysis orchestrator: joins the shared scan for this universe, date and model (starting it if needed) and renders it"""
+    universe = "F&O Stocks" if analysis_universe == "F&O Stocks" else selected_index
+    job, started = get_scan_jobs().submit(
+        (universe, analysis_date, model_fingerprint()),
+        lambda job: scan_session(job, analysis_universe, selected_index, analysis_date, compute_engine, pool_workers)
+    )
+    if not started and job.done:
+        st.caption(f"♻️ Showing the {universe} scan for {analysis_date} finished at {datetime.fromtimestamp(job.finished_at):%H:%M:%S}")
+    elif not started:
+        st.caption(f"⏳ Joined the {universe} scan for {analysis_date} another session already started")
     
-    for col in all_columns:
-        if col not in results_df.columns:
-            results_df[col] = np.nan
-            
-    results_df = results_df[all_columns]
+    progress_bar = st.progress(0.0, text="Queued...")
+    try:
+        state = job.wait(on_progress=lambda progress, message: progress_bar.progress(progress, text=message))
+    except ScanFailed as e:
+        state, failure = None, str(e)
+    except Exception as e:
+        state, failure = None, f"Analysis failed: {e}"
+    progress_bar.empty()
+    if state is None:
+        st.error(failure)
+        st.stop()
     
-    total_buy_signals, total_sell_signals = get_buy_sell_counts(signal_counts)
+    st.session_state['analysis'] = dict(state)
+    render_analysis(st.session_state['analysis'])
+    render_performance_panel(state['profile'], state['dump_paths'])
+
+def render_analysis(state, profile=None):
+    """Tabs for a stored single-session run; reruns only build the tab that is open"""
+    # Reruns from tab switches and page changes time their rendering into a throwaway profile
+    profile = profile or RunProfile("render_analysis")
+    analysis_title = state['title']
+    analysis_date = state['date']
+    results_df = state['results_df']
+    signal_counts = state['signal_counts']
+    sector_signals = state['sector_signals']
+    total_buy_signals, total_sell_signals = state['long_short']
     total_neutral_signals = signal_counts["Neutral"]
     total_error_stocks = signal_counts["Error"]
 
@@ -1295,6 +421,17 @@ def run_analysis(analysis_universe, selected_index, analysis_date): # --- REMOVE
         avg_sell_confidence = 0
     # --- END NEW ---
 
+    try:
+        # Try to get theme colors from Streamlit config
+        bg_color = 'rgba(15, 15, 15, 1)' # --background-color: #0F0F0F;
+        text_color = '#EAEAEA' # --text-primary: #EAEAEA;
+        grid_color = '#2A2A2A' # --border-color: #2A2A2A;
+    except Exception:
+        # Fallback colors if config fails
+        bg_color = 'rgba(0,0,0,0)'
+        text_color = '#EAEAEA'
+        grid_color = '#2A2A2A'
+
     # --- UI DISPLAY ---
     st.markdown('<div class="section-divider"></div>', unsafe_allow_html=True)
     
@@ -1306,156 +443,356 @@ def run_analysis(analysis_universe, selected_index, analysis_date): # --- REMOVE
         f"⬇️ All Short ({total_sell_signals})", 
         "📋 All Signals", 
         f"⚠️ Errors ({total_error_stocks})"
-    ])
+    ], key=f"analysis_tabs_{state['run_id']}", on_change="rerun")
 
     with tab_dash:
-        st.markdown("### Key Metrics")
-        
-        col1, col2, col3, col4 = st.columns(4)
-        with col1:
-            st.markdown(f"<div class='metric-card success'><h4>⬆️ Total Long</h4><h2>{total_buy_signals:,}</h2><div class='sub-metric'>Avg Confidence: {avg_buy_confidence:.1f}%</div></div>", unsafe_allow_html=True)
-        with col2:
-            st.markdown(f"<div class='metric-card danger'><h4>⬇️ Total Short</h4><h2>{total_sell_signals:,}</h2><div class='sub-metric'>Avg Confidence: {avg_sell_confidence:.1f}%</div></div>", unsafe_allow_html=True)
-        with col3:
-            st.markdown(f"<div class='metric-card neutral'><h4>➖ Neutral</h4><h2>{total_neutral_signals:,}</h2><div class='sub-metric'>No Clear Signal</div></div>", unsafe_allow_html=True)
-        with col4:
-            st.markdown(f"<div class='metric-card {ratio_class}'><h4>📈 Long/Short Ratio</h4><h2>{ratio_text}</h2><div class='sub-metric'>{'Bullish' if ratio > 1.2 else 'Bearish' if ratio < 0.8 else 'Balanced'}</div></div>", unsafe_allow_html=True)
-
-        # --- NEW: Confidence Quality Metrics ---
-        st.markdown("### Confidence Quality Distribution")
-        col1, col2, col3 = st.columns(3)
-        with col1:
-            st.markdown(f"<div class='metric-card success'><h4>🎯 High Confidence</h4><h2>{high_confidence_count:,}</h2><div class='sub-metric'>≥80% Quality Score</div></div>", unsafe_allow_html=True)
-        with col2:
-            st.markdown(f"<div class='metric-card warning'><h4>⚖️ Medium Confidence</h4><h2>{medium_confidence_count:,}</h2><div class='sub-metric'>60-79% Quality Score</div></div>", unsafe_allow_html=True)
-        with col3:
-            st.markdown(f"<div class='metric-card danger'><h4>⚠️ Low Confidence</h4><h2>{low_confidence_count:,}</h2><div class='sub-metric'><60% Quality Score</div></div>", unsafe_allow_html=True)
-        # --- END NEW ---
-
-        try:
-            # Try to get theme colors from Streamlit config
-            bg_color = 'rgba(15, 15, 15, 1)' # --background-color: #0F0F0F;
-            text_color = '#EAEAEA' # --text-primary: #EAEAEA;
-            grid_color = '#2A2A2A' # --border-color: #2A2A2A;
-        except Exception:
-            # Fallback colors if config fails
-            bg_color = 'rgba(0,0,0,0)'
-            text_color = '#EAEAEA'
-            grid_color = '#2A2A2A'
-
-        # --- REMOVED selected_model check ---
-        st.markdown("### Granular Signal Distribution")
-        
-        col1, col2, col3 = st.columns(3)
-        with col1:
-            st.markdown(f"<div class='metric-card' style='border-left-color: var(--extreme-long);'><h4>🔥 Extreme Long</h4><h2 style='color: var(--extreme-long);'>{signal_counts['Extreme Long']:,}</h2></div>", unsafe_allow_html=True)
-            st.markdown(f"<div class='metric-card' style='border-left-color: var(--extreme-short);'><h4>📉 Extreme Short</h4><h2 style='color: var(--extreme-short);'>{signal_counts['Extreme Short']:,}</h2></div>", unsafe_allow_html=True)
-        with col2:
-            st.markdown(f"<div class='metric-card' style='border-left-color: var(--long);'><h4>🟢 Long</h4><h2 style='color: var(--long);'>{signal_counts['Long']:,}</h2></div>", unsafe_allow_html=True)
-            st.markdown(f"<div class='metric-card' style='border-left-color: var(--short);'><h4>🔴 Short</h4><h2 style='color: var(--short);'>{signal_counts['Short']:,}</h2></div>", unsafe_allow_html=True)
-        with col3:
-            st.markdown(f"<div class='metric-card' style='border-left-color: var(--div-long);'><h4>🔎 Div. Long</h4><h2 style='color: var(--div-long);'>{signal_counts['Divergence Long']:,}</h2></div>", unsafe_allow_html=True)
-            st.markdown(f"<div class='metric-card' style='border-left-color: var(--div-short);'><h4>🔎 Div. Short</h4><h2 style='color: var(--div-short);'>{signal_counts['Divergence Short']:,}</h2></div>", unsafe_allow_html=True)
+        if tab_dash.open:
+            st.markdown("### Key Metrics")
+            
+            col1, col2, col3, col4 = st.columns(4)
+            with col1:
+                st.markdown(f"<div class='metric-card success'><h4>⬆️ Total Long</h4><h2>{total_buy_signals:,}</h2><div class='sub-metric'>Avg Confidence: {avg_buy_confidence:.1f}%</div></div>", unsafe_allow_html=True)
+            with col2:
+                st.markdown(f"<div class='metric-card danger'><h4>⬇️ Total Short</h4><h2>{total_sell_signals:,}</h2><div class='sub-metric'>Avg Confidence: {avg_sell_confidence:.1f}%</div></div>", unsafe_allow_html=True)
+            with col3:
+                st.markdown(f"<div class='metric-card neutral'><h4>➖ Neutral</h4><h2>{total_neutral_signals:,}</h2><div class='sub-metric'>No Clear Signal</div></div>", unsafe_allow_html=True)
+            with col4:
+                st.markdown(f"<div class='metric-card {ratio_class}'><h4>📈 Long/Short Ratio</h4><h2>{ratio_text}</h2><div class='sub-metric'>{'Bullish' if ratio > 1.2 else 'Bearish' if ratio < 0.8 else 'Balanced'}</div></div>", unsafe_allow_html=True)
+
+            # --- NEW: Confidence Quality Metrics ---
+            st.markdown("### Confidence Quality Distribution")
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                st.markdown(f"<div class='metric-card success'><h4>🎯 High Confidence</h4><h2>{high_confidence_count:,}</h2><div class='sub-metric'>≥80% Quality Score</div></div>", unsafe_allow_html=True)
+            with col2:
+                st.markdown(f"<div class='metric-card warning'><h4>⚖️ Medium Confidence</h4><h2>{medium_confidence_count:,}</h2><div class='sub-metric'>60-79% Quality Score</div></div>", unsafe_allow_html=True)
+            with col3:
+                st.markdown(f"<div class='metric-card danger'><h4>⚠️ Low Confidence</h4><h2>{low_confidence_count:,}</h2><div class='sub-metric'><60% Quality Score</div></div>", unsafe_allow_html=True)
+            # --- END NEW ---
+
+            # --- REMOVED selected_model check ---
+            st.markdown("### Granular Signal Distribution")
+            
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                st.markdown(f"<div class='metric-card' style='border-left-color: var(--extreme-long);'><h4>🔥 Extreme Long</h4><h2 style='color: var(--extreme-long);'>{signal_counts['Extreme Long']:,}</h2></div>", unsafe_allow_html=True)
+                st.markdown(f"<div class='metric-card' style='border-left-color: var(--extreme-short);'><h4>📉 Extreme Short</h4><h2 style='color: var(--extreme-short);'>{signal_counts['Extreme Short']:,}</h2></div>", unsafe_allow_html=True)
+            with col2:
+                st.markdown(f"<div class='metric-card' style='border-left-color: var(--long);'><h4>🟢 Long</h4><h2 style='color: var(--long);'>{signal_counts['Long']:,}</h2></div>", unsafe_allow_html=True)
+                st.markdown(f"<div class='metric-card' style='border-left-color: var(--short);'><h4>🔴 Short</h4><h2 style='color: var(--short);'>{signal_counts['Short']:,}</h2></div>", unsafe_allow_html=True)
+            with col3:
+                st.markdown(f"<div class='metric-card' style='border-left-color: var(--div-long);'><h4>🔎 Div. Long</h4><h2 style='color: var(--div-long);'>{signal_counts['Divergence Long']:,}</h2></div>", unsafe_allow_html=True)
+                st.markdown(f"<div class='metric-card' style='border-left-color: var(--div-short);'><h4>🔎 Div. Short</h4><h2 style='color: var(--div-short);'>{signal_counts['Divergence Short']:,}</h2></div>", unsafe_allow_html=True)
 
     with tab_sector:
-        st.markdown("### 🏢 Sector-wise Signal Distribution")
-        
-        sector_df = pd.DataFrame(sector_signals).T
-        if "Other" in sector_df.index:
-            other_row = sector_df.loc["Other"]
-            sector_df = sector_df.drop("Other")
-            sector_df.loc["Other"] = other_row
+        if tab_sector.open:
+            st.markdown("### 🏢 Sector-wise Signal Distribution")
             
-        sector_df['Total'] = sector_df.sum(axis=1)
-        sector_df = sector_df.sort_values('Total', ascending=False)
-        
-        fig_sector = go.Figure()
-
-        # --- REMOVED selected_model check, hardcoded ILFO ---
-        sector_df['Total Long'] = sector_df["Extreme Long"] + sector_df["Long"] + sector_df["Divergence Long"]
-        sector_df['Total Short'] = sector_df["Extreme Short"] + sector_df["Short"] + sector_df["Divergence Short"]
-        
-        fig_sector.add_trace(go.Bar(
-            name='Total Long', x=sector_df.index, y=sector_df['Total Long'], marker_color='#10b981'
-        ))
-        fig_sector.add_trace(go.Bar(
-            name='Total Short', x=sector_df.index, y=sector_df['Total Short'], marker_color='#ef4444'
-        ))
-        fig_sector.add_trace(go.Bar(
-            name='Neutral', x=sector_df.index, y=sector_df['Neutral'], marker_color='#888888'
-        ))
-        display_cols = [
-            "Total Long", "Total Short", "Neutral",
-            "Extreme Long", "Long", "Divergence Long",
-            "Extreme Short", "Short", "Divergence Short",
-            "Total"
-        ]
-        # --- END REMOVAL ---
-
-        fig_sector.update_layout(
-            barmode='stack', title="Aggregate Signals by Sector", template="plotly_dark",
-            paper_bgcolor=bg_color, plot_bgcolor=bg_color,
-            height=500, font=dict(color=text_color),
-            yaxis=dict(title="Signal Count", gridcolor=grid_color), xaxis=dict(title="Sector"),
-            legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
-        )
-        st.plotly_chart(fig_sector, use_container_width=True)
-        
-        st.markdown("### 📋 Detailed Sector Breakdown")
-        sector_display_cols = [col for col in display_cols if col in sector_df.columns]
-        sector_display = sector_df[sector_display_cols].copy()
-        st.dataframe(sector_display, use_container_width=True, height=400)
+            sector_df = pd.DataFrame(sector_signals).T
+            if "Other" in sector_df.index:
+                other_row = sector_df.loc["Other"]
+                sector_df = sector_df.drop("Other")
+                sector_df.loc["Other"] = other_row
+                
+            sector_df['Total'] = sector_df.sum(axis=1)
+            sector_df = sector_df.sort_values('Total', ascending=False)
+            
+            import plotly.graph_objects as go
+            fig_sector = go.Figure()
 
-    def render_styled_html(df):
-        """Applies formatting and renders HTML"""
-        formatted_df = format_dataframe_for_display(df)
-        styler = formatted_df.style
-        
-        cols_to_hide = [col for col in criteria_columns if col in formatted_df.columns]
-        if cols_to_hide:
-            styler = styler.hide(cols_to_hide, axis='columns')
+            # --- REMOVED selected_model check, hardcoded ILFO ---
+            sector_df['Total Long'] = sector_df["Extreme Long"] + sector_df["Long"] + sector_df["Divergence Long"]
+            sector_df['Total Short'] = sector_df["Extreme Short"] + sector_df["Short"] + sector_df["Divergence Short"]
             
-        styler = styler.set_table_attributes('class="stMarkdown table"').hide(axis="index")
-        return styler.to_html(escape=False)
+            fig_sector.add_trace(go.Bar(
+                name='Total Long', x=sector_df.index, y=sector_df['Total Long'], marker_color='#10b981'
+            ))
+            fig_sector.add_trace(go.Bar(
+                name='Total Short', x=sector_df.index, y=sector_df['Total Short'], marker_color='#ef4444'
+            ))
+            fig_sector.add_trace(go.Bar(
+                name='Neutral', x=sector_df.index, y=sector_df['Neutral'], marker_color='#888888'
+            ))
+            display_cols = [
+                "Total Long", "Total Short", "Neutral",
+                "Extreme Long", "Long", "Divergence Long",
+                "Extreme Short", "Short", "Divergence Short",
+                "Total"
+            ]
+            # --- END REMOVAL ---
+
+            fig_sector.update_layout(
+                barmode='stack', title="Aggregate Signals by Sector", template="plotly_dark",
+                paper_bgcolor=bg_color, plot_bgcolor=bg_color,
+                height=500, font=dict(color=text_color),
+                yaxis=dict(title="Signal Count", gridcolor=grid_color), xaxis=dict(title="Sector"),
+                legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
+            )
+            st.plotly_chart(fig_sector, use_container_width=True)
+            
+            st.markdown("### 📋 Detailed Sector Breakdown")
+            sector_display_cols = [col for col in display_cols if col in sector_df.columns]
+            sector_display = sector_df[sector_display_cols].copy()
+            st.dataframe(sector_display, use_container_width=True, height=400)
 
     with tab_buy:
-        st.markdown(f"### ⬆️ All Long Signals ({total_buy_signals})")
-        st.markdown(f"*Sorted by Confidence Score (Highest First)*")
-        if not buy_df.empty:
-            html_buy = render_styled_html(buy_df)
-            st.markdown(html_buy, unsafe_allow_html=True)
-            st.markdown("")
-            st.markdown(create_export_link(buy_df, f"{analysis_title}_{analysis_date}_all_long.csv"), unsafe_allow_html=True)
-        else:
-            st.info("No long signals generated for this analysis period.")
+        if tab_buy.open:
+            st.markdown(f"### ⬆️ All Long Signals ({total_buy_signals})")
+            st.markdown(f"*Sorted by Confidence Score (Highest First)*")
+            if not buy_df.empty:
+                with profile.span("render_html", table="buy"):
+                    render_results_grid(buy_df, f"buy_{state['run_id']}")
+                st.markdown("")
+                with profile.span("export", table="buy"):
+                    render_export_buttons(buy_df, f"{analysis_title}_{analysis_date}_all_long", f"export_buy_{state['run_id']}")
+            else:
+                st.info("No long signals generated for this analysis period.")
 
     with tab_sell:
-        st.markdown(f"### ⬇️ All Short Signals ({total_sell_signals})")
-        st.markdown(f"*Sorted by Confidence Score (Highest First)*")
-        if not sell_df.empty:
-            html_sell = render_styled_html(sell_df)
-            st.markdown(html_sell, unsafe_allow_html=True)
-            st.markdown("")
-            st.markdown(create_export_link(sell_df, f"{analysis_title}_{analysis_date}_all_short.csv"), unsafe_allow_html=True)
-        else:
-            st.info("No short signals generated for this analysis period.")
+        if tab_sell.open:
+            st.markdown(f"### ⬇️ All Short Signals ({total_sell_signals})")
+            st.markdown(f"*Sorted by Confidence Score (Highest First)*")
+            if not sell_df.empty:
+                with profile.span("render_html", table="sell"):
+                    render_results_grid(sell_df, f"sell_{state['run_id']}")
+                st.markdown("")
+                with profile.span("export", table="sell"):
+                    render_export_buttons(sell_df, f"{analysis_title}_{analysis_date}_all_short", f"export_sell_{state['run_id']}")
+            else:
+                st.info("No short signals generated for this analysis period.")
 
     with tab_all:
-        st.markdown("### 📋 Complete Signal Report")
-        st.markdown(f"*Actionable signals sorted by Confidence Score*")
-        html_all = render_styled_html(results_df)
-        st.markdown(html_all, unsafe_allow_html=True)
-        st.markdown("")
-        st.markdown(create_export_link(results_df, f"{analysis_title}_{analysis_date}_complete.csv"), unsafe_allow_html=True)
+        if tab_all.open:
+            st.markdown("### 📋 Complete Signal Report")
+            st.markdown(f"*Actionable signals sorted by Confidence Score*")
+            with profile.span("render_html", table="all"):
+                render_results_grid(results_df, f"all_{state['run_id']}")
+            st.markdown("")
+            with profile.span("export", table="all"):
+                render_export_buttons(results_df, f"{analysis_title}_{analysis_date}_complete", f"export_all_{state['run_id']}")
 
     with tab_errors:
-        st.markdown(f"### ⚠️ Analysis Errors ({total_error_stocks})")
-        if not errors_df.empty:
-            html_errors = render_styled_html(errors_df)
-            st.markdown(html_errors, unsafe_allow_html=True)
-            st.warning(f"⚠️ {total_error_stocks} stocks encountered errors during analysis.")
+        if tab_errors.open:
+            st.markdown(f"### ⚠️ Analysis Errors ({total_error_stocks})")
+            if not errors_df.empty:
+                with profile.span("render_html", table="errors"):
+                    render_results_grid(errors_df, f"errors_{state['run_id']}")
+                st.warning(f"⚠️ {total_error_stocks} stocks encountered errors during analysis.")
+            else:
+                st.success("✅ No errors encountered during analysis!")
+
+def render_performance_panel(profile, dump_paths=None):
+    """Collapsible breakdown of where a run spent its time"""
+    with st.expander("⏱️ Performance", expanded=False):
+        st.markdown(f"**Total:** {profile.total_seconds:.2f}s")
+        
+        stages_df = pd.DataFrame(profile.stage_totals())
+        if not stages_df.empty:
+            stages_df['share'] = stages_df['seconds'] / profile.total_seconds * 100
+            st.markdown("#### Stages")
+            st.dataframe(stages_df.set_index('stage').round({'seconds': 3, 'share': 1}), use_container_width=True)
+        
+        tickers = profile.ticker_summary()
+        st.markdown("#### Per-Ticker Compute")
+        if tickers['count']:
+            st.markdown(
+                f"{tickers['count']} tickers · mean {tickers['mean'] * 1000:.1f} ms · "
+                f"p95 {tickers['p95'] * 1000:.1f} ms · max {tickers['max'] * 1000:.1f} ms"
+            )
+            slow_df = pd.DataFrame(tickers['slowest'])
+            slow_df['ms'] = slow_df.pop('seconds') * 1000
+            st.dataframe(slow_df.set_index('ticker').round(2), use_container_width=True)
         else:
-            st.success("✅ No errors encountered during analysis!")
+            st.caption("The panel engine scores every ticker in one vectorized pass; per-ticker timings come from the Process Pool and Per-Ticker engines.")
+        
+        caches_df = pd.DataFrame.from_dict(profile.cache_deltas(), orient='index')
+        if not caches_df.empty:
+            st.markdown("#### Cache Layers")
+            st.dataframe(caches_df, use_container_width=True)
+        
+        usage = {name.removeprefix("ohlcv_cache_"): value for name, value in profile.gauges.items() if name.startswith("ohlcv_cache_")}
+        if usage:
+            st.caption(
+                f"OHLCV cache: {usage['entries']} tickers · {usage['bytes'] / 2**20:.1f} of {usage['max_bytes'] / 2**20:.0f} MB · "
+                f"{usage['evictions']} evictions · {usage['expirations']} expirations"
+            )
+        
+        if dump_paths:
+            st.caption(f"Profile written to `{dump_paths[0]}` · Prometheus metrics in `{dump_paths[1]}`")
+
+# --- Signal History Mode ---
+def run_signal_history(analysis_universe, selected_index, start_date, end_date):
+    """Compute signals for every session in [start_date, end_date] in one pass and keep them for browsing"""
+    analysis_title, stock_list = resolve_stock_list(analysis_universe, selected_index)
+    sector_map = get_sector_map(stock_list)
+    
+    # Enough history for the earliest session in the range to be fully warmed up
+    buffer_days = (end_date - start_date).days + 250
+    logging.info(f"⬇️ Downloading {buffer_days} days of history for {len(stock_list)} stocks...")
+    all_data_dict, batch_msg = fetch_all_data(stock_list, end_date, buffer_days)
+    
+    if all_data_dict is None:
+        st.error(f"Failed to download data: {batch_msg}")
+        st.stop()
+    
+    logging.info(batch_msg)
+    logging.info(f"🧮 Scoring {len(all_data_dict)} tickers for every session from {start_date} to {end_date}...")
+    history = compute_ilfo_history(all_data_dict, start_date, end_date)
+    history['Sector'] = history['ticker'].map(lambda t: sector_map.get(t, "Other"))
+    logging.info(f"✅ Signal history complete: {len(history)} rows")
+    
+    st.session_state['signal_history'] = {
+        'title': analysis_title,
+        'start_date': start_date,
+        'end_date': end_date,
+        'history': history
+    }
+    render_signal_history(st.session_state['signal_history'])
+
+def render_signal_history(state):
+    """Browse a stored signal history without recomputing it"""
+    history = state['history']
+    analysis_title = state['title']
+    
+    st.markdown('<div class="section-divider"></div>', unsafe_allow_html=True)
+    
+    if history.empty:
+        st.info(f"No sessions with enough history between {state['start_date']} and {state['end_date']}.")
+        return
+    
+    long_mask = history['signal'].str.contains("Long", na=False)
+    short_mask = history['signal'].str.contains("Short", na=False)
+    sessions = sorted(history['date'].unique(), reverse=True)
+    
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.markdown(f"<div class='metric-card info'><h4>📅 Sessions</h4><h2>{len(sessions):,}</h2><div class='sub-metric'>{state['start_date']} → {state['end_date']}</div></div>", unsafe_allow_html=True)
+    with col2:
+        st.markdown(f"<div class='metric-card success'><h4>⬆️ Long Signals</h4><h2>{long_mask.sum():,}</h2><div class='sub-metric'>Across All Sessions</div></div>", unsafe_allow_html=True)
+    with col3:
+        st.markdown(f"<div class='metric-card danger'><h4>⬇️ Short Signals</h4><h2>{short_mask.sum():,}</h2><div class='sub-metric'>Across All Sessions</div></div>", unsafe_allow_html=True)
+    
+    bg_color = 'rgba(15, 15, 15, 1)'
+    text_color = '#EAEAEA'
+    grid_color = '#2A2A2A'
+    
+    daily_counts = pd.DataFrame({
+        'Long': long_mask.groupby(history['date']).sum(),
+        'Short': short_mask.groupby(history['date']).sum()
+    })
+    import plotly.graph_objects as go
+    fig_history = go.Figure()
+    fig_history.add_trace(go.Bar(name='Long', x=daily_counts.index, y=daily_counts['Long'], marker_color='#10b981'))
+    fig_history.add_trace(go.Bar(name='Short', x=daily_counts.index, y=-daily_counts['Short'], marker_color='#ef4444'))
+    fig_history.update_layout(
+        barmode='relative', title="Actionable Signals per Session", template="plotly_dark",
+        paper_bgcolor=bg_color, plot_bgcolor=bg_color,
+        height=400, font=dict(color=text_color),
+        yaxis=dict(title="Long / Short Count", gridcolor=grid_color), xaxis=dict(title="Session"),
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
+    )
+    st.plotly_chart(fig_history, use_container_width=True)
+    
+    st.markdown("### 🗓️ Session Browser")
+    selected_session = st.selectbox(
+        "Session",
+        sessions,
+        format_func=lambda d: pd.Timestamp(d).strftime('%Y-%m-%d (%a)'),
+        key='history_session'
+    )
+    
+    session_df = history[history['date'] == selected_session].rename(columns={
+        "ticker": "Ticker",
+        "signal": "Signal",
+        "pct_change": "% Change",
+        "confidence_score": "Confidence",
+        "confidence_grade": "Grade"
+    }).drop(columns=['date']).set_index("Ticker")
+    
+    actionable_mask = session_df['Signal'].str.contains('Long|Short', na=False)
+    if st.checkbox("Show actionable signals only", value=True, key='history_actionable_only'):
+        session_df = session_df[actionable_mask]
+    else:
+        session_df = pd.concat([session_df[actionable_mask], session_df[~actionable_mask]])
+    session_df = session_df.sort_values('Confidence', ascending=False, kind='stable')
+    
+    session_label = pd.Timestamp(selected_session).date()
+    st.markdown(f"*{len(session_df)} tickers on {session_label}, sorted by Confidence Score*")
+    if not session_df.empty:
+        cols_to_hide = [col for col in session_df.columns if col in CRITERIA_SERIES or col == 'confidence_class']
+        render_results_grid(session_df, f"history_{state['start_date']}_{state['end_date']}_{session_label}", hidden=cols_to_hide)
+    else:
+        st.info("No actionable signals on this session.")
+    
+    st.markdown("")
+    history_stem = f"{analysis_title}_{state['start_date']}_{state['end_date']}_history"
+    render_export_buttons(history, history_stem, f"export_{history_stem}")
+
+# --- Intraday Live Mode ---
+def build_live_feed(feed_source, replay_path, feed_host, feed_port, replay_speed):
+    """Bar feed for the selected live source"""
+    if feed_source == "Socket Feed":
+        return SocketFeed(feed_host, int(feed_port))
+    return FileReplayFeed(replay_path, speed=replay_speed or None)
+
+def run_live_scan(analysis_universe, selected_index, feed):
+    """Seed incremental states from daily history, then re-score tickers as forming bars arrive"""
+    analysis_title, stock_list = resolve_stock_list(analysis_universe, selected_index)
+    sector_map = get_sector_map(stock_list)
+    
+    all_data_dict, batch_msg = fetch_all_data(stock_list, datetime.today().date())
+    if all_data_dict is None:
+        st.error(f"Failed to download data: {batch_msg}")
+        st.stop()
+    logging.info(batch_msg)
+    
+    scanner = LiveScanner(all_data_dict)
+    st.markdown('<div class="section-divider"></div>', unsafe_allow_html=True)
+    st.markdown(f"### 📡 Live Scan · {analysis_title}")
+    status_slot = st.empty()
+    st.markdown("#### 🔄 Latest Changes")
+    changes_slot = st.empty()
+    st.markdown("#### 🎯 Actionable Signals")
+    board_slot = st.empty()
+    
+    def to_frame(records):
+        frame = pd.DataFrame(list(records)).rename(columns={
+            "ticker": "Ticker", "signal": "Signal", "pct_change": "% Change",
+            "confidence_score": "Confidence", "confidence_grade": "Grade"
+        })
+        if frame.empty:
+            return frame
+        frame["Sector"] = frame["Ticker"].map(lambda t: sector_map.get(t, "Other"))
+        return frame.set_index("Ticker")[["Signal", "% Change", "Confidence", "Grade", "Sector"]]
+    
+    board = to_frame(scanner.results.values())
+    
+    def render_board():
+        actionable = board[board['Signal'].str.contains('Long|Short', na=False)]
+        board_slot.dataframe(actionable.sort_values('Confidence', ascending=False), use_container_width=True)
+    
+    def on_change(changed, stats):
+        status_slot.markdown(
+            f"<div class='info-box'>Batch {stats['batches']:,} · {stats['bars']:,} bars · "
+            f"{stats['last_changed']} changed · latency {stats['last_latency'] * 1000:.0f} ms "
+            f"(max {stats['max_latency'] * 1000:.0f} ms) · {time.strftime('%H:%M:%S')}</div>",
+            unsafe_allow_html=True
+        )
+        if not changed:
+            return
+        # Only the changed rows are rewritten; the rest of the board stays as it was
+        updates = to_frame(changed.values())
+        board.loc[updates.index] = updates
+        changes_slot.dataframe(updates, use_container_width=True)
+        render_board()
+    
+    render_board()
+    status_slot.info(f"Seeded {len(scanner.states)} tickers in {scanner.stats['seed_seconds']:.2f}s, waiting for bars...")
+    try:
+        scanner.run(feed, on_change)
+    except Exception as e:
+        st.error(f"Live feed stopped: {e}")
+    st.success("Feed finished.")
 
 # --- SIDEBAR ---
 with st.sidebar:
@@ -1479,11 +816,57 @@ with st.sidebar:
             help="Select the index for constituent analysis"
         )
     
+    st.markdown("### 🧮 Compute Engine")
+    compute_engine = st.selectbox(
+        "Engine",
+        COMPUTE_ENGINE_OPTIONS,
+        help="Panel scores the whole universe in one vectorized pass; Process Pool spreads tickers across CPU cores; Per-Ticker is the reference implementation"
+    )
+    
+    pool_workers = DEFAULT_POOL_WORKERS
+    if compute_engine == "Process Pool (Parallel)":
+        pool_workers = st.number_input(
+            "Worker Processes",
+            min_value=1,
+            max_value=max(DEFAULT_POOL_WORKERS * 2, 2),
+            value=DEFAULT_POOL_WORKERS,
+            help="Number of warm worker processes used for the scan"
+        )
+    
     st.markdown("### 📅 Time Period")
+    analysis_mode = st.selectbox(
+        "Mode",
+        ANALYSIS_MODE_OPTIONS,
+        help="Single Session scans one date; Signal History computes every session in a range in one pass"
+    )
+    
+    history_start = None
+    if analysis_mode == "Signal History":
+        history_start = st.date_input(
+            "Start Date",
+            datetime.today().date() - timedelta(days=HISTORY_DEFAULT_DAYS),
+            help="First session of the signal history"
+        )
+    
+    if analysis_mode == "Intraday Live":
+        feed_source = st.selectbox(
+            "Bar Feed",
+            LIVE_FEED_OPTIONS,
+            help="Replay a recorded batch file or connect to a socket streaming forming daily bars"
+        )
+        replay_path, feed_host, feed_port, replay_speed = None, "127.0.0.1", LIVE_FEED_PORT, 0.0
+        if feed_source == "Replay File":
+            replay_path = st.text_input("Replay File", "live_replay.jsonl")
+            replay_speed = st.number_input("Replay Speed", min_value=0.0, value=0.0, help="0 replays as fast as possible; 1 keeps the recorded pacing")
+        else:
+            feed_host = st.text_input("Feed Host", feed_host)
+            feed_port = st.number_input("Feed Port", min_value=1, max_value=65535, value=LIVE_FEED_PORT)
+    
     analysis_date = st.date_input(
-        "Analysis Date",
+        "Analysis Date" if analysis_mode == "Single Session" else "End Date",
         datetime.today().date(),
-        help="Select the date for signal analysis"
+        help="Select the date for signal analysis",
+        disabled=analysis_mode == "Intraday Live"
     )
     
     st.markdown('<div class="section-divider"></div>', unsafe_allow_html=True)
@@ -1533,8 +916,31 @@ with st.sidebar:
 if submit_button:
     if analysis_date > datetime.today().date():
         st.error("⚠️ Analysis date cannot be in the future.")
+    elif analysis_mode == "Intraday Live":
+        try:
+            live_feed = build_live_feed(feed_source, replay_path, feed_host, feed_port, replay_speed)
+        except OSError as e:
+            st.error(f"⚠️ Could not open bar feed: {e}")
+        else:
+            # The feed is already connected; close it even if seeding stops or the script reruns first
+            try:
+                run_live_scan(analysis_universe, selected_index, live_feed)
+            finally:
+                live_feed.close()
+    elif analysis_mode == "Signal History":
+        if history_start > analysis_date:
+            st.error("⚠️ Start date must be on or before the end date.")
+        else:
+            run_signal_history(analysis_universe, selected_index, history_start, analysis_date)
     else:
-        run_analysis(analysis_universe, selected_index, analysis_date) # --- REMOVED selected_model
+        run_analysis(analysis_universe, selected_index, analysis_date, compute_engine, pool_workers) # --- REMOVED selected_model
+elif analysis_mode == "Single Session" and 'analysis' in st.session_state:
+    # Tab switches and page changes rerun the script; re-render the stored run instead of rescoring
+    render_analysis(st.session_state['analysis'])
+    render_performance_panel(st.session_state['analysis']['profile'], st.session_state['analysis']['dump_paths'])
+elif analysis_mode == "Signal History" and 'signal_history' in st.session_state:
+    # Widget interaction reruns the script; browse the stored history instead of recomputing
+    render_signal_history(st.session_state['signal_history'])
 else:
     st.markdown("""
     <div class='info-box welcome'>
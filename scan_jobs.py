@@ -0,0 +1,113 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+# --- Scan Job Configuration ---
+SCAN_JOB_WORKERS = 2
+SCAN_JOB_RETAIN_SECONDS = 300
+SCAN_JOBS_RETAINED = 32
+SCAN_JOB_POLL_SECONDS = 0.2
+
+class ScanFailed(Exception):
+    """A scan that could not produce results (no universe, no bars); the message is meant for the user"""
+
+# --- Shared Scan Jobs ---
+class ScanJob:
+    """One scan, shared by every session that asks for its key"""
+
+    def __init__(self, key):
+        self.key = key
+        self.status = (0.0, "Queued")
+        self.result = None
+        self.error = None
+        self.sessions = 1
+        self.created_at = time.time()
+        self.finished_at = None
+        self._done = threading.Event()
+
+    @property
+    def done(self):
+        return self._done.is_set()
+
+    def report(self, progress, message):
+        """Progress (0-1) and a stage message for every waiting session"""
+        self.status = (progress, message)
+
+    def wait(self, on_progress=None, poll=SCAN_JOB_POLL_SECONDS):
+        """The job's result once it finishes, calling on_progress(progress, message) whenever its status changes.
+
+        Re-raises the job's error, so every attached session sees the same failure.
+        """
+        last = None
+        while True:
+            finished = self._done.wait(poll)
+            if on_progress is not None and self.status != last:
+                last = self.status
+                on_progress(*last)
+            if finished:
+                break
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+class ScanJobs:
+    """Running and recently finished scans keyed by (universe, trading date, model version).
+
+    submit() attaches to a matching job if one is running or was finished
+    less than retain_seconds ago, and only otherwise starts run(job) on a
+    worker thread. Jobs outlive the script run that started them, so a rerun
+    in that session simply attaches again. Failed jobs are dropped at once so
+    the next request retries, and at most max_retained finished jobs are kept.
+    """
+
+    def __init__(self, workers=SCAN_JOB_WORKERS, retain_seconds=SCAN_JOB_RETAIN_SECONDS, max_retained=SCAN_JOBS_RETAINED):
+        self.retain_seconds = retain_seconds
+        self.max_retained = max_retained
+        self.started = 0
+        self.coalesced = 0
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="scan-job")
+
+    def submit(self, key, run):
+        """(job, started): the job for key, and whether this call started it"""
+        with self._lock:
+            self._expire()
+            job = self._jobs.get(key)
+            if job is not None:
+                job.sessions += 1
+                self.coalesced += 1
+                return job, False
+            job = self._jobs[key] = ScanJob(key)
+            self.started += 1
+        self._executor.submit(self._run, job, run)
+        return job, True
+
+    def _run(self, job, run):
+        try:
+            job.result = run(job)
+        except Exception as e:
+            if not isinstance(e, ScanFailed):
+                logging.exception(f"Scan job {job.key} failed")
+            job.error = e
+            with self._lock:
+                if self._jobs.get(job.key) is job:
+                    del self._jobs[job.key]
+        finally:
+            job.finished_at = time.time()
+            job._done.set()
+
+    def _expire(self):
+        now = time.time()
+        finished = [key for key, job in self._jobs.items() if job.done]
+        for i, key in enumerate(finished):
+            if now - self._jobs[key].finished_at > self.retain_seconds or len(finished) - i > self.max_retained:
+                del self._jobs[key]
+
+    def usage(self):
+        """Jobs running and retained, plus how many requests started a scan or attached to one"""
+        with self._lock:
+            running = sum(1 for job in self._jobs.values() if not job.done)
+            return {'running': running, 'retained': len(self._jobs) - running, 'started': self.started, 'coalesced': self.coalesced}
@@ -0,0 +1,392 @@
+import argparse
+import logging
+import os
+import sys
+import time
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+from ilfo import compute_ilfo_signal, compute_ilfo_universe, results_frame
+from data_sources import INDEX_URL_MAP, make_data_source
+from exports import export_bytes, export_format_for, export_frame
+from ilfo_pool import ILFOPool, DEFAULT_POOL_WORKERS
+from instrumentation import RunProfile, PERF_DIR
+from result_cache import ResultCache, RESULT_CACHE_DB_FILE
+from ohlcv_store import OHLCVStore, OHLCV_STORE_DIR, plan_fetches, adjustment_drift
+from ohlcv_download import MissingTickers, download_chunked, summarize_chunks
+from sector_store import SectorStore, SectorRefresher, SECTOR_DB_FILE, LEGACY_SECTOR_MAP_FILE, refresh_sectors
+
+# --- Pipeline Configuration ---
+FNO_UNIVERSE = "F&O Stocks"
+DEFAULT_BUFFER_DAYS = 250
+SCAN_ENGINES = ("panel", "pool", "reference")
+SCAN_OUTPUT_FORMATS = (".parquet", ".csv", ".arrow", ".json")
+RESULT_DISPLAY_COLUMNS = ["Signal", "% Change", "Confidence", "Grade", "Details"]
+RESULT_CRITERIA_COLUMNS = [
+    "ilfo_value", "vol_surge", "momentum_rsi",
+    "osc_momentum", "osc_accel", "volume_score", "normalized_liq",
+    "confidence_class"
+]
+
+# --- Stores ---
+def open_ohlcv_store(source):
+    """OHLCV store for source; recorded/replayed sources keep theirs under their own cache_dir"""
+    return OHLCVStore(os.path.join(source.cache_dir, OHLCV_STORE_DIR) if source.cache_dir else OHLCV_STORE_DIR)
+
+def open_sector_store(source):
+    """(SectorStore, SectorRefresher) for source"""
+    if source.cache_dir:
+        # Recorded/replayed runs start from an empty store so every lookup goes through the source
+        store = SectorStore(os.path.join(source.cache_dir, SECTOR_DB_FILE), None)
+    else:
+        store = SectorStore(SECTOR_DB_FILE, LEGACY_SECTOR_MAP_FILE)
+    return store, SectorRefresher(store, source)
+
+def open_result_cache(source):
+    """Per-ticker ILFO result cache spilling to RESULT_CACHE_DB_FILE (under cache_dir for recorded/replayed sources)"""
+    return ResultCache(spill_path=os.path.join(source.cache_dir, RESULT_CACHE_DB_FILE) if source.cache_dir else RESULT_CACHE_DB_FILE)
+
+# --- Universe, Bars & Sectors ---
+def fetch_universe(source, universe):
+    """(symbols, message) for "F&O Stocks" or an index name; symbols is None on failure"""
+    if universe == FNO_UNIVERSE:
+        return source.fno_universe()
+    return source.index_universe(universe)
+
+def load_ohlcv(source, store, stock_list, end_date, buffer_days=DEFAULT_BUFFER_DAYS, misses=None):
+    """(data_dict, message) for [end_date - buffer_days, end_date], downloading only what store lacks.
+
+    Pass a MissingTickers as misses to stop re-requesting tickers the source has no bars for.
+    """
+    start_date = end_date - timedelta(days=buffer_days)
+
+    fetch_plan = plan_fetches(store, stock_list, start_date, end_date)
+    downloaded_tickers = set()
+    readjusted = {}
+    errors = []
+    chunk_stats = []
+
+    for (fetch_start, fetch_end), tickers in fetch_plan.items():
+        logging.info(f"Fetching {len(tickers)} tickers for {fetch_start} → {fetch_end}")
+
+        def store_chunk(chunk_data, fetch_start=fetch_start, fetch_end=fetch_end):
+            # Persist every chunk as it lands, so a retry only re-downloads what failed
+            for ticker, ticker_df in chunk_data.items():
+                coverage = store.coverage(ticker)
+                if coverage is not None:
+                    factor = adjustment_drift(store.read(ticker, fetch_start, fetch_end), ticker_df)
+                    if factor is not None:
+                        logging.info(f"Adjustment change for {ticker} (x{factor:.4f}), history will be re-fetched")
+                        # A backfill starts before the stored range, so its re-fetch has to as well
+                        readjusted.setdefault(min(fetch_start, coverage['covered_from']), []).append(ticker)
+                        continue
+                store.write(ticker, ticker_df, fetch_start, fetch_end, flush=False)
+                downloaded_tickers.add(ticker)
+            store.flush()
+
+        new_data, window_stats = download_chunked(
+            tickers, fetch_start, fetch_end, on_chunk=store_chunk, download=source.download_ohlcv, misses=misses
+        )
+        chunk_stats.extend(window_stats)
+        window_errors = [stats['error'] for stats in window_stats if stats['error']]
+        errors.extend(window_errors)
+
+        if not new_data and not window_errors:
+            # Nothing traded in this window for anyone (weekend/holiday)
+            for ticker in tickers:
+                store.write(ticker, pd.DataFrame(), fetch_start, fetch_end, flush=False)
+
+    # Split/dividend re-adjusted history: replace only the affected tickers
+    for covered_from, tickers in readjusted.items():
+        logging.info(f"♻️ Re-fetching full history for {len(tickers)} re-adjusted tickers from {covered_from}")
+        new_data, window_stats = download_chunked(tickers, covered_from, end_date, download=source.download_ohlcv)
+        chunk_stats.extend(window_stats)
+        errors.extend(stats['error'] for stats in window_stats if stats['error'])
+
+        for ticker in tickers:
+            if ticker in new_data:
+                store.write(ticker, new_data[ticker], covered_from, end_date, replace=True, flush=False)
+                downloaded_tickers.add(ticker)
+            else:
+                # Never serve a mix of old and new adjustment factors
+                store.drop(ticker)
+    store.flush()
+
+    data_dict = {}
+    for ticker in stock_list:
+        ticker_df = store.read(ticker, start_date, end_date)
+        if ticker_df is not None and not ticker_df.empty and not ticker_df['Close'].isnull().all():
+            data_dict[ticker] = ticker_df
+
+    if chunk_stats:
+        chunk_frame = summarize_chunks(chunk_stats)
+        logging.info(f"Download chunks (slowest first):\n{chunk_frame.head(10).round(2).to_string()}")
+
+    if not data_dict:
+        return None, f"Download error: {errors[0]}" if errors else "No data returned"
+
+    data_dict = align_dates(data_dict)
+
+    refreshed = len(downloaded_tickers & set(data_dict))
+    chunk_msg = ""
+    if chunk_stats:
+        failed_chunks = sum(1 for stats in chunk_stats if stats['failed'])
+        slowest = max(stats['seconds'] for stats in chunk_stats)
+        chunk_msg = f"; {len(chunk_stats)} chunk requests, {failed_chunks} with failures, slowest {slowest:.1f}s"
+    return data_dict, f"✓ Loaded {len(data_dict)} tickers ({refreshed} refreshed from {source.name}, {len(data_dict) - refreshed} from local store{chunk_msg})"
+
+def align_dates(data_dict):
+    """Reindex every frame on the union of trading dates, as a single multi-ticker download would"""
+    all_dates = data_dict[next(iter(data_dict))].index
+    for ticker_df in data_dict.values():
+        all_dates = all_dates.union(ticker_df.index)
+    return {ticker: ticker_df.reindex(all_dates) for ticker, ticker_df in data_dict.items()}
+
+def session_window(data_dict, end_date, buffer_days=DEFAULT_BUFFER_DAYS):
+    """The bars a single-date load_ohlcv of end_date would return, cut out of a longer load_ohlcv result.
+
+    Keeps [end_date - buffer_days, end_date], drops tickers with no closes
+    left and realigns the rest, so nothing after end_date can leak into it.
+    """
+    start = pd.Timestamp(end_date - timedelta(days=buffer_days))
+    end = pd.Timestamp(end_date) + timedelta(days=1)
+    window = {}
+    for ticker, ticker_df in data_dict.items():
+        ticker_df = ticker_df[(ticker_df.index >= start) & (ticker_df.index < end)].dropna(how='all')
+        if not ticker_df.empty and not ticker_df['Close'].isnull().all():
+            window[ticker] = ticker_df
+    return align_dates(window) if window else window
+
+def load_sector_map(source, store, stock_list, refresher=None):
+    """Sector for every ticker, fetching unseen tickers now; stale ones are refreshed in the background if a refresher is given"""
+    missing_tickers = store.missing(stock_list)
+
+    if missing_tickers:
+        logging.info(f"New tickers found. Fetching sector data for {len(missing_tickers)} stocks...")
+        refresh_sectors(store, missing_tickers, source=source)
+        logging.info(f"✓ Sector store updated.")
+    else:
+        logging.info(f"✓ All sectors found in store.")
+
+    if refresher is not None:
+        refresher.refresh_async(stock_list)
+    return store.sector_map(stock_list)
+
+# --- Scoring & Results ---
+def score_universe(data_dict, end_date, engine="panel", pool=None, timings=None, cache=None):
+    """RESULT_COLUMNS frame scoring every ticker in data_dict on end_date.
+
+    engine is "panel" (one vectorized pass), "pool" (compute_ilfo_signal on
+    the given ILFOPool) or "reference" (compute_ilfo_signal in this process).
+    Per-ticker compute seconds go into timings for the per-ticker engines.
+    With a ResultCache, tickers whose bars, date and model are unchanged are
+    served from it and only the rest are scored.
+    """
+    if cache is None:
+        return _score_tickers(data_dict, end_date, engine, pool, timings)
+
+    keys = {ticker: cache.key(ticker, df, end_date) for ticker, df in data_dict.items()}
+    cached = cache.get_many(keys.values())
+    missing = {ticker: df for ticker, df in data_dict.items() if keys[ticker] not in cached}
+    logging.info(f"♻️ {len(data_dict) - len(missing)}/{len(data_dict)} tickers served from the result cache")
+    if missing:
+        scored = _score_tickers(missing, end_date, engine, pool, timings)
+        records = dict(zip((keys[ticker] for ticker in scored['ticker']), scored.to_dict('records')))
+        cache.put_many(records)
+        cached.update(records)
+    return results_frame(cached[keys[ticker]] for ticker in data_dict)
+
+def _score_tickers(data_dict, end_date, engine, pool, timings):
+    timings = {} if timings is None else timings
+    if engine == "panel":
+        logging.info(f"🧮 Scoring {len(data_dict)} tickers in one panel pass...")
+        return compute_ilfo_universe(data_dict, end_date)
+    if engine == "pool":
+        if pool is None:
+            raise ValueError("The pool engine needs an ILFOPool")
+        logging.info(f"🧮 Scoring {len(data_dict)} tickers across {pool.workers} worker processes...")
+        return results_frame(pool.score(data_dict, end_date, timings=timings))
+    if engine != "reference":
+        raise ValueError(f"Unknown compute engine '{engine}' (expected one of {', '.join(SCAN_ENGINES)})")
+
+    ticker_results = []
+    for i, (ticker, ticker_df) in enumerate(data_dict.items()):
+        started = time.perf_counter()
+        ticker_results.append(compute_ilfo_signal(ticker, ticker_df, end_date))
+        timings[ticker] = time.perf_counter() - started
+
+        if (i + 1) % 50 == 0:
+            logging.info(f"Analyzing {ticker} ({i+1}/{len(data_dict)})...")
+    return results_frame(ticker_results)
+
+def build_results_frame(results):
+    """Scan results (a RESULT_COLUMNS frame or records) as the ticker-indexed results table, actionable signals first by confidence"""
+    results_df = pd.DataFrame(results)
+
+    results_df = results_df.rename(columns={
+        "ticker": "Ticker",
+        "signal": "Signal",
+        "pct_change": "% Change",
+        "details": "Details",
+        "confidence_score": "Confidence",
+        "confidence_grade": "Grade"
+    })
+    results_df = results_df.set_index("Ticker")
+
+    # --- NEW: Sort by Confidence Score (descending) for actionable signals ---
+    actionable_mask = results_df['Signal'].str.contains('Long|Short', na=False) # --- REMOVED Buy/Sell
+    actionable_df = results_df[actionable_mask].copy()
+    if not actionable_df.empty:
+        actionable_df = actionable_df.sort_values('Confidence', ascending=False)
+
+    neutral_df = results_df[~actionable_mask].copy()
+    results_df = pd.concat([actionable_df, neutral_df])
+    # --- END NEW ---
+
+    all_columns = RESULT_DISPLAY_COLUMNS + RESULT_CRITERIA_COLUMNS
+
+    for col in all_columns:
+        if col not in results_df.columns:
+            results_df[col] = np.nan
+
+    return results_df[all_columns]
+
+# --- Batch Scans ---
+class BatchScanner:
+    """Scans several universes and dates in one process, downloading the union of their bars once"""
+
+    def __init__(self, source, engine="panel", pool_workers=DEFAULT_POOL_WORKERS, buffer_days=DEFAULT_BUFFER_DAYS, result_cache=True):
+        self.source = source
+        self.engine = engine
+        self.buffer_days = buffer_days
+        self.store = open_ohlcv_store(source)
+        self.sector_store, _ = open_sector_store(source)
+        self.pool = ILFOPool(pool_workers) if engine == "pool" else None
+        self.missing_tickers = MissingTickers()
+        # Overlapping universes share their tickers' results; close() spills them for the next run
+        self.result_cache = open_result_cache(source) if result_cache else None
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.shutdown()
+        if self.result_cache is not None:
+            self.result_cache.flush()
+
+    def scan(self, universes, dates, profile=None):
+        """One results frame for every (universe, date), with Universe, Date and Sector columns"""
+        dates = sorted(dates)
+        profile = profile or RunProfile("batch_scan", universes=list(universes), engine=self.engine)
+
+        constituents = {}
+        with profile.span("universe"):
+            for universe in universes:
+                symbols, message = fetch_universe(self.source, universe)
+                if not symbols:
+                    logging.warning(f"Skipping {universe}: {message}")
+                    continue
+                logging.info(f"{universe}: {message}")
+                constituents[universe] = symbols
+        tickers = list(dict.fromkeys(t for symbols in constituents.values() for t in symbols))
+        if not tickers:
+            return pd.DataFrame()
+
+        with profile.span("sectors"):
+            sector_map = load_sector_map(self.source, self.sector_store, tickers)
+
+        # Enough history for the earliest date to be fully warmed up, fetched once for every universe
+        buffer_days = (dates[-1] - dates[0]).days + self.buffer_days
+        with profile.span("download", tickers=len(tickers)):
+            data_dict, message = load_ohlcv(self.source, self.store, tickers, dates[-1], buffer_days, self.missing_tickers)
+        logging.info(message)
+        if data_dict is None:
+            return pd.DataFrame()
+
+        frames = []
+        for universe, symbols in constituents.items():
+            universe_data = {ticker: data_dict[ticker] for ticker in symbols if ticker in data_dict}
+            if not universe_data:
+                logging.warning(f"Skipping {universe}: no bars for any constituent")
+                continue
+            for scan_date in dates:
+                # Score each date on exactly the bars a single-date scan would see
+                scan_data = session_window(universe_data, scan_date, self.buffer_days)
+                if not scan_data:
+                    logging.warning(f"Skipping {universe} on {scan_date}: no bars for any constituent")
+                    continue
+                timings = {}
+                with profile.span("compute", universe=universe, date=str(scan_date)):
+                    results = score_universe(scan_data, scan_date, self.engine, self.pool, timings, self.result_cache)
+                profile.record_tickers({f"{universe}:{scan_date}:{t}": s for t, s in timings.items()})
+                with profile.span("assembly"):
+                    results_df = build_results_frame(results).reset_index()
+                    results_df.insert(0, 'Date', pd.Timestamp(scan_date))
+                    results_df.insert(0, 'Universe', universe)
+                    results_df['Sector'] = results_df['Ticker'].map(lambda t: sector_map.get(t, "Other"))
+                frames.append(results_df)
+                logging.info(f"✅ {universe} on {scan_date}: {len(results_df)} tickers scored")
+
+        return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+def write_results(results_df, path):
+    """Write a batch scan as Parquet, CSV, Arrow IPC or JSON records, picked by the file extension"""
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in SCAN_OUTPUT_FORMATS:
+        raise ValueError(f"Unsupported output '{path}' (expected one of {', '.join(SCAN_OUTPUT_FORMATS)})")
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    if extension == ".json":
+        export_frame(results_df).to_json(path, orient='records', date_format='iso', indent=1)
+        return
+    with open(path, 'wb') as f:
+        f.write(export_bytes(results_df, export_format_for(path)))
+
+# --- CLI ---
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Headless ILFO scan of one or more universes and dates")
+    parser.add_argument('--universe', action='append', choices=[FNO_UNIVERSE, *INDEX_URL_MAP], help="Universe to scan; repeat for several (default: F&O Stocks)")
+    parser.add_argument('--date', action='append', type=date.fromisoformat, help="Session date (YYYY-MM-DD); repeat for several (default: today)")
+    parser.add_argument('--engine', choices=SCAN_ENGINES, default="panel")
+    parser.add_argument('--workers', type=int, default=DEFAULT_POOL_WORKERS, help="Worker processes for the pool engine")
+    parser.add_argument('--source', default=None, help="live, record[:dir] or replay[:dir] (default: $SANKET_DATA_SOURCE, else live)")
+    parser.add_argument('--buffer-days', type=int, default=DEFAULT_BUFFER_DAYS, help="Calendar days of history before the earliest date")
+    parser.add_argument('--no-result-cache', action='store_true', help="Score every ticker instead of reusing cached results")
+    parser.add_argument('--actionable-only', action='store_true', help="Keep only Long/Short signals")
+    parser.add_argument('--out', required=True, help=f"Output file ({', '.join(SCAN_OUTPUT_FORMATS)})")
+    parser.add_argument('--profile-dir', nargs='?', const=PERF_DIR, help=f"Write the run profile here (default when given without a value: {PERF_DIR})")
+    args = parser.parse_args(argv)
+
+    if os.path.splitext(args.out)[1].lower() not in SCAN_OUTPUT_FORMATS:
+        parser.error(f"--out must end in one of {', '.join(SCAN_OUTPUT_FORMATS)}")
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    universes = list(dict.fromkeys(args.universe or [FNO_UNIVERSE]))
+    dates = sorted(set(args.date or [date.today()]))
+    source = make_data_source(args.source)
+    logging.info(f"📡 Market data source: {source.describe()}")
+
+    profile = RunProfile("batch_scan", universes=universes, dates=[str(d) for d in dates], engine=args.engine)
+    scanner = BatchScanner(source, args.engine, args.workers, args.buffer_days, result_cache=not args.no_result_cache)
+    try:
+        results_df = scanner.scan(universes, dates, profile)
+    finally:
+        scanner.close()
+
+    if args.actionable_only and not results_df.empty:
+        results_df = results_df[results_df['Signal'].str.contains('Long|Short', na=False)]
+
+    profile.finish()
+    if args.profile_dir:
+        profile.dump(args.profile_dir)
+    if results_df.empty:
+        logging.error("No results to write")
+        return 1
+
+    write_results(results_df, args.out)
+    logging.info(f"✓ {len(results_df)} rows for {results_df['Universe'].nunique()} universes x {results_df['Date'].nunique()} dates written to {args.out} in {profile.total_seconds:.1f}s")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,198 @@
+import logging
+import os
+import pickle
+import random
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from data_sources import LiveDataSource
+
+# --- Sector Store Configuration ---
+SECTOR_DB_FILE = "sector_metadata.db"
+LEGACY_SECTOR_MAP_FILE = "sector_map.pkl"
+SECTOR_TTL_DAYS = 30
+FAILED_RETRY_HOURS = 6
+SECTOR_FETCH_WORKERS = 8
+SECTOR_REQUESTS_PER_SECOND = 4.0
+SECTOR_FETCH_RETRIES = 3
+SECTOR_RETRY_BACKOFF = 1.0
+
+# --- Indexed Local Metadata Store ---
+class SectorStore:
+    """SQLite table of ticker -> sector/industry with the time each entry was fetched.
+
+    Every write is a single transaction, and WAL mode lets concurrent Streamlit
+    sessions read while another one writes. Entries that came back without a
+    sector (ok = 0) expire after FAILED_RETRY_HOURS rather than SECTOR_TTL_DAYS,
+    so one transient failure does not pin a ticker to "Other".
+    """
+
+    def __init__(self, path=SECTOR_DB_FILE, legacy_path=LEGACY_SECTOR_MAP_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS sectors ("
+                "ticker TEXT PRIMARY KEY, sector TEXT, industry TEXT, "
+                "fetched_at REAL NOT NULL, ok INTEGER NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS sectors_fetched_at ON sectors (fetched_at)")
+        if legacy_path and os.path.exists(legacy_path) and self.count() == 0:
+            self.import_legacy_map(legacy_path)
+
+    def count(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM sectors").fetchone()[0]
+
+    def import_legacy_map(self, path):
+        """Seed the store from the old pickled {ticker: sector} map"""
+        try:
+            with open(path, 'rb') as f:
+                legacy = pickle.load(f)
+        except Exception as e:
+            logging.warning(f"Could not read legacy sector map {path}: {e}")
+            return
+        # Stamped with the file's age so the TTL refresh picks them up in time;
+        # "Other" entries were most likely failures and are retried straight away
+        stamped = os.path.getmtime(path)
+        self.upsert([
+            (ticker, sector, None, stamped if sector != "Other" else 0.0, sector != "Other")
+            for ticker, sector in legacy.items()
+        ])
+        logging.info(f"Imported {len(legacy)} sectors from legacy map {path}")
+
+    def upsert(self, rows):
+        """Insert or replace (ticker, sector, industry, fetched_at, ok) rows atomically"""
+        rows = [(t, s, i, float(f), int(bool(ok))) for t, s, i, f, ok in rows]
+        if not rows:
+            return
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO sectors (ticker, sector, industry, fetched_at, ok) VALUES (?, ?, ?, ?, ?)",
+                rows
+            )
+
+    def get(self, tickers):
+        """{ticker: {'sector', 'industry', 'fetched_at', 'ok'}} for the tickers the store knows"""
+        tickers = list(tickers)
+        entries = {}
+        with self._lock:
+            for start in range(0, len(tickers), 500):
+                chunk = tickers[start:start + 500]
+                query = f"SELECT ticker, sector, industry, fetched_at, ok FROM sectors WHERE ticker IN ({','.join('?' * len(chunk))})"
+                for ticker, sector, industry, fetched_at, ok in self._conn.execute(query, chunk):
+                    entries[ticker] = {'sector': sector, 'industry': industry, 'fetched_at': fetched_at, 'ok': bool(ok)}
+        return entries
+
+    def missing(self, tickers):
+        known = self.get(tickers)
+        return [ticker for ticker in tickers if ticker not in known]
+
+    def stale(self, tickers, now=None):
+        """Known tickers whose entry has outlived its TTL"""
+        now = time.time() if now is None else now
+        stale = []
+        for ticker, entry in self.get(tickers).items():
+            ttl = SECTOR_TTL_DAYS * 86400 if entry['ok'] else FAILED_RETRY_HOURS * 3600
+            if now - entry['fetched_at'] > ttl:
+                stale.append(ticker)
+        return stale
+
+    def sector_map(self, tickers):
+        """{ticker: sector}, "Other" where none is known"""
+        entries = self.get(tickers)
+        return {ticker: (entries[ticker]['sector'] if ticker in entries and entries[ticker]['sector'] else "Other") for ticker in tickers}
+
+# --- Bounded, Rate-Limited Fetcher ---
+class RateLimiter:
+    """Spaces calls at least 1 / rate seconds apart across all threads"""
+
+    def __init__(self, rate=SECTOR_REQUESTS_PER_SECOND):
+        self.interval = 1.0 / rate if rate else 0.0
+        self._lock = threading.Lock()
+        self._next = 0.0
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next)
+            self._next = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+def fetch_sector_info(ticker, limiter=None, retries=SECTOR_FETCH_RETRIES, backoff=SECTOR_RETRY_BACKOFF, source=None):
+    """(ticker, sector, industry, fetched_at, ok) for one ticker, retrying with exponential backoff"""
+    source = source or LiveDataSource()
+    for attempt in range(retries):
+        if limiter is not None:
+            limiter.wait()
+        try:
+            info = source.ticker_info(ticker) or {}
+            sector = info.get('sector')
+            return ticker, sector or "Other", info.get('industry'), time.time(), bool(sector)
+        except Exception as e:
+            if attempt == retries - 1:
+                logging.warning(f"Could not fetch .info for {ticker}: {e}")
+                break
+            time.sleep(backoff * (2 ** attempt) * (1 + random.random() * 0.25))
+    return ticker, "Other", None, time.time(), False
+
+def fetch_sectors(tickers, workers=SECTOR_FETCH_WORKERS, rate=SECTOR_REQUESTS_PER_SECOND, source=None):
+    """Fetch sector rows for tickers on a bounded thread pool sharing one rate limit"""
+    if not tickers:
+        return []
+    source = source or LiveDataSource()
+    logging.info(f"Fetching sector info for {len(tickers)} tickers on {workers} threads...")
+    limiter = RateLimiter(rate) if source.rate_limited else None
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        rows = list(pool.map(lambda ticker: fetch_sector_info(ticker, limiter, source=source), tickers))
+    failed = sum(1 for row in rows if not row[4])
+    logging.info(f"Finished fetching sectors ({failed} without a sector, retried after {FAILED_RETRY_HOURS}h)")
+    return rows
+
+def refresh_sectors(store, tickers, workers=SECTOR_FETCH_WORKERS, rate=SECTOR_REQUESTS_PER_SECOND, source=None):
+    """Fetch tickers and write them to the store; failures never overwrite a known sector"""
+    rows = fetch_sectors(tickers, workers, rate, source)
+    known = store.get([row[0] for row in rows if not row[4]])
+    keep = []
+    for row in rows:
+        entry = known.get(row[0])
+        if not row[4] and entry is not None and entry['ok']:
+            # Keep the good sector; stamp it as a failure so it is retried soon
+            keep.append((row[0], entry['sector'], entry['industry'], row[3], False))
+        else:
+            keep.append(row)
+    store.upsert(keep)
+    return keep
+
+# --- Background TTL Refresh ---
+class SectorRefresher:
+    """Refreshes stale entries on a daemon thread; at most one refresh runs at a time"""
+
+    def __init__(self, store, source=None):
+        self.store = store
+        self.source = source
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def refresh_async(self, tickers):
+        stale = self.store.stale(tickers)
+        if not stale:
+            return False
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return False
+            self._thread = threading.Thread(target=self._run, args=(stale,), daemon=True, name="sector-refresh")
+            self._thread.start()
+        logging.info(f"Refreshing {len(stale)} stale sector entries in the background")
+        return True
+
+    def _run(self, tickers):
+        try:
+            refresh_sectors(self.store, tickers, source=self.source)
+        except Exception as e:
+            logging.warning(f"Background sector refresh failed: {e}")
@@ -0,0 +1,53 @@
+import os
+from datetime import date
+
+import pandas as pd
+import pytest
+
+from benchmarks import synthetic_universe
+from ilfo import compute_ilfo_signal
+from ilfo_pool import ILFOPool, _pack_chunk
+
+END_DATE = date(2026, 10, 16)
+SHM_DIR = "/dev/shm"
+BAD_TICKER = "SYN0007.NS"
+
+pytestmark = pytest.mark.skipif(not os.path.isdir(SHM_DIR), reason="needs POSIX shared memory")
+
+def shared_blocks():
+    return {name for name in os.listdir(SHM_DIR) if name.startswith("psm_")}
+
+def unpackable_universe():
+    """Eight tickers whose last one cannot be packed"""
+    data_dict = synthetic_universe(8, 100, end_date=END_DATE)
+    # Seconds-resolution dates past 2262 do not fit the nanosecond stamps the block carries
+    data_dict[BAD_TICKER].index = pd.date_range("2500-01-01", periods=len(data_dict[BAD_TICKER]), unit='s')
+    return data_dict
+
+def test_unpackable_ticker_is_skipped_from_the_block():
+    data_dict = unpackable_universe()
+    before = shared_blocks()
+    shm, meta, skipped = _pack_chunk(list(data_dict.items()))
+    try:
+        assert skipped == [BAD_TICKER]
+        assert meta['tickers'] == [ticker for ticker in data_dict if ticker != BAD_TICKER]
+    finally:
+        shm.close()
+        shm.unlink()
+    assert shared_blocks() == before
+
+def test_unpackable_ticker_comes_back_as_error_record():
+    data_dict = unpackable_universe()
+    pool = ILFOPool(workers=1, chunks_per_worker=4)
+    try:
+        before = shared_blocks()
+        results = {record['ticker']: record for record in pool.score(data_dict, END_DATE)}
+        assert shared_blocks() == before
+    finally:
+        pool.shutdown()
+
+    assert list(results) == list(data_dict)
+    assert results[BAD_TICKER]['signal'] == "Error (Calc)"
+    for ticker, df in data_dict.items():
+        if ticker != BAD_TICKER:
+            assert results[ticker]['signal'] == compute_ilfo_signal(ticker, df, END_DATE)['signal']
@@ -0,0 +1,48 @@
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+from benchmarks import synthetic_universe
+from instrumentation import CacheStats
+from ohlcv_cache import OHLCVCache
+
+END_DATE = date(2026, 10, 16)
+
+def test_overlapping_universes_share_ticker_bars():
+    # No missing sessions, so every ticker is already on the universe's dates and served as a view
+    data_dict = synthetic_universe(20, 300, nan_rate=0, end_date=END_DATE)
+    loads = []
+
+    def load(tickers):
+        loads.append(list(tickers))
+        return {ticker: data_dict[ticker] for ticker in tickers}, "loaded"
+
+    cache = OHLCVCache(stats=CacheStats())
+    broad, _ = cache.get_or_load(list(data_dict), (END_DATE, 250), load)
+    subset = list(data_dict)[5:12]
+    narrow, _ = cache.get_or_load(subset, (END_DATE, 250), load)
+
+    assert loads == [list(data_dict)]
+    assert cache.usage()['entries'] == len(data_dict)
+    for ticker in subset:
+        pd.testing.assert_frame_equal(narrow[ticker], data_dict[ticker], check_freq=False)
+        assert np.shares_memory(narrow[ticker].to_numpy(), broad[ticker].to_numpy())
+
+def test_only_missing_tickers_are_loaded():
+    data_dict = synthetic_universe(10, 300, end_date=END_DATE)
+    tickers = list(data_dict)
+    loads = []
+
+    def load(missing):
+        loads.append(list(missing))
+        return {ticker: data_dict[ticker] for ticker in missing}, "loaded"
+
+    cache = OHLCVCache(stats=CacheStats())
+    cache.get_or_load(tickers[:6], (END_DATE, 250), load)
+    merged, _ = cache.get_or_load(tickers, (END_DATE, 250), load)
+
+    assert loads == [tickers[:6], tickers[6:]]
+    assert list(merged) == tickers
+    for ticker in tickers:
+        pd.testing.assert_frame_equal(merged[ticker], data_dict[ticker], check_freq=False)
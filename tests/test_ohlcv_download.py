@@ -0,0 +1,74 @@
+from datetime import date
+
+import pytest
+
+import ohlcv_download
+from benchmarks import synthetic_universe
+from ohlcv_download import MissingTickers, download_chunked
+
+START_DATE = date(2026, 1, 1)
+END_DATE = date(2026, 10, 16)
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    slept = []
+    monkeypatch.setattr(ohlcv_download.time, 'sleep', slept.append)
+    return slept
+
+def test_ticker_the_source_never_returns_is_not_retried(sleeps):
+    data_dict = synthetic_universe(6, 200, end_date=END_DATE)
+    delisted = "DELISTED.NS"
+    requests = []
+
+    def download(tickers, start_date, end_date):
+        requests.append(list(tickers))
+        return {ticker: data_dict[ticker] for ticker in tickers if ticker in data_dict}
+
+    misses = MissingTickers()
+    tickers = list(data_dict) + [delisted]
+    data, _ = download_chunked(tickers, START_DATE, END_DATE, chunk_size=4, workers=1, download=download, misses=misses)
+
+    assert set(data) == set(data_dict)
+    assert sum(len(chunk) for chunk in requests) == len(tickers)
+    assert sleeps == []
+    assert misses.known(delisted, START_DATE, END_DATE)
+
+    # Later scans of the same window leave it out, other windows still ask for it
+    requests.clear()
+    download_chunked(tickers, START_DATE, END_DATE, chunk_size=4, workers=1, download=download, misses=misses)
+    assert delisted not in sum(requests, [])
+    assert not misses.known(delisted, START_DATE, date(2026, 10, 17))
+
+def test_failed_and_empty_chunks_are_still_retried(sleeps):
+    data_dict = synthetic_universe(4, 200, end_date=END_DATE)
+    attempts = []
+
+    def download(tickers, start_date, end_date):
+        attempts.append(list(tickers))
+        if len(attempts) == 1:
+            raise ConnectionError("reset by peer")
+        if len(attempts) == 2:
+            return {}
+        return {ticker: data_dict[ticker] for ticker in tickers}
+
+    misses = MissingTickers()
+    data, _ = download_chunked(
+        list(data_dict), START_DATE, END_DATE, chunk_size=2, workers=1, retries=3, download=download, misses=misses
+    )
+
+    # One chunk raised and the other came back empty, so both are retried together after one backoff
+    assert set(data) == set(data_dict)
+    assert len(sleeps) == 1
+    assert sorted(sum(attempts[2:], [])) == sorted(data_dict)
+    assert not any(misses.known(ticker, START_DATE, END_DATE) for ticker in data_dict)
+
+def test_misses_expire_after_ttl(monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(ohlcv_download.time, 'monotonic', lambda: clock[0])
+    misses = MissingTickers(ttl=60)
+    misses.add(["DELISTED.NS"], START_DATE, END_DATE)
+
+    clock[0] += 59
+    assert misses.known("DELISTED.NS", START_DATE, END_DATE)
+    clock[0] += 2
+    assert not misses.known("DELISTED.NS", START_DATE, END_DATE)
@@ -0,0 +1,47 @@
+from datetime import date, timedelta
+
+import pandas as pd
+
+from benchmarks import synthetic_universe
+from data_sources import MarketDataSource
+from ohlcv_store import OHLCVStore, plan_fetches
+from scan_pipeline import load_ohlcv
+
+END_DATE = date(2026, 10, 16)
+PRICE_FIELDS = ['Open', 'High', 'Low', 'Close']
+
+class AdjustedSource(MarketDataSource):
+    """Serves one ticker's full history on whatever adjustment basis the test sets"""
+
+    name = "adjusted"
+    rate_limited = False
+
+    def __init__(self, bars):
+        self.bars = bars
+
+    def download_ohlcv(self, tickers, start_date, end_date):
+        window = self.bars[(self.bars.index >= pd.Timestamp(start_date)) & (self.bars.index <= pd.Timestamp(end_date))]
+        return {ticker: window for ticker in tickers} if not window.empty else {}
+
+def test_backfill_overlaps_stored_bars(tmp_path):
+    store = OHLCVStore(str(tmp_path))
+    bars = synthetic_universe(1, 200, nan_rate=0, end_date=END_DATE)["SYN0000.NS"]
+    store.write("SYN0000.NS", bars.iloc[100:], bars.index[100].date(), END_DATE)
+
+    entry = store.coverage("SYN0000.NS")
+    (window,) = plan_fetches(store, ["SYN0000.NS"], bars.index[0].date(), END_DATE, today=END_DATE + timedelta(days=2))
+    assert window[1] > entry['covered_from']
+
+def test_split_before_backfill_refetches_on_one_basis(tmp_path):
+    store = OHLCVStore(str(tmp_path / "ohlcv"))
+    bars = synthetic_universe(1, 200, nan_rate=0, end_date=END_DATE)["SYN0000.NS"]
+    store.write("SYN0000.NS", bars.iloc[100:], bars.index[100].date(), END_DATE)
+
+    # A 2:1 split after the stored bars were fetched rescales every earlier bar
+    split = bars.copy()
+    split[PRICE_FIELDS] /= 2
+    buffer_days = (END_DATE - bars.index[0].date()).days
+    data_dict, _ = load_ohlcv(AdjustedSource(split), store, ["SYN0000.NS"], END_DATE, buffer_days)
+
+    loaded = data_dict["SYN0000.NS"]
+    pd.testing.assert_frame_equal(loaded[PRICE_FIELDS], split[PRICE_FIELDS], check_freq=False)
@@ -0,0 +1,42 @@
+import json
+from datetime import date
+
+import pandas as pd
+import pytest
+
+from benchmarks import synthetic_universe
+from data_sources import ReplayDataSource
+from ohlcv_store import OHLCVStore
+from scan_pipeline import FNO_UNIVERSE, BatchScanner
+
+END_DATE = date(2026, 10, 16)
+
+@pytest.fixture
+def replay_source(tmp_path):
+    """Replay recording of a synthetic 40-ticker F&O universe"""
+    data_dict = synthetic_universe(40, 400, end_date=END_DATE)
+    store = OHLCVStore(str(tmp_path / "ohlcv"))
+    for ticker, ticker_df in data_dict.items():
+        store.write(ticker, ticker_df, ticker_df.index[0].date(), END_DATE, flush=False)
+    store.flush()
+    with open(tmp_path / "universe.json", 'w') as f:
+        json.dump({"fno": [list(data_dict), "synthetic"]}, f)
+    with open(tmp_path / "info.json", 'w') as f:
+        json.dump({ticker: {"sector": "Synthetic"} for ticker in data_dict}, f)
+    return ReplayDataSource(str(tmp_path))
+
+def scan(source, dates):
+    scanner = BatchScanner(source, result_cache=False)
+    try:
+        return scanner.scan([FNO_UNIVERSE], dates)
+    finally:
+        scanner.close()
+
+def test_multi_date_batch_matches_single_date_scans(replay_source):
+    # Enough sessions that centered pivots would flip some signals if later bars leaked in
+    dates = [session.date() for session in pd.bdate_range(end=END_DATE, periods=15)]
+    batch = scan(replay_source, dates)
+    for scan_date in dates:
+        single = scan(replay_source, [scan_date])
+        in_batch = batch[batch['Date'] == pd.Timestamp(scan_date)].reset_index(drop=True)
+        pd.testing.assert_frame_equal(in_batch, single)
@@ -0,0 +1,45 @@
+import copy
+import json
+
+import pandas as pd
+import pytest
+
+import ilfo
+from ilfo import OPTIMAL_RANGES, STATISTICAL_ANCHORS, SCORING_TABLES, load_scoring_tables, score_confidence_batch
+from result_cache import model_fingerprint
+
+@pytest.fixture
+def restore_tables():
+    saved = [(table, copy.deepcopy(table)) for table in (OPTIMAL_RANGES, STATISTICAL_ANCHORS, SCORING_TABLES)]
+    yield
+    for table, original in saved:
+        table.clear()
+        table.update(original)
+
+def long_row():
+    anchors = STATISTICAL_ANCHORS["Long"]
+    return pd.DataFrame([{param: stats['Success_Median'] for param, stats in anchors.items()}])
+
+def test_recalibrated_tables_reach_scoring(tmp_path, restore_tables):
+    before_score = score_confidence_batch(long_row(), ["Long"])['confidence_score'].iloc[0]
+    before_fingerprint = model_fingerprint()
+
+    ranges, anchors = copy.deepcopy(OPTIMAL_RANGES), copy.deepcopy(STATISTICAL_ANCHORS)
+    for param in ranges["Long"]:
+        ranges["Long"][param]['weight'] /= 2
+    path = tmp_path / "scoring_tables.json"
+    path.write_text(json.dumps({'OPTIMAL_RANGES': ranges, 'STATISTICAL_ANCHORS': anchors}))
+
+    assert load_scoring_tables(str(path))
+    assert ilfo.OPTIMAL_RANGES["Long"] == ranges["Long"]
+    assert score_confidence_batch(long_row(), ["Long"])['confidence_score'].iloc[0] != before_score
+    assert model_fingerprint() != before_fingerprint
+
+def test_bad_tables_are_ignored(tmp_path, restore_tables):
+    original = copy.deepcopy(OPTIMAL_RANGES)
+    path = tmp_path / "scoring_tables.json"
+    path.write_text(json.dumps({'OPTIMAL_RANGES': {"Long": {'ilfo_value': {'min': 0}}}}))
+
+    assert not load_scoring_tables(str(path))
+    assert not load_scoring_tables(str(tmp_path / "missing.json"))
+    assert OPTIMAL_RANGES == original